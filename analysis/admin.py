@@ -1,3 +1,15 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import IngestMetric, Montage
+
+
+@admin.register(Montage)
+class MontageAdmin(admin.ModelAdmin):
+    list_display = ('name', 'description')
+    search_fields = ('name',)
+
+
+@admin.register(IngestMetric)
+class IngestMetricAdmin(admin.ModelAdmin):
+    list_display = ('stage', 'seconds', 'calls', 'bytes')
+    ordering = ('-seconds',)
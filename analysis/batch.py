@@ -0,0 +1,125 @@
+# analysis/batch.py
+"""
+Processamento em lote de arquivos EEG com um pool de processos.
+
+`ingest_batch` registra cada arquivo como EEGData + ProcessingJob e distribui
+as tarefas entre processos (um registro por processo), contornando o GIL nas
+etapas em Python. Alternativamente (`channel_workers`), os registros são
+processados um a um e as etapas por canal de cada registro são distribuídas no
+pool. Em ambos os casos os arrays nunca são serializados entre processos: os
+workers recebem identificadores e abrem os sinais do armazenamento por
+memory-map (páginas compartilhadas pelo sistema operacional).
+
+Criar o pool custa a inicialização dos processos (ver pool.py); com um único
+worker ou arquivo os registros são processados no próprio processo. Uma tarefa
+cujo processo falha é registrada como 'failed' e o restante do lote continua.
+"""
+import logging
+import os
+import time
+from concurrent.futures import as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from django.core.files import File
+from django.db import connections
+
+from .jobs import claim_job, create_job, fail_job, run_job
+from .models import EEGData, STATUS_DONE, STATUS_FAILED
+from .pool import create_pool
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchResult:
+    """Resumo de um lote processado."""
+    recordings: list = field(default_factory=list)  # (eeg_id, status, segundos)
+    elapsed: float = 0.0
+
+    @property
+    def done(self):
+        return sum(1 for _, status, _ in self.recordings if status == STATUS_DONE)
+
+    @property
+    def failed(self):
+        return len(self.recordings) - self.done
+
+    @property
+    def throughput(self):
+        """Registros concluídos por minuto."""
+        return self.done / self.elapsed * 60 if self.elapsed else 0.0
+
+
+def process_job(job_id, executor=None):
+    """Reserva e executa uma tarefa; retorna (eeg_id, status, segundos)."""
+    started = time.perf_counter()
+    job = claim_job(job_id)
+    if job is None:
+        return None
+    job = run_job(job, executor=executor)
+    return job.eeg_data_id, job.eeg_data.status, time.perf_counter() - started
+
+
+def register_files(paths, sampling_rate=250.0):
+    """Copia os arquivos para o armazenamento de mídia e cria as tarefas."""
+    jobs = []
+    for path in paths:
+        path = Path(path)
+        eeg_data = EEGData(sampling_rate=sampling_rate)
+        with path.open('rb') as handle:
+            eeg_data.original_file.save(path.name, File(handle), save=True)
+        jobs.append(create_job(eeg_data))
+    return jobs
+
+
+def ingest_batch(paths, sampling_rate=250.0, workers=None, channel_workers=0, on_result=None):
+    """
+    Processa um lote de arquivos EEG.
+
+    Parâmetros:
+        paths (list): Caminhos dos arquivos CSV
+        sampling_rate (float): Taxa de amostragem comum aos arquivos (Hz)
+        workers (int, opcional): Processos para distribuir os registros (padrão: CPUs)
+        channel_workers (int): Se > 0, processa os registros em sequência e
+            distribui os canais de cada registro entre esse número de processos
+        on_result (callable, opcional): Chamado com (eeg_id, status, segundos) a cada registro
+
+    Retorna:
+        BatchResult: status e tempo por registro, com vazão em registros/minuto
+    """
+    result = BatchResult()
+    jobs = register_files(paths, sampling_rate)
+    started = time.perf_counter()
+
+    def collect(outcome):
+        if outcome is not None:
+            result.recordings.append(outcome)
+            if on_result:
+                on_result(*outcome)
+
+    workers = min(workers or os.cpu_count(), len(jobs))
+    if channel_workers:
+        with create_pool(channel_workers) as executor:
+            for job in jobs:
+                collect(process_job(job.pk, executor=executor))
+    elif workers <= 1:
+        for job in jobs:
+            collect(process_job(job.pk))
+    else:
+        # Os processos filhos abrem suas próprias conexões com o banco
+        connections.close_all()
+        with create_pool(workers) as executor:
+            futures = {executor.submit(process_job, job.pk): job for job in jobs}
+            for future in as_completed(futures):
+                try:
+                    outcome = future.result()
+                except Exception as exc:
+                    job = futures[future]
+                    logger.exception('Falha no processo do lote (EEG %s)', job.eeg_data_id)
+                    fail_job(job.pk, f'{type(exc).__name__}: {exc}')
+                    outcome = (job.eeg_data_id, STATUS_FAILED, time.perf_counter() - started)
+                collect(outcome)
+
+    result.elapsed = time.perf_counter() - started
+    return result
@@ -0,0 +1,237 @@
+# analysis/benchmarks.py
+"""
+Benchmarks da ingestão.
+
+`write_synthetic_csv` gera um registro EEG sintético (senoides nas bandas
+delta-gama com ruído, em µV) no formato de upload, com 8, 16 ou 32 canais e
+qualquer duração e taxa de amostragem, bloco a bloco (memória constante).
+`run_benchmarks` processa cada caso com process_eeg_data em um diretório
+temporário e dentro de uma transação desfeita ao final, medindo o tempo total
+e de cada etapa (instrumentation.stage) e, em uma passada separada, o pico de
+memória (tracemalloc) — o rastreamento de memória distorce os tempos.
+
+Os resultados são um dict serializável em JSON; `compare_results` aponta as
+regressões em relação a um resultado anterior (`manage.py benchmark_ingest
+--compare`).
+"""
+import platform
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import scipy
+from django.conf import settings
+from django.db import transaction
+from django.test.utils import override_settings
+
+from .instrumentation import measure_stages
+from .montages import DEFAULT_MONTAGE, SINAP_8, STANDARD_1010
+
+RESULTS_VERSION = 1
+CHANNEL_COUNTS = (8, 16, 32)
+# Componentes do sinal sintético: (frequência em Hz, amplitude em µV)
+COMPONENTS = ((2.0, 20.0), (6.0, 10.0), (10.0, 25.0), (20.0, 8.0), (40.0, 3.0))
+NOISE_UV = 2.0
+START_MS = 1633024800000
+
+
+def synthetic_channels(n_channels):
+    """Nomes dos canais e montagem: a original até 8 canais, a 10-10 acima disso."""
+    if n_channels <= len(SINAP_8):
+        return list(SINAP_8)[:n_channels], DEFAULT_MONTAGE
+    if n_channels > len(STANDARD_1010):
+        raise ValueError(f'No máximo {len(STANDARD_1010)} canais sintéticos')
+    return STANDARD_1010[:n_channels], 'standard_1010'
+
+
+def write_synthetic_csv(path, n_channels=8, duration=60.0, fs=250.0, seed=0, block_seconds=60.0):
+    """
+    Grava um CSV EEG sintético (Timestamp em ms + um canal por coluna).
+
+    Parâmetros:
+        path (Path): Arquivo de saída
+        n_channels (int): Número de canais
+        duration (float): Duração em segundos
+        fs (float): Taxa de amostragem (Hz)
+        seed (int): Semente do gerador (resultados reprodutíveis)
+        block_seconds (float): Segundos gerados e gravados por vez
+
+    Retorna:
+        tuple: (nomes dos canais, nome da montagem)
+    """
+    channels, montage = synthetic_channels(n_channels)
+    rng = np.random.default_rng(seed)
+    phases = rng.uniform(0, 2 * np.pi, (len(COMPONENTS), n_channels))
+    gains = rng.uniform(0.5, 1.5, (len(COMPONENTS), n_channels))
+    n_samples = int(round(duration * fs))
+    block = max(int(block_seconds * fs), 1)
+    with open(path, 'w', newline='') as f:
+        for i0 in range(0, n_samples, block):
+            t = np.arange(i0, min(i0 + block, n_samples)) / fs
+            data = rng.normal(0, NOISE_UV, (len(t), n_channels))
+            for (freq, amplitude), phase, gain in zip(COMPONENTS, phases, gains):
+                data += amplitude * gain * np.sin(2 * np.pi * freq * t[:, None] + phase)
+            frame = pd.DataFrame(data, columns=channels)
+            frame.insert(0, 'Timestamp', START_MS + t * 1000)
+            frame.to_csv(f, header=i0 == 0, index=False, float_format='%.4f')
+    return channels, montage
+
+
+def max_rss_bytes():
+    """Pico de memória residente do processo (ru_maxrss: KB no Linux, bytes no macOS)."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+class _Rollback(Exception):
+    pass
+
+
+def ingest_once(path, fs, montage, memory=False, chunksize=None):
+    """
+    Processa o CSV uma vez (registro criado e desfeito em uma transação).
+
+    Retorna:
+        dict: 'wall_s', 'stages' (StageTimings.as_dict), 'peak_bytes' e 'store_bytes'
+    """
+    from .eeg_processor import process_eeg_data
+    from .models import EEGData
+
+    result = {}
+    try:
+        with transaction.atomic():
+            eeg_data = EEGData.objects.create(
+                original_file=str(path.relative_to(settings.MEDIA_ROOT)),
+                sampling_rate=fs,
+                montage=montage
+            )
+            with measure_stages(memory=memory) as timings:
+                start = time.perf_counter()
+                process_eeg_data(eeg_data, chunksize=chunksize)
+                result['wall_s'] = time.perf_counter() - start
+            result['stages'] = timings.as_dict()
+            result['peak_bytes'] = timings.peak_bytes
+            result['store_bytes'] = eeg_data.store.nbytes()
+            eeg_data.store.clear()
+            raise _Rollback
+    except _Rollback:
+        pass
+    return result
+
+
+def run_case(n_channels, duration, fs, repeat=1, memory=True, chunksize=None, seed=0):
+    """
+    Benchmark de um caso (canais, duração, fs): o melhor de `repeat` execuções
+    sem rastreamento de memória e, com `memory`, uma execução com tracemalloc.
+    """
+    with tempfile.TemporaryDirectory() as workdir:
+        media = Path(workdir)
+        with override_settings(MEDIA_ROOT=media, EEG_STORE_ROOT=media / 'eeg_store'):
+            path = media / 'eeg_data' / f'synthetic-{n_channels}ch.csv'
+            path.parent.mkdir(parents=True)
+            start = time.perf_counter()
+            _, montage = write_synthetic_csv(path, n_channels, duration, fs, seed=seed)
+            generate_s = time.perf_counter() - start
+
+            runs = [ingest_once(path, fs, montage, chunksize=chunksize) for _ in range(max(repeat, 1))]
+            best = min(runs, key=lambda run: run['wall_s'])
+            traced = ingest_once(path, fs, montage, memory=True, chunksize=chunksize) if memory else None
+
+            n_samples = int(round(duration * fs))
+            return {
+                'channels': n_channels,
+                'duration_s': duration,
+                'fs': fs,
+                'samples': n_samples,
+                'csv_bytes': path.stat().st_size,
+                'store_bytes': best['store_bytes'],
+                'generate_s': generate_s,
+                'wall_s': best['wall_s'],
+                'wall_runs_s': [run['wall_s'] for run in runs],
+                'samples_per_s': n_samples * n_channels / best['wall_s'],
+                'stages': {name: {'seconds': entry['seconds'], 'calls': entry['calls']}
+                           for name, entry in best['stages'].items()},
+                'memory': {
+                    'peak_bytes': traced['peak_bytes'],
+                    'stages': {name: entry['peak_bytes'] for name, entry in traced['stages'].items()},
+                } if traced else None,
+                'max_rss_bytes': max_rss_bytes(),
+            }
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'scipy': scipy.__version__,
+        'pandas': pd.__version__,
+        'psd_method': getattr(settings, 'EEG_PSD_METHOD', 'welch'),
+        'chunksize': getattr(settings, 'EEG_INGEST_CHUNKSIZE', 65536),
+    }
+
+
+def run_benchmarks(channel_counts=CHANNEL_COUNTS, durations=(60.0,), rates=(250.0,), repeat=1,
+                   memory=True, chunksize=None, progress=None):
+    """
+    Executa todos os casos (canais x duração x fs).
+
+    Retorna:
+        dict: {'version', 'created_at', 'environment', 'results': [caso, ...]}
+    """
+    results = []
+    for fs in rates:
+        for duration in durations:
+            for n_channels in channel_counts:
+                case = run_case(n_channels, duration, fs, repeat=repeat, memory=memory, chunksize=chunksize)
+                results.append(case)
+                if progress:
+                    progress(case)
+    return {
+        'version': RESULTS_VERSION,
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'environment': environment(),
+        'results': results,
+    }
+
+
+def case_key(case):
+    return case['channels'], case['duration_s'], case['fs']
+
+
+def compare_results(current, baseline, tolerance=0.25, min_seconds=0.05):
+    """
+    Regressões de `current` em relação a `baseline` (mesmos casos).
+
+    Parâmetros:
+        tolerance (float): Aumento relativo aceito (0.25 = 25% mais lento/maior)
+        min_seconds (float): Etapas mais rápidas que isso no baseline são ignoradas (ruído)
+
+    Retorna:
+        list: Descrições das regressões (vazia se nenhuma)
+    """
+    previous = {case_key(case): case for case in baseline['results']}
+    regressions = []
+
+    def check(label, new, old, floor=0.0):
+        if new is not None and old is not None and old > floor and new > old * (1 + tolerance):
+            regressions.append(f'{label}: {old:.4g} -> {new:.4g} (+{(new / old - 1) * 100:.0f}%)')
+
+    for case in current['results']:
+        old = previous.get(case_key(case))
+        if old is None:
+            continue
+        name = '{}ch {:g}s {:g}Hz'.format(*case_key(case))
+        check(f'{name} total (s)', case['wall_s'], old['wall_s'])
+        for stage_name, entry in case['stages'].items():
+            old_entry = old['stages'].get(stage_name)
+            if old_entry:
+                check(f'{name} {stage_name} (s)', entry['seconds'], old_entry['seconds'], min_seconds)
+        if case['memory'] and old.get('memory'):
+            check(f'{name} pico de memória (bytes)', case['memory']['peak_bytes'], old['memory']['peak_bytes'])
+    return regressions
@@ -0,0 +1,262 @@
+# analysis/charts.py
+"""
+Figuras dos dashboards.
+
+Cada função monta a figura Plotly (go.Figure) de um gráfico. As visões da API
+(`views.recording_chart` e `views.channel_chart`) a serializam com `chart_json`:
+os arrays NumPy viram typed arrays em base64 ({'dtype', 'bdata'}), que o
+plotly.js renderiza diretamente no navegador (ver templates/charts.html), em vez
+de HTML com o bundle do plotly.js embutido.
+
+Os eixos de tempo são enviados em milissegundos desde a época (eixo do tipo
+'date'), o mesmo formato das janelas de nível de detalhe (lod.py).
+"""
+import base64
+
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.subplots import make_subplots
+
+from .eeg_processor import ensure_average_spectrogram, ensure_band_waveforms
+from .filter_bank import BANDAS
+from .instrumentation import stage
+from .lod import DEFAULT_WIDTH, peak_amplitude, read_window
+from .signal_store import band_key, signal_key
+from .topomap import get_topomap_weights
+
+def chart_json(fig):
+    """Figura em JSON com os arrays codificados em base64 (typed arrays do plotly.js)."""
+    with stage('render'):
+        return pio.to_json(fig, validate=False)
+
+
+def typed_array(array):
+    """Array NumPy no formato de typed array do plotly.js: {'dtype', 'bdata'} (base64)."""
+    array = np.ascontiguousarray(array)
+    dtype = {np.dtype(np.float32): 'f4', np.dtype(np.float64): 'f8',
+             np.dtype(np.int32): 'i4', np.dtype(np.uint8): 'u1'}[array.dtype]
+    return {'dtype': dtype, 'bdata': base64.b64encode(array.tobytes()).decode('ascii')}
+
+
+def epoch_ms(eeg_data, t):
+    """Segundos desde o início do registro -> milissegundos desde a época (float64)."""
+    return eeg_data.start_epoch_ms + np.asarray(t, dtype=np.float64) * 1000
+
+
+def time_axis(eeg_data, window):
+    """
+    Eixo x de uma janela do lod. No nível 0 as amostras são uniformes e basta
+    enviar o início e o passo (x0, dx) em vez de um timestamp por ponto.
+    """
+    if window['level'] == 0 and len(window['t']):
+        return {'x0': float(epoch_ms(eeg_data, window['t'][0])), 'dx': 1000 / eeg_data.sampling_rate}
+    return {'x': epoch_ms(eeg_data, window['t'])}
+
+
+def band_window(eeg_data, banda, t0=None, t1=None, width=DEFAULT_WIDTH):
+    """Janela da forma de onda média de uma banda, normalizada pelo pico do registro."""
+    store = eeg_data.store
+    key = band_key(banda)
+    n_samples = len(store.load(key))
+    window = read_window(store, key, n_samples, eeg_data.sampling_rate, t0, t1, width)
+    # Normalizar o sinal para melhor visualização
+    window['y'] = window['y'] / peak_amplitude(store, key, n_samples) * 0.5
+    return window
+
+
+def channel_window_data(analysis, kind, t0=None, t1=None, width=DEFAULT_WIDTH):
+    """Janela de um sinal do canal; o bruto em resolução total vem do arquivo do registro."""
+    eeg_data = analysis.eeg_data
+    return read_window(
+        eeg_data.store,
+        signal_key(analysis.channel_name, kind),
+        analysis.n_samples,
+        eeg_data.sampling_rate,
+        t0, t1, width,
+        recording=eeg_data.recording if kind == 'raw' else None,
+        channel=analysis.channel_name
+    )
+
+
+def brain_waves_figure(eeg_data):
+    """
+    Gera gráfico interativo das ondas cerebrais médias.
+
+    Passos:
+        1. Carrega as formas de onda médias entre canais de cada banda (calculadas na ingestão)
+           no nível de detalhe adequado (pirâmide min/max, ver lod.py)
+        2. Reconstrói o eixo de tempo a partir da taxa de amostragem
+        3. Normaliza amplitudes para visualização combinada
+    """
+    # Criar gráfico de linhas para as bandas cerebrais
+    fig = go.Figure()
+
+    # Paleta de cores para as diferentes bandas
+    colors = {
+        'delta': 'rgba(220, 53, 69, 0.8)',  # Vermelho (Bootstrap danger)
+        'theta': 'rgba(255, 193, 7, 0.8)',  # Amarelo (Bootstrap warning)
+        'alpha': 'rgba(13, 202, 240, 0.8)',  # Azul claro (Bootstrap info)
+        'beta': 'rgba(13, 110, 253, 0.8)',   # Azul (Bootstrap primary)
+        'gamma': 'rgba(25, 135, 84, 0.8)'    # Verde (Bootstrap success)
+    }
+
+    # Média dos sinais de todos os canais para cada banda (pré-calculada)
+    ensure_band_waveforms(eeg_data)
+
+    # Adicionar linhas para cada banda (nível de detalhe adequado ao registro inteiro)
+    for banda in BANDAS:
+        window = band_window(eeg_data, banda)
+        fig.add_trace(go.Scatter(
+            **time_axis(eeg_data, window),
+            y=np.asarray(window['y'], dtype=np.float32),
+            name=banda.capitalize(),
+            line=dict(color=colors[banda], width=2)
+        ))
+
+    # Configurar layout
+    fig.update_layout(
+        title='Sinais das Ondas Cerebrais',
+        xaxis_title='Tempo',
+        xaxis_type='date',
+        yaxis_title='Amplitude (Normalizada)',
+        height=400,
+        margin=dict(l=50, r=50, t=80, b=50),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        )
+    )
+    return fig
+
+
+def power_figure(analyses, bandas):
+    """Gráfico de potências por canal de cada banda."""
+    fig_power = px.line(title='Distribuição de Potência por Canal')
+    for banda in bandas:
+        values = [getattr(a, f'{banda}_power') for a in analyses]
+        fig_power.add_scatter(
+            x=[a.channel_name for a in analyses],
+            y=values,
+            name=banda.capitalize()
+        )
+    fig_power.update_layout(height=400)
+    return fig_power
+
+
+def spectrogram_figure(eeg_data):
+    """Espectrograma médio entre canais (calculado na ingestão), ou None se indisponível."""
+    ensure_average_spectrogram(eeg_data)
+    spectrogram = eeg_data.get_spectrogram()
+    if not spectrogram:
+        return None
+
+    fig = go.Figure(data=go.Heatmap(
+        z=spectrogram['db'].decode(),  # Gravado em dB
+        x=np.asarray(spectrogram['time'], dtype=np.float32),
+        y=np.asarray(spectrogram['freq'], dtype=np.float32),
+        colorscale=spectrogram['config']['cmap']
+    ))
+
+    fig.update_layout(
+        title='Espectrograma Médio',
+        xaxis_title='Tempo (s)',
+        yaxis_title='Frequência (Hz)',
+        height=400
+    )
+    return fig
+
+
+def topomap_positions(analyses, montage):
+    """
+    Análises dos canais com posição na montagem e as coordenadas normalizadas
+    dos seus eletrodos, na mesma ordem. Canais fora da montagem não entram no mapa.
+    """
+    placed = [(a, montage.position(a.channel_name)) for a in analyses]
+    placed = [(a, position) for a, position in placed if position is not None]
+    return [a for a, _ in placed], [position for _, position in placed]
+
+
+def topomap_figure(analyses, banda, montage):
+    """
+    Gera mapa topográfico 2D da atividade cerebral para uma banda específica.
+    Retorna None se a montagem não posiciona ao menos 3 canais do registro.
+
+    Parâmetros:
+        analyses (QuerySet): Análises de canal para extrair dados
+        banda (str): Banda cerebral a ser visualizada (ex: 'Alpha')
+        montage (MontageLayout): Posições dos eletrodos (EEGData.montage_layout)
+    """
+    analyses, positions = topomap_positions(analyses, montage)
+    if len(positions) < 3:
+        return None
+
+    # Extração e processamento dos dados
+    z = np.array([getattr(a, f'{banda.lower()}_power') for a in analyses])
+
+    # Interpolação para superfície suave (pesos pré-calculados por montagem, ver topomap.py)
+    weights = get_topomap_weights(positions)
+    zi = weights.render(z)
+
+    # Criação do heatmap
+    fig = px.imshow(
+            zi.astype(np.float32),
+            x=weights.axis,
+            y=weights.axis,
+            color_continuous_scale='Viridis',
+            title=f'Mapa de Atividade {banda.capitalize()}'
+        )
+    fig.update_layout(height=400)
+    return fig
+
+
+def topomap_weights_payload(analyses, montage):
+    """
+    Pesos de interpolação (CSR) para renderizar mapas no navegador, ex: a
+    animação das potências por época (um produto matriz-vetor por quadro).
+    Retorna None se a montagem não posiciona ao menos 3 canais do registro.
+    """
+    analyses, positions = topomap_positions(analyses, montage)
+    if len(positions) < 3:
+        return None
+    weights = get_topomap_weights(positions)
+    matrix = weights.weights
+    return {
+        'channels': [a.channel_name for a in analyses],
+        'grid_size': weights.grid_size,
+        'axis': weights.axis.tolist(),
+        'mask': typed_array(weights.mask.astype(np.uint8)),
+        'data': typed_array(matrix.data.astype(np.float32)),
+        'indices': typed_array(matrix.indices.astype(np.int32)),
+        'indptr': typed_array(matrix.indptr.astype(np.int32)),
+    }
+
+
+def channel_figure(analysis, signals):
+    """Sinais do canal (original e filtrados) em subplots, com nível de detalhe inicial."""
+    # Criar gráfico de filtros
+    fig = make_subplots(
+        rows=len(signals), cols=1,
+        subplot_titles=list(signals)
+    )
+    eeg_data = analysis.eeg_data
+
+    for i, (name, kind) in enumerate(signals.items(), 1):
+        window = channel_window_data(analysis, kind)
+        fig.add_trace(
+            go.Scatter(
+                **time_axis(eeg_data, window),
+                y=np.asarray(window['y'], dtype=np.float32),
+                name=name,
+                line=dict(width=1)
+            ),
+            row=i, col=1
+        )
+
+    fig.update_layout(height=1200, showlegend=False)
+    fig.update_xaxes(title_text='Tempo Decorrido (s)', type='date')
+    return fig
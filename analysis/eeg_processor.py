@@ -1,119 +1,319 @@
 """
     Processa e analisa dados de EEG de um arquivo associado ao objeto eeg_data.
-    Este método realiza as seguintes etapas para cada canal de EEG:
-    1. Lê os dados brutos do arquivo CSV associado.
-    2. Ajusta o timestamp para o formato datetime apropriado.
-    3. Aplica filtros digitais (highpass, lowpass, bandpass, notch) ao sinal.
-    4. Calcula o espectrograma do sinal usando STFT.
-    5. Calcula a potência média em diferentes bandas de frequência (delta, theta, alpha, beta, gamma).
-    6. Salva os resultados processados e métricas em registros do modelo EEGChannelAnalysis.
-    7. Atualiza o status do objeto eeg_data para indicar que o processamento foi concluído.
+    Este método realiza as seguintes etapas sobre a matriz de canais de EEG:
+    1. Lê o arquivo CSV associado em blocos de tamanho fixo (memória limitada para qualquer duração),
+       apenas os canais da montagem do registro (ver montages.py).
+    2. Registra o instante inicial (o eixo de tempo é derivado da taxa de amostragem) e valida os
+       timestamps (falhas, retrocessos e jitter, ver timing.py) sem convertê-los em datas.
+    3. Aplica filtros digitais (highpass, lowpass, bandpass, notch) a todos os canais de uma vez (FilterBank),
+       mantendo o estado dos filtros entre blocos para resultados idênticos à filtragem única.
+    4. Calcula o espectrograma dos canais usando STFT, por faixas de janelas, e o grava em dB,
+       recortado à faixa exibida e quantizado em uint8 (ver spectrogram.py).
+    5. Estima a PSD de todos os canais (Welch ou multitaper, ver spectral.py) e integra dela a potência
+       absoluta e relativa de cada banda (delta, theta, alpha, beta, gamma e EEG_BANDS), também por
+       épocas deslizantes (ver epochs.py); grava a forma de onda média entre canais de cada banda,
+       filtrando apenas a média dos canais.
+    6. Grava os sinais brutos em um arquivo contíguo por canal com cabeçalho (recording_file), lido por
+       janelas com memory-map, e os filtrados em arrays binários (signal_store), com pirâmides min/max
+       para os gráficos (lod), e o espectrograma médio entre canais exibido no dashboard.
+    7. Grava as métricas de todos os canais (bulk_create), atualiza o status do objeto eeg_data e as
+       estatísticas da página inicial em uma única transação: uma falha não deixa registros processados pela metade.
+       Os arquivos das etapas 6-7 são gravados em um diretório temporário que substitui o do registro
+       apenas após o commit (transaction.on_commit): um reprocessamento com falha mantém os anteriores.
     Parâmetros:
         eeg_data (EEGData): Instância contendo informações do arquivo de EEG e metadados necessários para o processamento.
+        progress (callable, opcional): Chamado como progress(canais_concluidos, total_de_canais) após cada canal.
+        chunksize (int, opcional): Linhas do CSV por bloco (padrão: settings.EEG_INGEST_CHUNKSIZE).
+        executor (Executor, opcional): Pool para distribuir as etapas por canal (ver batch.py).
+        reprocess (bool): Substitui as análises existentes do registro (na mesma transação).
     Observações:
-        - Requer que as funções de filtro digital (butter_highpass, butter_lowpass, butter_bandpass, iirnotch) estejam implementadas.
-        - Utiliza pandas, numpy, scipy.signal e json para manipulação e análise dos dados.
-        - Os resultados são salvos no banco de dados via o modelo EEGChannelAnalysis.
+        - Os filtros são projetados uma vez por taxa de amostragem e aplicados em seções SOS (ver filter_bank.py).
+        - Utiliza pandas, numpy e scipy.signal para manipulação e análise dos dados.
+        - As métricas são salvas no banco de dados via o modelo EEGChannelAnalysis; os sinais ficam em EEG_STORE_ROOT.
+        - As etapas (parse, timestamps, filter, band_power, lod, stft, serialization, db) são marcadas com
+          instrumentation.stage e medidas pelos benchmarks (`manage.py benchmark_ingest`); cada processamento
+          registra seu perfil em log estruturado e nos totais de /metrics, opcionalmente com cProfile
+          (EEG_PROFILE_JOBS, ver profiling.py).
     """
+import json
+import os
 import pandas as pd
 import numpy as np
-import json
-from scipy.signal import butter, lfilter, iirnotch , stft
-from .models import EEGChannelAnalysis
+from django.conf import settings
+from django.db import transaction
+from scipy.signal import ShortTimeFFT, get_window
+from .filter_bank import BANDAS, get_filter_bank
+from .instrumentation import count_bytes, stage, timed_iter
+from .lod import save_pyramid
+from .montages import DEFAULT_MONTAGE
+from .profiling import profile_ingest
+from .models import EEGChannelAnalysis, SPECTROGRAM_CONFIG, STATUS_DONE
+from .signal_store import RecordingStore, band_key, signal_key
+from .statistics import channel_totals, rows_totals, update_statistics
+from .timing import TimingCheck
+from .epochs import EpochSeries
+from .spectrogram import (
+    AVERAGE_KEY, SPECTROGRAM_BLOCK, SpectrogramWriter, frequency_mask, load_spectrogram, save_average, to_db
+)
+from .spectral import EpochBandPowers, PSDAccumulator, band_metrics, epoch_options, psd_options
 
 
 
-def butter_highpass(cutoff, fs, order=4):
-    nyq = 0.5 * fs
-    normal_cutoff = cutoff / nyq
-    b, a = butter(order, normal_cutoff, btype='high', analog=False)
-    return b, a
+SPECTROGRAM_NPERSEG = 256
 
-def butter_lowpass(cutoff, fs, order=4):
-    nyq = 0.5 * fs
-    normal_cutoff = cutoff / nyq
-    b, a = butter(order, normal_cutoff, btype='low', analog=False)
-    return b, a
+def read_columns(path):
+    return list(pd.read_csv(path, nrows=0).columns)
 
-def butter_bandpass(lowcut, highcut, fs, order=4):
-    nyq = 0.5 * fs
-    low = lowcut / nyq
-    high = highcut / nyq
-    b, a = butter(order, [low, high], btype='band')
-    return b, a
+def count_samples(path, chunksize):
+    """Conta as amostras do CSV lendo apenas a primeira coluna, bloco a bloco."""
+    return sum(len(chunk) for chunk in pd.read_csv(path, usecols=[0], dtype=np.float64, chunksize=chunksize))
 
-def process_eeg_data(eeg_data):
-    df = pd.read_csv(eeg_data.original_file.path)
-    fs = eeg_data.sampling_rate
-    
-    # Ajustar o timestamp para o formato correto
-    df['Timestamp'] = df['Timestamp'] / 1000  # Converter de milissegundos para segundos
-    df['Timestamp'] = pd.to_datetime(df['Timestamp'], unit='s')
-    df['Timestamp'] = df['Timestamp'].dt.strftime('%Y-%m-%d %H:%M:%S.%f')
+def select_channels(montage, columns):
+    """
+    Canais do arquivo (colunas após o timestamp) que pertencem à montagem.
+    Na montagem padrão, arquivos com outros nomes de canais mantêm o
+    comportamento original (as 8 primeiras colunas).
+    """
+    channels = montage.select(columns)
+    if not channels and montage.name == DEFAULT_MONTAGE:
+        channels = columns[:8]
+    if not channels:
+        raise ValueError(f'Nenhum canal do arquivo pertence à montagem {montage.name}')
+    return channels
+
+def iter_chunks(path, timestamp_column, channels, chunksize):
+    """Lê o CSV em blocos de `chunksize` linhas com tipos explícitos (float32 nos canais)."""
+    dtypes = {timestamp_column: np.float64, **{channel: np.float32 for channel in channels}}
+    return pd.read_csv(
+        path,
+        usecols=[timestamp_column, *channels],
+        dtype=dtypes,
+        chunksize=chunksize
+    )
+
+def spectrogram_transform(fs, n_samples):
+    """
+    STFT equivalente a `scipy.signal.stft(x, fs, nperseg=256)` (em magnitude) que
+    pode ser calculada por faixas de janelas. Retorna (ShortTimeFFT, primeira
+    janela, fim das janelas): as janelas que tocam o sinal, segundo o próprio
+    ShortTimeFFT (p_min/p_max). O scipy.signal.stft pode acrescentar uma última
+    janela apenas com o preenchimento de zeros, que é omitida.
+    """
+    nperseg = min(SPECTROGRAM_NPERSEG, n_samples)
+    hop = nperseg - nperseg // 2  # Passo do scipy.signal.stft (noverlap = nperseg // 2)
+    transform = ShortTimeFFT(get_window('hann', nperseg), hop=hop, fs=fs, scale_to='magnitude')
+    return transform, transform.p_min, transform.p_max(n_samples)
+
+def finish_channel(store_root, channel, kinds, fs, n_samples):
+    """
+    Gera as pirâmides min/max e o espectrograma de um canal já gravado.
+    Função de módulo (serializável) para execução em um pool de processos.
+    """
+    store = RecordingStore(store_root)
+    # Pirâmide min/max para os gráficos com nível de detalhe
+    with stage('lod'):
+        for kind in kinds:
+            save_pyramid(store, signal_key(channel, kind), store.load(signal_key(channel, kind)))
     
-    for channel in df.columns[1:9]:
-        data = df[channel].values
-        timestamp = df['Timestamp'].values
-        
-        # Aplicar filtros
+    # Espectrograma em dB, apenas nas frequências exibidas, quantizado por faixa de janelas
+    with stage('stft'):
+        transform, first, end = spectrogram_transform(fs, n_samples)
+        mask = frequency_mask(transform.f, SPECTROGRAM_CONFIG)
+        raw = store.load(signal_key(channel, 'raw'))
+        n_windows = end - first
+        writer = SpectrogramWriter(store, signal_key(channel, 'spectrogram'), int(mask.sum()), n_windows)
+        for p0 in range(0, n_windows, SPECTROGRAM_BLOCK):
+            p1 = min(p0 + SPECTROGRAM_BLOCK, n_windows)
+            writer.write(p0, to_db(np.abs(transform.stft(raw, p0=first + p0, p1=first + p1)[mask])))
+        writer.close()
+    return channel
 
-        b, a = iirnotch(60, 30, fs)
-        notch = lfilter(b, a, data)
+def process_eeg_data(eeg_data, progress=None, chunksize=None, executor=None, reprocess=False):
+    if not reprocess and EEGChannelAnalysis.objects.filter(eeg_data=eeg_data).exists():
+        raise ValueError(f'EEG {eeg_data.pk} já possui análises; use reprocess=True para substituí-las')
+    with profile_ingest(eeg_data):
+        # Arquivos gravados à parte e publicados só após o commit das análises (signal_store.replace)
+        staging = eeg_data.store.staging()
+        try:
+            ingest(eeg_data, staging, progress, chunksize, executor, reprocess)
+        finally:
+            staging.clear()  # Sem efeito se já publicado
 
-        b, a = butter_highpass(0.5, fs)
-        highpass = lfilter(b, a, data)
-        
-        b, a = butter_lowpass(40, fs)
-        lowpass = lfilter(b, a, data)
-        
-        b, a = butter_bandpass(1, 30, fs)
-        bandpass = lfilter(b, a, data)
-        
-        b, a = iirnotch(60, 30, fs)
-        notch = lfilter(b, a, data)
+def ingest(eeg_data, store, progress, chunksize, executor, reprocess):
+    """Etapas de process_eeg_data (ver a descrição no início do módulo), gravando em `store`."""
+    path = eeg_data.original_file.path
+    fs = eeg_data.sampling_rate
+    chunksize = chunksize or getattr(settings, 'EEG_INGEST_CHUNKSIZE', 65536)
+    
+    with stage('parse'):
+        columns = read_columns(path)
+        timestamp_column, channels = columns[0], select_channels(eeg_data.montage_layout, columns[1:])
+        n_samples = count_samples(path, chunksize)
+        count_bytes(os.path.getsize(path))
+    bank = get_filter_bank(fs)
+    kinds = ('raw', *bank.filters)
+    
+    # Arquivos de saída criados com o tamanho final e preenchidos bloco a bloco: os
+    # canais brutos no arquivo do registro (ver recording_file.py), os filtrados em .npy
+    recording = store.create_recording(fs, channels, n_samples)
+    outputs = {
+        channel: {kind: store.create(signal_key(channel, kind), (n_samples,)) for kind in bank.filters}
+        for channel in channels
+    }
+    band_outputs = {banda: store.create(band_key(banda), (n_samples,)) for banda in BANDAS}
+    
+    stream = bank.stream(len(channels))
+    # Os filtros são lineares: a média das bandas filtradas é a banda da média dos canais
+    band_stream = bank.stream(1)
+    options, epoch = psd_options(), epoch_options()
+    epochs = EpochBandPowers(
+        fs, len(channels), method=options['method'], bandwidth=options['bandwidth'], **epoch
+    )
+    # Com os parâmetros padrão as épocas são os próprios segmentos da PSD (uma única FFT)
+    if (epoch['window'], epoch['overlap']) == (options['segment'], 0.5):
+        psd = epochs
+    else:
+        psd = PSDAccumulator(fs, len(channels), **options)
+    timing = TimingCheck(fs)
+    offset = 0
+    for chunk in timed_iter(iter_chunks(path, timestamp_column, channels, chunksize), 'parse'):
+        with stage('timestamps'):
+            if offset == 0:
+                # Apenas o instante inicial é guardado; o eixo de tempo é derivado de fs
+                # Timestamp em milissegundos
+                eeg_data.start_time = pd.to_datetime(chunk[timestamp_column].iloc[0], unit='ms', utc=True).to_pydatetime()
+                recording.start_ms = chunk[timestamp_column].iloc[0]
+            timing.push(chunk[timestamp_column].to_numpy())
         
-        # Calcular potências
-        bandas = {
-            'delta': (0.5, 4),
-            'theta': (4, 8),
-            'alpha': (8, 13),
-            'beta': (13, 30),
-            'gamma': (30, 40)
-        }
-
-        # Calcula o espectrograma
-        f,t, Zxx = stft(data, fs=fs, nperseg=256)
-            
-        # Normaliza e prepara os dados
-        spectrogram = {
-                'freq': f.tolist(),
-                'time': t.tolist(),
-                'magnitude': np.abs(Zxx).tolist(),
-                'config': {
-                    'fmin': 0,
-                    'fmax': 40,
-                    'cmap': 'Viridis'
-                }
-            }
+        data = chunk[channels].to_numpy(dtype=np.float64)  # (n_amostras x n_canais)
+        end = offset + len(data)
         
-        power_metrics = {}
-        for banda, (low, high) in bandas.items():
-            b, a = butter_bandpass(low, high, fs)
-            filtered = lfilter(b, a, data)
-            power_metrics[f'{banda}_power'] = np.mean(filtered**2)
+        # Aplicar filtros: uma chamada vetorizada por filtro, com estado entre blocos
+        with stage('filter'):
+            filtered = stream.apply(data)
+            recording.write(offset, data)
+            for index, channel in enumerate(channels):
+                for kind in bank.filters:
+                    outputs[channel][kind][offset:end] = filtered[kind][:, index]
         
-        # Criar registro
-        EEGChannelAnalysis.objects.create(
+        # PSD acumulada (uma FFT por segmento, todos os canais) e média entre
+        # canais de cada banda (gráfico de ondas cerebrais)
+        with stage('band_power'):
+            epochs.push(data)
+            if psd is not epochs:
+                psd.push(data)
+        with stage('filter'):
+            for banda, signal in band_stream.iter_bands(data.mean(axis=1, keepdims=True)):
+                band_outputs[banda][offset:end] = signal[:, 0]
+        offset = end
+    
+    if offset != n_samples:
+        raise ValueError(f'Esperadas {n_samples} amostras, lidas {offset}')
+    with stage('serialization'):
+        recording.close()
+        for output in [*band_outputs.values(), *(o for channel in outputs.values() for o in channel.values())]:
+            output.flush()
+        del outputs, band_outputs
+        count_bytes(store.nbytes())
+    
+    with stage('lod'):
+        for banda in BANDAS:
+            save_pyramid(store, band_key(banda), store.load(band_key(banda)))
+    
+    # Métricas por banda integradas da PSD
+    with stage('band_power'):
+        freq, density = psd.result()
+        store.save('psd_freq', freq)
+        store.save('psd', density)  # (n_frequências x n_canais)
+        metrics = band_metrics(freq, density)
+        EpochSeries.save(store, channels, epochs)
+    
+    # Espectrograma calculado por faixas de janelas a partir do sinal gravado
+    transform, first, end = spectrogram_transform(fs, n_samples)
+    store.save('spectrogram_freq', transform.f[frequency_mask(transform.f, SPECTROGRAM_CONFIG)])
+    store.save('spectrogram_time', transform.t(n_samples, first, end))
+    
+    # Etapas por canal (pirâmides e espectrograma), opcionalmente em paralelo:
+    # os workers recebem apenas o caminho do armazenamento e abrem os sinais
+    # por memory-map, sem serializar os arrays entre processos
+    tasks = [(str(store.root), channel, kinds, fs, n_samples) for channel in channels]
+    if executor is not None:
+        finished = executor.map(finish_channel, *zip(*tasks))
+    else:
+        finished = (finish_channel(*task) for task in tasks)
+    
+    rows = []
+    for index, channel in enumerate(timed_iter(finished, 'channels')):
+        rows.append(EEGChannelAnalysis(
             eeg_data=eeg_data,
             channel_name=channel,
-            raw_signal=json.dumps({'x': timestamp.tolist(), 'y': data.tolist()}),
-            highpass=json.dumps({'x': timestamp.tolist(), 'y': highpass.tolist()}),
-            lowpass=json.dumps({'x': timestamp.tolist(), 'y': lowpass.tolist()}),
-            bandpass=json.dumps({'x': timestamp.tolist(), 'y': bandpass.tolist()}),
-            notch=json.dumps({'x': timestamp.tolist(), 'y': notch.tolist()}),
-            spectrogram_data=json.dumps(spectrogram),
-            **power_metrics
-        )
+            n_samples=n_samples,
+            band_powers={
+                banda: {name: float(values[index]) for name, values in metric.items()}
+                for banda, metric in metrics.items()
+            },
+            **{f'{banda}_power': float(metrics[banda]['absolute'][index]) for banda in BANDAS}
+        ))
+        if progress:
+            progress(index + 1, len(channels))
+    with stage('stft'):
+        save_channel_average(store, channels)
     
-    eeg_data.processed = True
-    eeg_data.save()
\ No newline at end of file
+    # Todos os canais gravados de uma vez, em uma única transação
+    nested = transaction.get_connection().in_atomic_block
+    with stage('db'), transaction.atomic():
+        # A primeira instrução escreve: com vários workers no SQLite a transação espera pelo
+        # bloqueio de escrita (timeout) em vez de falhar ao promover a leitura de channel_totals
+        eeg_data.timing = timing.report()
+        eeg_data.save(update_fields=['timing', 'start_time'])
+        removed = (0, 0.0)
+        if reprocess:
+            previous = EEGChannelAnalysis.objects.filter(eeg_data=eeg_data)
+            removed = channel_totals(previous)
+            previous.delete()
+        EEGChannelAnalysis.objects.bulk_create(rows)
+        count_bytes(sum(len(json.dumps(row.band_powers)) for row in rows))
+        added = rows_totals(rows)
+        update_statistics(total_channels=added[0] - removed[0], total_power=added[1] - removed[1])
+        eeg_data.set_status(STATUS_DONE)
+        if not nested:
+            # Os arquivos novos substituem os anteriores apenas com as linhas já confirmadas
+            transaction.on_commit(lambda: eeg_data.store.replace(store))
+    if nested:
+        # Dentro de uma transação do chamador (benchmarks, testes) não há commit a aguardar
+        eeg_data.store.replace(store)
+
+def save_channel_average(store, channels):
+    """Grava o espectrograma médio entre canais (exibido no dashboard), se houver espectrogramas."""
+    if not store.exists('spectrogram_freq'):
+        return
+    freq = store.load('spectrogram_freq')
+    loaded = [load_spectrogram(store, signal_key(channel, 'spectrogram'), freq, SPECTROGRAM_CONFIG) for channel in channels]
+    loaded = [spectrogram for spectrogram in loaded if spectrogram is not None]
+    if loaded:
+        save_average(store, loaded[0][0], [spectrogram for _, spectrogram in loaded])
+
+def ensure_average_spectrogram(eeg_data):
+    """
+    Garante que o espectrograma médio exista no armazenamento. Registros
+    processados antes do cálculo na ingestão são completados a partir dos
+    espectrogramas dos canais (apenas na primeira visualização).
+    """
+    store = eeg_data.store
+    if not store.exists(AVERAGE_KEY):
+        save_channel_average(store, eeg_data.eegchannelanalysis_set.values_list('channel_name', flat=True))
+
+def ensure_band_waveforms(eeg_data):
+    """
+    Garante que as formas de onda médias por banda existam no armazenamento.
+    Registros processados antes do cálculo na ingestão são completados a partir
+    dos sinais brutos gravados (apenas na primeira visualização).
+    """
+    store = eeg_data.store
+    if all(store.exists(band_key(banda)) for banda in BANDAS):
+        return
+    channels = eeg_data.eegchannelanalysis_set.values_list('channel_name', flat=True)
+    data = np.mean([store.load(signal_key(channel, 'raw')) for channel in channels], axis=0, dtype=np.float64)
+    for banda, band_average in get_filter_bank(eeg_data.sampling_rate).iter_bands(data):
+        store.save(band_key(banda), band_average)
+        save_pyramid(store, band_key(banda), band_average)
@@ -0,0 +1,80 @@
+# analysis/epochs.py
+"""
+Série temporal das potências por banda em épocas deslizantes.
+
+Na ingestão (`EpochBandPowers`, em spectral.py) cada registro ganha no
+armazenamento a matriz `epoch_powers` (n_épocas x n_canais x n_bandas, float32),
+os centros das épocas em `epoch_times` (segundos desde o início, crescentes) e
+os nomes dos canais e bandas de cada eixo. Uma faixa de tempo é localizada por
+busca binária nos tempos e lida do arquivo mapeado em memória, sem carregar o
+registro inteiro.
+
+A potência relativa de uma época é, como a do registro (spectral.band_metrics),
+a fração da potência em 0.5-40 Hz: a soma das bandas de BANDAS, que cobrem
+esse intervalo sem sobreposição.
+"""
+import numpy as np
+
+from .filter_bank import BANDAS
+
+
+class EpochSeries:
+    """Potências por época de um registro (leitura por faixa de tempo)."""
+
+    def __init__(self, store):
+        self.times = store.load('epoch_times')
+        self.powers = store.load('epoch_powers')
+        self.channels = [str(name) for name in store.load('epoch_channels', mmap=False)]
+        self.bands = [str(name) for name in store.load('epoch_bands', mmap=False)]
+
+    @classmethod
+    def for_recording(cls, eeg_data):
+        """Série do registro, ou None se ele foi processado antes das épocas."""
+        store = eeg_data.store
+        if not store.exists('epoch_powers'):
+            return None
+        return cls(store)
+
+    @staticmethod
+    def save(store, channels, accumulator):
+        """Grava as épocas de um EpochBandPowers já alimentado com o registro inteiro."""
+        times, powers = accumulator.epochs()
+        store.save('epoch_times', times, dtype=np.float64)
+        store.save('epoch_powers', powers)
+        store.save('epoch_channels', channels, dtype=str)
+        store.save('epoch_bands', list(accumulator.bands), dtype=str)
+
+    def window(self, t0=None, t1=None, channels=None, bands=None, relative=False):
+        """
+        Potências das épocas com centro em [t0, t1).
+
+        Parâmetros:
+            t0, t1 (float, opcional): Limites em segundos desde o início (padrão: registro inteiro)
+            channels (list, opcional): Canais desejados (padrão: todos)
+            bands (list, opcional): Bandas desejadas (padrão: todas)
+            relative (bool): Potência relativa (fração de 0.5-40 Hz em cada época) em vez da absoluta
+
+        Retorna:
+            dict: 't' (segundos), 'channels', 'bands' e 'powers' (n_épocas x n_canais x n_bandas)
+        """
+        i0 = 0 if t0 is None else int(np.searchsorted(self.times, t0, side='left'))
+        i1 = len(self.times) if t1 is None else int(np.searchsorted(self.times, t1, side='left'))
+        i1 = max(i1, i0)
+        channels = channels or self.channels
+        bands = bands or self.bands
+        unknown = (set(channels) - set(self.channels)) | (set(bands) - set(self.bands))
+        if unknown:
+            raise KeyError(f'Canais ou bandas desconhecidos: {sorted(unknown)}')
+        channel_index = [self.channels.index(name) for name in channels]
+        band_index = [self.bands.index(name) for name in bands]
+        powers = np.asarray(self.powers[i0:i1])
+        if relative:
+            total = powers[:, :, [self.bands.index(banda) for banda in BANDAS]].sum(axis=2, keepdims=True)
+            powers = np.nan_to_num(powers / np.where(total > 0, total, np.nan))
+        powers = powers[:, channel_index][:, :, band_index]
+        return {
+            't': np.asarray(self.times[i0:i1]),
+            'channels': channels,
+            'bands': bands,
+            'powers': powers,
+        }
@@ -0,0 +1,107 @@
+# analysis/figure_cache.py
+"""
+Cache das figuras dos dashboards.
+
+Os dados de um registro não mudam depois do processamento, então as figuras
+geradas (JSON do Plotly, ver charts.py) são guardadas no cache `settings.EEG_FIGURE_CACHE`
+com chave (registro, versão do processamento, visão, parâmetros). Reprocessar
+um registro incrementa `EEGData.processing_version`, o que invalida todas as
+suas entradas; as antigas saem do cache pelo limite de tamanho (MAX_ENTRIES).
+
+`recording_condition` adiciona ETag/Last-Modified às visões de um registro:
+recarregar a página sem mudanças no registro responde 304 sem gerar nada.
+"""
+import hashlib
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from .models import EEGData, STATUS_DONE
+
+
+def figure_cache():
+    return caches[getattr(settings, 'EEG_FIGURE_CACHE', 'default')]
+
+
+def figure_key(eeg_data, view, **params):
+    """Chave de uma figura, ex: 'eeg-figure:12:v3:topomap:<hash dos parâmetros>'."""
+    digest = hashlib.md5(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+    return f'eeg-figure:{eeg_data.pk}:v{eeg_data.processing_version}:{view}:{digest}'
+
+
+def cached_figure(eeg_data, view, build, **params):
+    """
+    Retorna a figura do cache ou a gera com `build()` e a guarda.
+
+    Parâmetros:
+        eeg_data (EEGData): Registro da figura (define a versão do processamento)
+        view (str): Nome da figura/visão
+        build (callable): Gera o conteúdo (ex: charts.chart_json) quando ausente
+        **params: Parâmetros que alteram a figura (ex: banda, canal)
+    """
+    cache = figure_cache()
+    key = figure_key(eeg_data, view, **params)
+    content = cache.get(key)
+    if content is None:
+        content = build()
+        cache.set(key, content)
+    return content
+
+
+def recording_state(request, eeg_id):
+    """
+    Campos do registro que definem ETag/Last-Modified (uma consulta por requisição).
+    Registros ainda não processados não são validados (a página muda com o progresso).
+    """
+    states = request.__dict__.setdefault('_eeg_states', {})
+    if eeg_id not in states:
+        states[eeg_id] = EEGData.objects.filter(pk=eeg_id).values(
+            'status', 'processing_version', 'processed_at', 'uploaded_at', 'age', 'sex'
+        ).first()
+    state = states[eeg_id]
+    return state if state and state['status'] == STATUS_DONE else None
+
+
+def recording_condition(get_eeg_id):
+    """
+    Decorador de visões de um registro com ETag e Last-Modified.
+
+    Parâmetros:
+        get_eeg_id (callable): (request, *args, **kwargs) -> id do EEGData, ou None
+    """
+    def state_for(request, *args, **kwargs):
+        # ETag e Last-Modified resolvem o registro uma única vez por requisição
+        if '_eeg_condition_id' not in request.__dict__:
+            request._eeg_condition_id = get_eeg_id(request, *args, **kwargs)
+        eeg_id = request._eeg_condition_id
+        return (eeg_id, recording_state(request, eeg_id)) if eeg_id else (None, None)
+
+    def etag(request, *args, **kwargs):
+        eeg_id, state = state_for(request, *args, **kwargs)
+        if state is None:
+            return None
+        # A página também depende do usuário (navegação) e dos parâmetros da URL
+        parts = [eeg_id, state, request.user.pk, request.get_full_path()]
+        return hashlib.md5(json.dumps(parts, default=str).encode()).hexdigest()
+
+    def last_modified(request, *args, **kwargs):
+        _, state = state_for(request, *args, **kwargs)
+        if state is None:
+            return None
+        return state['processed_at'] or state['uploaded_at']
+
+    def decorator(view):
+        conditional = condition(etag_func=etag, last_modified_func=last_modified)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional(request, *args, **kwargs)
+            # O navegador guarda a resposta, mas revalida a cada acesso
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
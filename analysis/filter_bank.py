@@ -0,0 +1,113 @@
+# analysis/filter_bank.py
+"""
+Banco de filtros do processamento EEG.
+
+Todos os filtros são projetados uma única vez por taxa de amostragem (via
+filter_registry), em seções de segunda ordem (SOS, numericamente estáveis em
+ordens altas), e aplicados à matriz completa (n_amostras x n_canais) com
+`axis=0`: cada filtro custa uma única chamada vetorizada, independente do
+número de canais.
+"""
+import numpy as np
+from scipy.signal import sosfilt
+
+from .filter_registry import design_filter
+
+# Faixas de frequência por banda (Hz)
+BANDAS = {
+    'delta': (0.5, 4),
+    'theta': (4, 8),
+    'alpha': (8, 13),
+    'beta': (13, 30),
+    'gamma': (30, 40)
+}
+
+NOTCH_FREQ = 60
+NOTCH_Q = 30
+HIGHPASS_CUTOFF = 0.5
+LOWPASS_CUTOFF = 40
+BANDPASS_RANGE = (1, 30)
+
+
+class FilterBank:
+    """
+    Coeficientes SOS de todos os filtros para uma taxa de amostragem.
+
+    Atributos:
+        filters (dict): Filtros de visualização ('notch', 'highpass', 'lowpass', 'bandpass')
+        bands (dict): Passa-banda de cada banda cerebral (BANDAS)
+    """
+
+    def __init__(self, fs, order=4):
+        self.fs = fs
+        self.order = order
+        self.filters = {
+            'notch': design_filter('notch', NOTCH_FREQ, fs, q=NOTCH_Q),
+            'highpass': design_filter('highpass', HIGHPASS_CUTOFF, fs, order),
+            'lowpass': design_filter('lowpass', LOWPASS_CUTOFF, fs, order),
+            'bandpass': design_filter('bandpass', BANDPASS_RANGE, fs, order),
+        }
+        self.bands = {
+            banda: design_filter('bandpass', (low, high), fs, order)
+            for banda, (low, high) in BANDAS.items()
+        }
+
+    def apply(self, data, dtype=np.float32):
+        """
+        Aplica os filtros de visualização à matriz (n_amostras x n_canais).
+
+        Retorna:
+            dict: nome do filtro -> matriz filtrada (mesmo formato de `data`)
+        """
+        return {
+            name: sosfilt(sos, data, axis=0).astype(dtype, copy=False)
+            for name, sos in self.filters.items()
+        }
+
+    def iter_bands(self, data):
+        """
+        Gera (banda, matriz filtrada) para cada banda cerebral. As bandas são
+        produzidas uma a uma para que apenas uma matriz fique em memória.
+        """
+        for banda, sos in self.bands.items():
+            yield banda, sosfilt(sos, data, axis=0)
+
+    def stream(self, n_channels):
+        """Filtragem bloco a bloco com estado persistente (ver StreamingFilter)."""
+        return StreamingFilter(self, n_channels)
+
+
+class StreamingFilter:
+    """
+    Aplica o banco de filtros a blocos consecutivos do sinal, carregando o estado
+    interno (zi) de cada filtro entre blocos: o resultado é idêntico ao da
+    filtragem do sinal inteiro de uma só vez.
+    """
+
+    def __init__(self, bank, n_channels):
+        self.bank = bank
+        self.filter_state = {
+            name: np.zeros((sos.shape[0], 2, n_channels)) for name, sos in bank.filters.items()
+        }
+        self.band_state = {
+            banda: np.zeros((sos.shape[0], 2, n_channels)) for banda, sos in bank.bands.items()
+        }
+
+    def apply(self, data, dtype=np.float32):
+        """Equivalente a FilterBank.apply para o próximo bloco (n_amostras x n_canais)."""
+        filtered = {}
+        for name, sos in self.bank.filters.items():
+            output, self.filter_state[name] = sosfilt(sos, data, axis=0, zi=self.filter_state[name])
+            filtered[name] = output.astype(dtype, copy=False)
+        return filtered
+
+    def iter_bands(self, data):
+        """Equivalente a FilterBank.iter_bands para o próximo bloco."""
+        for banda, sos in self.bank.bands.items():
+            output, self.band_state[banda] = sosfilt(sos, data, axis=0, zi=self.band_state[banda])
+            yield banda, output
+
+
+def get_filter_bank(fs, order=4):
+    """Banco de filtros para (fs, ordem); os coeficientes vêm do registro compartilhado."""
+    return FilterBank(fs, order)
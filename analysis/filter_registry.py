@@ -0,0 +1,101 @@
+# analysis/filter_registry.py
+"""
+Registro compartilhado de projetos de filtros digitais.
+
+`design_filter` memoriza os coeficientes (ba ou sos) por especificação
+(tipo, cortes, fs, ordem, Q) em um cache LRU limitado, de modo que o
+processamento e as views nunca reprojetam o mesmo filtro. Os contadores de
+acertos/falhas ficam disponíveis em `registry.stats()` para as métricas.
+"""
+import threading
+from collections import OrderedDict
+
+from scipy.signal import butter, iirnotch, tf2sos
+
+FILTER_TYPES = ('highpass', 'lowpass', 'bandpass', 'notch')
+OUTPUTS = ('ba', 'sos')
+
+
+class FilterRegistry:
+    """Cache LRU de coeficientes de filtros, seguro para uso entre threads."""
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def design(self, btype, cutoff, fs, order=4, output='sos', q=None):
+        """
+        Retorna os coeficientes do filtro, projetando-o apenas na primeira vez.
+
+        Parâmetros:
+            btype (str): 'highpass', 'lowpass', 'bandpass' ou 'notch'
+            cutoff (float | tuple): Frequência de corte (Hz) ou faixa (low, high) para passa-banda
+            fs (float): Taxa de amostragem (Hz)
+            order (int): Ordem do Butterworth (ignorada no notch)
+            output (str): 'ba' (tupla b, a) ou 'sos' (matriz de seções de segunda ordem)
+            q (float): Fator de qualidade do notch
+
+        Retorna:
+            tuple | np.ndarray: coeficientes compartilhados entre chamadas (não modificar)
+        """
+        if btype not in FILTER_TYPES:
+            raise ValueError(f'Tipo de filtro desconhecido: {btype}')
+        if output not in OUTPUTS:
+            raise ValueError(f'Formato de saída desconhecido: {output}')
+        if isinstance(cutoff, (list, tuple)):
+            cutoff = tuple(float(c) for c in cutoff)
+        else:
+            cutoff = float(cutoff)
+        key = (btype, cutoff, float(fs), order, output, q)
+
+        with self._lock:
+            if key in self._cache:
+                self.hits += 1
+                self._cache.move_to_end(key)
+                return self._cache[key]
+            self.misses += 1
+
+        coefficients = self._design(btype, cutoff, float(fs), order, output, q)
+
+        with self._lock:
+            self._cache[key] = coefficients
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return coefficients
+
+    @staticmethod
+    def _design(btype, cutoff, fs, order, output, q):
+        if btype == 'notch':
+            b, a = iirnotch(cutoff, q if q is not None else 30, fs)
+            coefficients = tf2sos(b, a) if output == 'sos' else (b, a)
+        else:
+            btype = {'highpass': 'high', 'lowpass': 'low', 'bandpass': 'band'}[btype]
+            coefficients = butter(order, cutoff, btype=btype, fs=fs, output=output)
+        return coefficients
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._cache),
+                'maxsize': self.maxsize,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+registry = FilterRegistry()
+
+
+def design_filter(btype, cutoff, fs, order=4, output='sos', q=None):
+    """Atalho para `registry.design` (ver FilterRegistry.design)."""
+    return registry.design(btype, cutoff, fs, order=order, output=output, q=q)
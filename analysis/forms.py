@@ -1,17 +1,32 @@
 # analysis/forms.py
 from django import forms
 from .models import EEGData
+from .montages import DEFAULT_MONTAGE, montage_choices
 
 class EEGUploadForm(forms.ModelForm):
     class Meta:
         model = EEGData
-        fields = ['original_file', 'sampling_rate', 'age', 'sex']  # Campos atualizados
+        fields = ['original_file', 'sampling_rate', 'age', 'sex', 'montage']  # Campos atualizados
         labels = {
             'original_file': 'Arquivo EEG (CSV)',
             'sampling_rate': 'Taxa de Amostragem (Hz)',
             'age': 'Idade do Paciente',
-            'sex': 'Sexo do Paciente'
+            'sex': 'Sexo do Paciente',
+            'montage': 'Montagem de Eletrodos'
         }
         widgets = {
             'sex': forms.Select(choices=EEGData.SEX_CHOICES)
-        }
\ No newline at end of file
+        }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Montagens padrão e cadastradas (consultadas a cada formulário)
+        self.fields['montage'] = forms.ChoiceField(
+            choices=montage_choices,
+            initial=DEFAULT_MONTAGE,
+            required=False,
+            label=self._meta.labels['montage']
+        )
+
+    def clean_montage(self):
+        return self.cleaned_data['montage'] or DEFAULT_MONTAGE
@@ -0,0 +1,119 @@
+# analysis/instrumentation.py
+"""
+Medição das etapas do processamento.
+
+`stage('nome')` marca um trecho de código (ex: a filtragem em
+process_eeg_data). Fora de uma medição ativa é praticamente gratuito; dentro
+de `measure_stages()` acumula por etapa o tempo (soma das chamadas), o número
+de chamadas, os bytes informados com `count_bytes` e, opcionalmente, o pico
+de memória alocada (tracemalloc, que também registra os arrays do NumPy).
+Etapas aninhadas são nomeadas pelo caminho, ex: 'channels.stft'.
+
+Usado pelos benchmarks (benchmarks.py, `manage.py benchmark_ingest`) e pelo
+perfil de cada processamento (profiling.py).
+"""
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+_state = threading.local()
+
+
+class StageTimings:
+    """Resultado de uma medição: {etapa: {'seconds', 'calls', 'bytes', 'peak_bytes'}}."""
+
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.stages = {}
+        self.peak_bytes = None  # Pico de toda a medição (com memory=True)
+        self.stack = []  # [nome, maior pico das etapas filhas, bytes]
+
+    def record(self, name, seconds, peak, nbytes=0):
+        entry = self.stages.setdefault(name, {'seconds': 0.0, 'calls': 0, 'bytes': 0, 'peak_bytes': None})
+        entry['seconds'] += seconds
+        entry['calls'] += 1
+        entry['bytes'] += nbytes
+        if peak is not None:
+            entry['peak_bytes'] = max(entry['peak_bytes'] or 0, peak)
+
+    def as_dict(self):
+        return {name: dict(entry) for name, entry in self.stages.items()}
+
+
+def current_timings():
+    return getattr(_state, 'timings', None)
+
+
+@contextmanager
+def measure_stages(memory=False):
+    """
+    Ativa a medição das etapas na thread atual.
+
+    Parâmetros:
+        memory (bool): Mede também o pico de memória de cada etapa (tracemalloc, mais lento)
+    """
+    timings = StageTimings(memory)
+    previous = current_timings()
+    _state.timings = timings
+    started = not tracemalloc.is_tracing() if memory else False
+    if started:
+        tracemalloc.start()
+    try:
+        yield timings
+    finally:
+        if memory:
+            timings.peak_bytes = max(timings.peak_bytes or 0, tracemalloc.get_traced_memory()[1])
+        if started:
+            tracemalloc.stop()
+        _state.timings = previous
+
+
+@contextmanager
+def stage(name):
+    """Marca uma etapa do processamento (ver measure_stages)."""
+    timings = current_timings()
+    if timings is None:
+        yield
+        return
+    path = '.'.join([frame[0] for frame in timings.stack] + [name])
+    parent_peak = None
+    if timings.memory:
+        # O pico é reiniciado para a etapa; o da etapa pai é restaurado na saída
+        parent_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.reset_peak()
+    frame = [name, 0, 0]
+    timings.stack.append(frame)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        timings.stack.pop()
+        peak = None
+        if timings.memory:
+            peak = max(tracemalloc.get_traced_memory()[1], frame[1])
+            if timings.stack:
+                timings.stack[-1][1] = max(timings.stack[-1][1], peak, parent_peak)
+            else:
+                timings.peak_bytes = max(timings.peak_bytes or 0, peak, parent_peak)
+        timings.record(path, elapsed, peak, frame[2])
+
+
+def count_bytes(nbytes):
+    """Soma bytes lidos ou gravados à etapa atual (sem medição ativa, nada é feito)."""
+    timings = current_timings()
+    if timings is not None and timings.stack:
+        timings.stack[-1][2] += int(nbytes)
+
+
+def timed_iter(iterable, name):
+    """Itera medindo o tempo de obter cada item como a etapa `name` (ex: leitura do CSV)."""
+    iterator = iter(iterable)
+    while True:
+        with stage(name):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
@@ -0,0 +1,211 @@
+# analysis/jobs.py
+"""
+Fila de processamento de arquivos EEG.
+
+A tabela ProcessingJob é a fonte de verdade: `enqueue_processing` cria a tarefa e
+avisa o backend configurado em `settings.EEG_JOB_BACKEND`, e o worker
+(`manage.py process_jobs`) reserva tarefas pendentes e executa `run_job`.
+Tarefas 'running' há mais de `settings.EEG_JOB_TIMEOUT` segundos (worker
+encerrado, sem memória ou reiniciado no meio do processamento) são reservadas
+novamente enquanto houver tentativas, ou marcadas como 'failed'.
+
+Backends disponíveis:
+    - DatabaseBackend (padrão): apenas grava a tarefa; os workers consultam a tabela.
+    - InlineBackend: executa a tarefa imediatamente (desenvolvimento e testes).
+Um broker local (Redis, RabbitMQ...) pode ser plugado implementando `enqueue(job)`
+para notificar os workers e `wait(timeout)` para bloqueá-los até a próxima tarefa.
+"""
+import logging
+import socket
+import os
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import (
+    ProcessingJob,
+    STATUS_QUEUED,
+    STATUS_RUNNING,
+    STATUS_DONE,
+    STATUS_FAILED,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class DatabaseBackend:
+    """Backend padrão: a própria tabela de tarefas é a fila."""
+
+    def enqueue(self, job):
+        pass
+
+    def wait(self, timeout):
+        time.sleep(timeout)
+
+
+class InlineBackend(DatabaseBackend):
+    """Executa a tarefa dentro da própria requisição (sem worker)."""
+
+    def enqueue(self, job):
+        job = claim_job(job.pk)
+        if job is not None:
+            run_job(job)
+
+
+def get_backend():
+    path = getattr(settings, 'EEG_JOB_BACKEND', 'analysis.jobs.DatabaseBackend')
+    return import_string(path)()
+
+
+def create_job(eeg_data):
+    """Cria a tarefa de processamento (status 'queued') sem acionar o backend."""
+    job = ProcessingJob.objects.create(
+        eeg_data=eeg_data,
+        max_attempts=getattr(settings, 'EEG_JOB_MAX_ATTEMPTS', 3),
+    )
+    eeg_data.set_status(STATUS_QUEUED)
+    return job
+
+
+def enqueue_processing(eeg_data):
+    """
+    Cria uma tarefa de processamento para o registro EEG e a entrega ao backend.
+
+    Retorna:
+        ProcessingJob: tarefa criada (status 'queued')
+    """
+    job = create_job(eeg_data)
+    transaction.on_commit(lambda: get_backend().enqueue(job))
+    return job
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def stale_before():
+    """Início a partir do qual uma tarefa 'running' é considerada abandonada."""
+    return timezone.now() - timedelta(seconds=getattr(settings, 'EEG_JOB_TIMEOUT', 3600))
+
+
+def claimable():
+    """Tarefas que podem ser reservadas: pendentes ou abandonadas com tentativas restantes."""
+    return Q(status=STATUS_QUEUED) | Q(
+        status=STATUS_RUNNING, started_at__lt=stale_before(), attempts__lt=F('max_attempts')
+    )
+
+
+def fail_stale_jobs():
+    """Marca como 'failed' as tarefas abandonadas que já esgotaram as tentativas."""
+    stale = ProcessingJob.objects.filter(
+        status=STATUS_RUNNING, started_at__lt=stale_before(), attempts__gte=F('max_attempts')
+    ).select_related('eeg_data')
+    for job in stale:
+        updated = ProcessingJob.objects.filter(pk=job.pk, status=STATUS_RUNNING, started_at=job.started_at).update(
+            status=STATUS_FAILED,
+            error=job.error or 'Tarefa interrompida (tempo limite excedido)',
+            finished_at=timezone.now(),
+        )
+        if updated:
+            logger.warning('Tarefa %s do EEG %s abandonada após %s tentativa(s)', job.pk, job.eeg_data_id, job.attempts)
+            job.eeg_data.set_status(STATUS_FAILED)
+
+
+def fail_job(job_id, error):
+    """
+    Marca como 'failed' uma tarefa interrompida fora de run_job (ex: processo do
+    pool encerrado ou erro ao registrar a falha). Retorna True se a tarefa ainda
+    estava pendente ou em execução.
+    """
+    job = ProcessingJob.objects.select_related('eeg_data').filter(pk=job_id).first()
+    if job is None:
+        return False
+    updated = ProcessingJob.objects.filter(pk=job_id, status__in=[STATUS_QUEUED, STATUS_RUNNING]).update(
+        status=STATUS_FAILED, error=error, finished_at=timezone.now(),
+    )
+    if updated:
+        job.eeg_data.set_status(STATUS_FAILED)
+    return bool(updated)
+
+
+def claim_job(job_id, worker=None):
+    """
+    Reserva a tarefa de forma atômica (apenas um worker consegue mudar
+    'queued' -> 'running', ou reservar de novo uma tarefa 'running' abandonada).
+    Retorna a tarefa reservada ou None.
+    """
+    claimed = ProcessingJob.objects.filter(claimable(), pk=job_id).update(
+        status=STATUS_RUNNING,
+        worker=worker or worker_name(),
+        started_at=timezone.now(),
+        attempts=F('attempts') + 1,
+    )
+    if not claimed:
+        return None
+    return ProcessingJob.objects.select_related('eeg_data').get(pk=job_id)
+
+
+def claim_next_job(worker=None):
+    """Reserva a tarefa pendente mais antiga cujo adiamento já expirou (ou uma abandonada)."""
+    fail_stale_jobs()
+    candidates = ProcessingJob.objects.filter(
+        claimable(),
+        run_after__lte=timezone.now(),
+    ).order_by('created_at').values_list('pk', flat=True)
+    for job_id in candidates[:10]:
+        job = claim_job(job_id, worker)
+        if job is not None:
+            return job
+    return None
+
+
+def run_job(job, executor=None):
+    """
+    Executa o processamento de uma tarefa já reservada, registrando o progresso
+    por canal. Em caso de erro a tarefa volta para a fila (com adiamento) até
+    esgotar `max_attempts`, quando é marcada como 'failed'.
+
+    Parâmetros:
+        job (ProcessingJob): Tarefa reservada por claim_job/claim_next_job
+        executor (Executor, opcional): Pool para as etapas por canal (ver batch.py)
+    """
+    from .eeg_processor import process_eeg_data
+
+    eeg_data = job.eeg_data
+
+    def progress(done, total):
+        ProcessingJob.objects.filter(pk=job.pk).update(channels_done=done, channels_total=total)
+
+    try:
+        eeg_data.set_status(STATUS_RUNNING)
+        # Idempotente: análises de um processamento anterior são substituídas
+        process_eeg_data(eeg_data, progress=progress, executor=executor, reprocess=True)
+    except Exception as exc:
+        logger.exception('Falha ao processar EEG %s (tentativa %s)', eeg_data.pk, job.attempts)
+        job.error = f'{type(exc).__name__}: {exc}'
+        if job.attempts < job.max_attempts:
+            delay = getattr(settings, 'EEG_JOB_RETRY_DELAY', 30) * job.attempts
+            job.status = STATUS_QUEUED
+            job.run_after = timezone.now() + timedelta(seconds=delay)
+            eeg_data.set_status(STATUS_QUEUED)
+        else:
+            job.status = STATUS_FAILED
+            job.finished_at = timezone.now()
+            eeg_data.set_status(STATUS_FAILED)
+        job.save(update_fields=['status', 'error', 'run_after', 'finished_at'])
+        return job
+
+    job.status = STATUS_DONE
+    job.error = ''
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'error', 'finished_at'])
+    return job
+
+
+def latest_job(eeg_data):
+    return eeg_data.jobs.order_by('-created_at').first()
@@ -0,0 +1,231 @@
+# analysis/live.py
+"""
+Ingestão em tempo real de headsets EEG.
+
+Um cliente cria uma sessão (`create_session`) e envia quadros de amostras dos
+canais (`LiveSession.push`). Cada quadro passa pelo mesmo banco de filtros da
+ingestão de arquivos, em modo contínuo (estado dos filtros mantido entre
+quadros), e atualiza as potências por banda em uma janela deslizante e o
+espectro da janela mais recente (STFT deslizante). As atualizações ficam em um
+buffer limitado por sessão, consumido pelos assinantes do dashboard
+(Server-Sent Events em `views.live_events`).
+
+As sessões vivem na memória do processo: em produção, o endpoint de ingestão e
+o de eventos devem ser atendidos pelo mesmo processo (ex: um worker ASGI/WSGI
+com threads).
+"""
+import math
+import threading
+import time
+import uuid
+from collections import deque
+
+import numpy as np
+from django.conf import settings
+from scipy.signal import get_window
+
+from .filter_bank import BANDAS, NOTCH_FREQ, get_filter_bank
+from .models import SPECTROGRAM_CONFIG
+
+DEFAULT_CHANNELS = [f'EEG Channel {i}' for i in range(1, 9)]
+SPECTRUM_NPERSEG = 256
+DISPLAY_POINTS = 250  # Pontos por canal enviados no traçado ao vivo
+MAX_FS = 10000  # Hz; limita a memória dos buffers da sessão
+MAX_CHANNELS = 256
+
+
+def live_setting(name, default):
+    return getattr(settings, f'EEG_LIVE_{name}', default)
+
+
+class RingBuffer:
+    """Buffer circular de tamanho fixo para blocos (n_amostras x n_canais)."""
+
+    def __init__(self, capacity, n_channels):
+        self.capacity = capacity
+        self.data = np.zeros((capacity, n_channels))
+        self.head = 0
+        self.size = 0
+
+    def extend(self, block):
+        block = block[-self.capacity:]
+        index = (self.head + np.arange(len(block))) % self.capacity
+        self.data[index] = block
+        self.head = (self.head + len(block)) % self.capacity
+        self.size = min(self.size + len(block), self.capacity)
+
+    def latest(self, n):
+        """Últimas n amostras (ou menos, se ainda não recebidas), em ordem temporal."""
+        n = min(n, self.size)
+        return self.data[(self.head - n + np.arange(n)) % self.capacity]
+
+
+class LiveSession:
+    """Estado de uma sessão de aquisição ao vivo."""
+
+    def __init__(self, fs, channels, owner=None):
+        self.id = uuid.uuid4().hex
+        self.fs = float(fs)
+        self.channels = list(channels)
+        self.owner = owner
+        self.created_at = self.last_seen = time.time()
+        self.total_samples = 0
+        self.closed = False
+
+        n_channels = len(self.channels)
+        self.stream = get_filter_bank(self.fs).stream(n_channels)
+        self.power_window = max(int(live_setting('POWER_WINDOW', 2) * self.fs), 1)
+        self.signal = RingBuffer(max(int(live_setting('BUFFER_SECONDS', 10) * self.fs), SPECTRUM_NPERSEG), n_channels)
+        self.bands = {banda: RingBuffer(self.power_window, n_channels) for banda in BANDAS}
+        self.window = get_window('hann', SPECTRUM_NPERSEG)
+        self.updates = deque(maxlen=live_setting('MAX_UPDATES', 100))
+        self.seq = 0
+        self.condition = threading.Condition()
+
+    def push(self, samples):
+        """
+        Processa um quadro de amostras e publica uma atualização aos assinantes.
+
+        Parâmetros:
+            samples (array-like): Matriz (n_amostras x n_canais)
+
+        Retorna:
+            dict: atualização publicada
+        """
+        data = np.asarray(samples, dtype=np.float64)
+        if data.ndim != 2 or data.shape[1] != len(self.channels):
+            raise ValueError(f'Esperado quadro (n_amostras x {len(self.channels)})')
+
+        with self.condition:
+            if self.closed:
+                raise ValueError('Sessão encerrada')
+            filtered = self.stream.apply(data, dtype=np.float64)
+            self.signal.extend(filtered['notch'])
+            for banda, output in self.stream.iter_bands(data):
+                self.bands[banda].extend(output)
+            self.total_samples += len(data)
+            self.last_seen = time.time()
+
+            self.seq += 1
+            update = self.snapshot()
+            self.updates.append(update)
+            self.condition.notify_all()
+        return update
+
+    def snapshot(self):
+        """Potências na janela deslizante, espectro da janela mais recente e traçado recente."""
+        band_powers = {
+            banda: np.mean(buffer.latest(self.power_window) ** 2, axis=0).tolist()
+            for banda, buffer in self.bands.items()
+        }
+
+        spectrum = None
+        segment = self.signal.latest(SPECTRUM_NPERSEG)
+        if len(segment) == SPECTRUM_NPERSEG:
+            magnitude = np.abs(np.fft.rfft(segment * self.window[:, None], axis=0)) / self.window.sum()
+            freq = np.fft.rfftfreq(SPECTRUM_NPERSEG, 1 / self.fs)
+            keep = freq <= SPECTROGRAM_CONFIG['fmax']
+            spectrum = {
+                'freq': freq[keep].tolist(),
+                'magnitude': magnitude[keep].mean(axis=1).tolist(),
+            }
+
+        recent = self.signal.latest(self.signal.capacity)
+        step = max(len(recent) // DISPLAY_POINTS, 1)
+        recent = recent[::-1][::step][::-1]  # Mantém a amostra mais recente
+        end_time = self.total_samples / self.fs
+        return {
+            'seq': self.seq,
+            'samples': self.total_samples,
+            'time': end_time,
+            'band_powers': band_powers,
+            'spectrum': spectrum,
+            'signal': {
+                't': (end_time - (len(recent) - 1 - np.arange(len(recent))) * step / self.fs).tolist(),
+                'channels': recent.T.tolist(),
+            },
+        }
+
+    def updates_after(self, seq, timeout):
+        """Atualizações com sequência maior que `seq`, aguardando até `timeout` segundos."""
+        with self.condition:
+            if self.seq <= seq and not self.closed:
+                self.condition.wait(timeout)
+            return [update for update in self.updates if update['seq'] > seq]
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def info(self):
+        return {
+            'session_id': self.id,
+            'fs': self.fs,
+            'channels': self.channels,
+            'samples': self.total_samples,
+            'closed': self.closed,
+        }
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def _expire_sessions():
+    timeout = live_setting('SESSION_TIMEOUT', 300)
+    now = time.time()
+    for session_id, session in list(_sessions.items()):
+        if session.closed or now - session.last_seen > timeout:
+            session.close()
+            del _sessions[session_id]
+
+
+def validate_session(fs, channels):
+    """
+    Confere os parâmetros de uma nova sessão antes de projetar os filtros.
+
+    Retorna:
+        tuple: (fs, canais)
+
+    Exceções:
+        ValueError: fs não finito, até 2x a frequência do notch (filtro impossível)
+            ou acima de MAX_FS; canais que não sejam uma lista não vazia de nomes
+    """
+    try:
+        fs = float(fs)
+    except (TypeError, ValueError):
+        raise ValueError('fs deve ser um número')
+    if not math.isfinite(fs) or not 2 * NOTCH_FREQ < fs <= MAX_FS:
+        raise ValueError(f'fs deve estar entre {2 * NOTCH_FREQ} (exclusive) e {MAX_FS} Hz')
+    if channels is None:
+        return fs, list(DEFAULT_CHANNELS)
+    if (not isinstance(channels, list) or not channels or len(channels) > MAX_CHANNELS
+            or not all(isinstance(channel, str) and channel for channel in channels)):
+        raise ValueError(f'channels deve ser uma lista de 1 a {MAX_CHANNELS} nomes')
+    return fs, channels
+
+
+def create_session(fs, channels=None, owner=None):
+    fs, channels = validate_session(fs, channels)
+    with _sessions_lock:
+        _expire_sessions()
+        if len(_sessions) >= live_setting('MAX_SESSIONS', 16):
+            raise RuntimeError('Limite de sessões ao vivo atingido')
+        session = LiveSession(fs, channels, owner)
+        _sessions[session.id] = session
+    return session
+
+
+def get_session(session_id):
+    with _sessions_lock:
+        _expire_sessions()
+        return _sessions.get(session_id)
+
+
+def close_session(session_id):
+    with _sessions_lock:
+        session = _sessions.pop(session_id, None)
+    if session:
+        session.close()
+    return session
@@ -0,0 +1,136 @@
+# analysis/lod.py
+"""
+Níveis de detalhe (LOD) para os gráficos de séries temporais.
+
+Na ingestão cada sinal ganha uma pirâmide de decimação min/max: o nível k agrupa
+LOD_BASE * LOD_FACTOR**(k-1) amostras por bucket e guarda (mínimo, máximo) de
+cada bucket, preservando picos que uma decimação simples descartaria. Para uma
+janela [t0, t1) e uma largura em pixels, `read_window` escolhe o nível mais
+grosso que ainda fornece pelo menos um bucket por pixel, de modo que o navegador
+recebe alguns milhares de pontos independentemente da duração do registro.
+"""
+import numpy as np
+
+LOD_BASE = 16        # Amostras por bucket no primeiro nível
+LOD_FACTOR = 4       # Razão entre buckets de níveis consecutivos
+LOD_MIN_BUCKETS = 512  # Níveis com menos buckets que isso não são gerados
+DEFAULT_WIDTH = 1500   # Largura padrão (pixels) do gráfico inicial
+MAX_WIDTH = 10000      # Largura máxima aceita nas janelas (limita os pontos por resposta)
+
+
+def lod_key(key, level):
+    return f'{key}.lod{level}'
+
+
+def bucket_size(level):
+    return 1 if level == 0 else LOD_BASE * LOD_FACTOR ** (level - 1)
+
+
+def pyramid_levels(n_samples):
+    """Número de níveis (além do sinal original) gerados para n_samples amostras."""
+    levels = 0
+    while -(-n_samples // bucket_size(levels + 1)) >= LOD_MIN_BUCKETS:
+        levels += 1
+    return levels
+
+
+def minmax(signal, bucket):
+    """Mínimo e máximo de cada bucket de `bucket` amostras -> array (n_buckets, 2)."""
+    starts = np.arange(0, len(signal), bucket)
+    return np.column_stack([
+        np.minimum.reduceat(signal, starts),
+        np.maximum.reduceat(signal, starts),
+    ])
+
+
+def build_pyramid(signal):
+    """
+    Gera os níveis da pirâmide min/max. Cada nível é calculado a partir do
+    anterior, então o custo total é de aproximadamente uma passada no sinal.
+    """
+    levels = []
+    for level in range(1, pyramid_levels(len(signal)) + 1):
+        if level == 1:
+            current = minmax(np.asarray(signal), LOD_BASE)
+        else:
+            previous = levels[-1]
+            starts = np.arange(0, len(previous), LOD_FACTOR)
+            current = np.column_stack([
+                np.minimum.reduceat(previous[:, 0], starts),
+                np.maximum.reduceat(previous[:, 1], starts),
+            ])
+        levels.append(current)
+    return levels
+
+
+def save_pyramid(store, key, signal):
+    for level, values in enumerate(build_pyramid(signal), 1):
+        store.save(lod_key(key, level), values)
+
+
+def select_level(n_window, width, max_level):
+    """Nível mais grosso com pelo menos `width` buckets dentro da janela."""
+    level = 0
+    while level < max_level and n_window / bucket_size(level + 1) >= width:
+        level += 1
+    return level
+
+
+def read_window(store, key, n_samples, fs, t0=None, t1=None, width=DEFAULT_WIDTH, recording=None, channel=None):
+    """
+    Pontos de um sinal gravado dentro da janela [t0, t1) (segundos desde o início).
+
+    Parâmetros:
+        store (RecordingStore): Armazenamento do registro
+        key (str): Nome do array do sinal (ex: 'eeg-channel-1.notch')
+        n_samples (int): Número de amostras do sinal
+        fs (float): Taxa de amostragem (Hz)
+        t0, t1 (float, opcional): Limites da janela em segundos (padrão: registro inteiro)
+        width (int): Largura do gráfico em pixels
+        recording (RecordingReader, opcional): Arquivo do registro; em resolução total o
+            sinal bruto de `channel` é lido com RecordingReader.window, sem cópia
+
+    Retorna:
+        dict: 'level', 'bucket', 't' (segundos desde o início) e 'y'. Nos níveis
+        decimados cada bucket contribui dois pontos (mínimo e máximo).
+    """
+    i0 = 0 if t0 is None else int(np.clip(np.floor(t0 * fs), 0, n_samples))
+    i1 = n_samples if t1 is None else int(np.clip(np.ceil(t1 * fs), i0, n_samples))
+    width = max(int(width), 1)
+
+    max_level = pyramid_levels(n_samples)
+    level = select_level(i1 - i0, width, max_level)
+    if level == 0:
+        if recording is not None:
+            y = recording.window(t0, t1, [channel])['signals'][channel]
+        else:
+            y = store.load(key)[i0:i1]
+        return {
+            'level': 0,
+            'bucket': 1,
+            't': np.arange(i0, i1) / fs,
+            'y': y,
+        }
+
+    bucket = bucket_size(level)
+    j0, j1 = i0 // bucket, -(-i1 // bucket)
+    if store.exists(lod_key(key, level)):
+        values = store.load(lod_key(key, level))[j0:j1]
+    else:
+        # Registros anteriores à pirâmide: decima apenas a janela pedida
+        values = minmax(np.asarray(store.load(key)[j0 * bucket:j1 * bucket]), bucket)
+    centers = (np.arange(j0, j0 + len(values)) * bucket + bucket / 2) / fs
+    return {
+        'level': level,
+        'bucket': bucket,
+        't': np.repeat(centers, 2),
+        'y': values.ravel(),
+    }
+
+
+def peak_amplitude(store, key, n_samples):
+    """Maior amplitude absoluta do sinal, lida do nível mais grosso da pirâmide."""
+    max_level = pyramid_levels(n_samples)
+    if max_level and store.exists(lod_key(key, max_level)):
+        return float(np.max(np.abs(store.load(lod_key(key, max_level)))))
+    return float(np.max(np.abs(store.load(key))))
@@ -0,0 +1,70 @@
+# analysis/management/commands/benchmark_ingest.py
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analysis.benchmarks import CHANNEL_COUNTS, compare_results, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = ('Mede a ingestão (tempo por etapa e pico de memória) com registros EEG sintéticos. '
+            'Nada é gravado no banco: cada caso é processado em uma transação desfeita.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--channels', type=int, nargs='+', default=list(CHANNEL_COUNTS),
+                            help='Números de canais (padrão: 8 16 32).')
+        parser.add_argument('--duration', type=float, nargs='+', default=[60.0],
+                            help='Durações dos registros em segundos.')
+        parser.add_argument('--fs', type=float, nargs='+', default=[250.0],
+                            help='Taxas de amostragem (Hz).')
+        parser.add_argument('--repeat', type=int, default=1,
+                            help='Execuções por caso (o tempo é o da mais rápida).')
+        parser.add_argument('--chunksize', type=int, default=None,
+                            help='Linhas do CSV por bloco (padrão: EEG_INGEST_CHUNKSIZE).')
+        parser.add_argument('--no-memory', action='store_true',
+                            help='Não mede o pico de memória (passada extra com tracemalloc).')
+        parser.add_argument('--output', help='Arquivo JSON com os resultados.')
+        parser.add_argument('--compare', help='JSON de um benchmark anterior para detectar regressões.')
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='Aumento relativo aceito na comparação (padrão: 0.25).')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            try:
+                baseline = json.loads(Path(options['compare']).read_text())
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Não foi possível ler {options['compare']}: {exc}")
+
+        def report(case):
+            memory = case['memory']
+            peak = f", pico {memory['peak_bytes'] / 2**20:.1f} MiB" if memory else ''
+            self.stdout.write(
+                f"{case['channels']:>3} canais, {case['duration_s']:g} s a {case['fs']:g} Hz: "
+                f"{case['wall_s']:.2f} s ({case['samples_per_s'] / 1e6:.2f} M amostras/s){peak}"
+            )
+            for name, entry in sorted(case['stages'].items()):
+                self.stdout.write(f"    {name:<20} {entry['seconds']:8.3f} s  ({entry['calls']}x)")
+
+        results = run_benchmarks(
+            channel_counts=options['channels'],
+            durations=options['duration'],
+            rates=options['fs'],
+            repeat=options['repeat'],
+            memory=not options['no_memory'],
+            chunksize=options['chunksize'],
+            progress=report,
+        )
+
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(results, indent=2))
+            self.stdout.write(f"Resultados gravados em {options['output']}")
+
+        if baseline is not None:
+            regressions = compare_results(results, baseline, tolerance=options['tolerance'])
+            if regressions:
+                for regression in regressions:
+                    self.stderr.write(f'Regressão: {regression}')
+                raise CommandError(f'{len(regressions)} regressão(ões) acima de {options["tolerance"]:.0%}')
+            self.stdout.write(self.style.SUCCESS('Sem regressões em relação ao baseline'))
@@ -0,0 +1,64 @@
+# analysis/management/commands/benchmark_views.py
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analysis.view_benchmarks import check_thresholds, compare_view_results, run_view_benchmarks
+
+
+class Command(BaseCommand):
+    help = ('Mede as páginas de leitura (tempo, tamanho, consultas e tempo de renderização das figuras) '
+            'com registros EEG sintéticos de várias durações. Nada é gravado no banco.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--duration', type=float, nargs='+', default=[60.0, 600.0],
+                            help='Durações dos registros em segundos (padrão: 60 600).')
+        parser.add_argument('--channels', type=int, default=8, help='Número de canais (padrão: 8).')
+        parser.add_argument('--fs', type=float, default=250.0, help='Taxa de amostragem (Hz).')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Requisições com cache após a primeira (o tempo é o da mais rápida).')
+        parser.add_argument('--max-ms', type=float, default=None,
+                            help='Falha se a primeira requisição de alguma página levar mais que isso (ms).')
+        parser.add_argument('--output', help='Arquivo JSON com os resultados.')
+        parser.add_argument('--compare', help='JSON de um benchmark anterior para detectar regressões.')
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='Aumento relativo aceito na comparação (padrão: 0.25).')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            try:
+                baseline = json.loads(Path(options['compare']).read_text())
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Não foi possível ler {options['compare']}: {exc}")
+
+        def report(case):
+            self.stdout.write(f"{case['channels']} canais, {case['duration_s']:g} s a {case['fs']:g} Hz:")
+            for name, view in case['views'].items():
+                self.stdout.write(
+                    f"    {name:<18} {view['cold_ms']:8.1f} ms ({view['warm_ms']:6.1f} com cache)  "
+                    f"{view['bytes'] / 1024:8.1f} KiB  {view['queries']:>2} consultas  "
+                    f"figura {view['figure_ms']:6.1f} ms  render {view['render_ms']:6.1f} ms"
+                )
+
+        results = run_view_benchmarks(
+            durations=options['duration'],
+            n_channels=options['channels'],
+            fs=options['fs'],
+            repeat=options['repeat'],
+            progress=report,
+        )
+
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(results, indent=2))
+            self.stdout.write(f"Resultados gravados em {options['output']}")
+
+        failures = check_thresholds(results, max_ms=options['max_ms'])
+        if baseline is not None:
+            failures += compare_view_results(results, baseline, tolerance=options['tolerance'])
+        if failures:
+            for failure in failures:
+                self.stderr.write(f'Regressão: {failure}')
+            raise CommandError(f'{len(failures)} página(s) acima dos limites')
+        self.stdout.write(self.style.SUCCESS('Todas as páginas dentro dos limites'))
@@ -0,0 +1,47 @@
+# analysis/management/commands/process_batch.py
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analysis.batch import ingest_batch
+
+
+class Command(BaseCommand):
+    help = 'Processa todos os arquivos EEG de um diretório em um pool de processos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help='Diretório com os arquivos CSV')
+        parser.add_argument('--pattern', default='*.csv',
+                            help='Padrão dos arquivos (glob).')
+        parser.add_argument('--sampling-rate', type=float, default=250.0,
+                            help='Taxa de amostragem dos arquivos (Hz).')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Processos para distribuir os registros (padrão: CPUs).')
+        parser.add_argument('--channel-workers', type=int, default=0,
+                            help='Distribui os canais de cada registro entre N processos '
+                                 '(os registros são processados em sequência).')
+
+    def handle(self, *args, **options):
+        directory = Path(options['directory'])
+        if not directory.is_dir():
+            raise CommandError(f'Diretório não encontrado: {directory}')
+        paths = sorted(directory.glob(options['pattern']))
+        if not paths:
+            raise CommandError(f"Nenhum arquivo '{options['pattern']}' em {directory}")
+
+        self.stdout.write(f'{len(paths)} arquivo(s) encontrados')
+
+        def report(eeg_id, status, seconds):
+            self.stdout.write(f'EEG {eeg_id}: {status} em {seconds:.1f} s')
+
+        result = ingest_batch(
+            paths,
+            sampling_rate=options['sampling_rate'],
+            workers=options['workers'],
+            channel_workers=options['channel_workers'],
+            on_result=report,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'{result.done} processado(s), {result.failed} com falha em {result.elapsed:.1f} s '
+            f'({result.throughput:.1f} registros/min)'
+        ))
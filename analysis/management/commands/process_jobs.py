@@ -0,0 +1,39 @@
+# analysis/management/commands/process_jobs.py
+from django.core.management.base import BaseCommand
+
+from analysis.jobs import claim_next_job, get_backend, run_job, worker_name
+
+
+class Command(BaseCommand):
+    help = 'Worker da fila de processamento EEG: executa as tarefas pendentes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='Processa as tarefas pendentes e encerra.')
+        parser.add_argument('--sleep', type=float, default=2.0,
+                            help='Intervalo (s) de espera quando a fila está vazia.')
+        parser.add_argument('--max-jobs', type=int, default=0,
+                            help='Encerra após N tarefas (0 = sem limite).')
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        name = worker_name()
+        executed = 0
+        self.stdout.write(f'Worker {name} iniciado')
+        while True:
+            job = claim_next_job(name)
+            if job is None:
+                if options['once']:
+                    break
+                backend.wait(options['sleep'])
+                continue
+
+            job = run_job(job)
+            executed += 1
+            self.stdout.write(
+                f'EEG {job.eeg_data_id}: {job.get_status_display()} '
+                f'(tentativa {job.attempts}/{job.max_attempts})'
+            )
+            if options['max_jobs'] and executed >= options['max_jobs']:
+                break
+        self.stdout.write(self.style.SUCCESS(f'{executed} tarefa(s) executada(s)'))
@@ -0,0 +1,12 @@
+# analysis/management/commands/rebuild_statistics.py
+from django.core.management.base import BaseCommand
+
+from analysis.statistics import rebuild_statistics
+
+
+class Command(BaseCommand):
+    help = 'Recalcula as estatísticas da página inicial a partir das tabelas.'
+
+    def handle(self, *args, **options):
+        for field, value in rebuild_statistics().items():
+            self.stdout.write(f'{field}: {value}')
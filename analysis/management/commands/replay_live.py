@@ -0,0 +1,73 @@
+# analysis/management/commands/replay_live.py
+import json
+import time
+import urllib.request
+
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        'Cliente de teste da ingestão ao vivo: reproduz um CSV de EEG em tempo real, '
+        'enviando quadros de amostras para o servidor.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv', help='Arquivo CSV (Timestamp, EEG Channel 1..8)')
+        parser.add_argument('--url', default='http://127.0.0.1:8000',
+                            help='Endereço do servidor Django.')
+        parser.add_argument('--token', default='',
+                            help='Token de ingestão (settings.EEG_LIVE_TOKEN).')
+        parser.add_argument('--fs', type=float, default=250.0,
+                            help='Taxa de amostragem (Hz).')
+        parser.add_argument('--frame-size', type=int, default=25,
+                            help='Amostras por quadro enviado.')
+        parser.add_argument('--speed', type=float, default=1.0,
+                            help='Velocidade de reprodução (1.0 = tempo real, 0 = sem espera).')
+
+    def post(self, url, payload, token):
+        request = urllib.request.Request(
+            url,
+            data=json.dumps(payload).encode(),
+            headers={'Content-Type': 'application/json', 'X-EEG-Token': token},
+            method='POST',
+        )
+        try:
+            with urllib.request.urlopen(request) as response:
+                return json.loads(response.read())
+        except OSError as exc:
+            raise CommandError(f'Falha ao enviar para {url}: {exc}')
+
+    def handle(self, *args, **options):
+        base = options['url'].rstrip('/')
+        token = options['token']
+        frame_size = options['frame_size']
+        fs = options['fs']
+
+        columns = list(pd.read_csv(options['csv'], nrows=0).columns)
+        channels = columns[1:9]
+        session = self.post(f'{base}/live/sessions/', {'fs': fs, 'channels': channels}, token)
+        self.stdout.write(f"Sessão {session['session_id']}: {base}{session['dashboard_url']}")
+
+        started = time.monotonic()
+        sent = 0
+        try:
+            for chunk in pd.read_csv(options['csv'], usecols=channels, dtype=np.float32, chunksize=frame_size):
+                self.post(
+                    f"{base}/live/{session['session_id']}/frames/",
+                    {'samples': chunk[channels].to_numpy().tolist()},
+                    token,
+                )
+                sent += len(chunk)
+                if options['speed'] > 0:
+                    # Mantém o ritmo de aquisição real (fs amostras por segundo)
+                    delay = sent / (fs * options['speed']) - (time.monotonic() - started)
+                    if delay > 0:
+                        time.sleep(delay)
+        finally:
+            self.post(f"{base}/live/{session['session_id']}/close/", {}, token)
+        self.stdout.write(self.style.SUCCESS(
+            f'{sent} amostras enviadas em {time.monotonic() - started:.1f} s'
+        ))
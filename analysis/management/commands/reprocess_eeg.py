@@ -0,0 +1,33 @@
+# analysis/management/commands/reprocess_eeg.py
+from django.core.management.base import BaseCommand, CommandError
+
+from analysis.jobs import claim_job, create_job, enqueue_processing, run_job
+from analysis.models import EEGData
+
+
+class Command(BaseCommand):
+    help = 'Reprocessa registros EEG, substituindo as análises existentes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('eeg_ids', nargs='*', type=int,
+                            help='IDs dos registros EEG.')
+        parser.add_argument('--all', action='store_true',
+                            help='Reprocessa todos os registros.')
+        parser.add_argument('--now', action='store_true',
+                            help='Processa imediatamente em vez de enfileirar para o worker.')
+
+    def handle(self, *args, **options):
+        if options['all']:
+            records = EEGData.objects.all()
+        elif options['eeg_ids']:
+            records = EEGData.objects.filter(pk__in=options['eeg_ids'])
+        else:
+            raise CommandError('Informe os IDs dos registros ou --all')
+
+        for eeg_data in records:
+            if options['now']:
+                job = run_job(claim_job(create_job(eeg_data).pk))
+                self.stdout.write(f'EEG {eeg_data.pk}: {job.get_status_display()}')
+            else:
+                enqueue_processing(eeg_data)
+                self.stdout.write(f'EEG {eeg_data.pk}: enfileirado')
@@ -0,0 +1,99 @@
+# analysis/metrics.py
+"""
+Métricas do processamento no formato de texto do Prometheus.
+
+Os tempos, chamadas e bytes de cada etapa da ingestão (instrumentation.stage)
+são somados ao fim de cada registro em IngestMetric, uma linha por etapa
+atualizada com expressões F — os workers (`manage.py process_jobs`) rodam em
+outros processos, então os totais ficam no banco, como as estatísticas da
+página inicial. `render_metrics` monta a resposta de /metrics com esses
+totais, as tarefas por status, os totais da página inicial e os contadores
+do registro de filtros (estes por processo, do processo que atende /metrics).
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+from .filter_registry import registry
+from .models import IngestMetric, ProcessingJob, STATUS_CHOICES
+from .statistics import get_statistics
+
+TOTAL = 'total'
+
+
+def record_ingest(stages, seconds, nbytes=0):
+    """
+    Soma um processamento aos totais.
+
+    Parâmetros:
+        stages (dict): StageTimings.as_dict() do processamento
+        seconds (float): Duração total
+        nbytes (int): Bytes do arquivo processado
+    """
+    totals = {name: (entry['seconds'], entry['calls'], entry.get('bytes', 0)) for name, entry in stages.items()}
+    totals[TOTAL] = (seconds, 1, nbytes)
+    for name, (stage_seconds, calls, stage_bytes) in totals.items():
+        values = {'seconds': F('seconds') + stage_seconds, 'calls': F('calls') + calls,
+                  'bytes': F('bytes') + stage_bytes}
+        if IngestMetric.objects.filter(stage=name).update(**values):
+            continue
+        try:
+            with transaction.atomic():
+                IngestMetric.objects.create(stage=name, seconds=stage_seconds, calls=calls, bytes=stage_bytes)
+        except IntegrityError:
+            # Criada por outro worker entre o UPDATE e o INSERT
+            IngestMetric.objects.filter(stage=name).update(**values)
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def metric_lines(name, kind, description, samples):
+    """Linhas de uma métrica: samples é uma lista de (rótulos, valor)."""
+    lines = [f'# HELP {name} {description}', f'# TYPE {name} {kind}']
+    for labels, value in samples:
+        if labels:
+            label_text = ','.join(f'{key}="{escape_label(val)}"' for key, val in labels.items())
+            lines.append(f'{name}{{{label_text}}} {value}')
+        else:
+            lines.append(f'{name} {value}')
+    return lines
+
+
+def render_metrics():
+    """Texto de /metrics (formato de exposição do Prometheus, versão 0.0.4)."""
+    rows = list(IngestMetric.objects.order_by('stage').values_list('stage', 'seconds', 'calls', 'bytes'))
+    stages = [row for row in rows if row[0] != TOTAL]
+    total = next((row for row in rows if row[0] == TOTAL), (TOTAL, 0.0, 0, 0))
+    jobs = dict(ProcessingJob.objects.order_by().values_list('status').annotate(count=Count('id')))
+    statistics = get_statistics()
+    filters = registry.stats()
+
+    lines = []
+    lines += metric_lines('eeg_ingest_recordings_total', 'counter', 'Registros processados.',
+                          [({}, total[2])])
+    lines += metric_lines('eeg_ingest_seconds_total', 'counter', 'Tempo total de processamento (s).',
+                          [({}, total[1])])
+    lines += metric_lines('eeg_ingest_input_bytes_total', 'counter', 'Bytes dos arquivos processados.',
+                          [({}, total[3])])
+    lines += metric_lines('eeg_ingest_stage_seconds_total', 'counter', 'Tempo por etapa do processamento (s).',
+                          [({'stage': stage}, seconds) for stage, seconds, _, _ in stages])
+    lines += metric_lines('eeg_ingest_stage_calls_total', 'counter', 'Execuções de cada etapa do processamento.',
+                          [({'stage': stage}, calls) for stage, _, calls, _ in stages])
+    lines += metric_lines('eeg_ingest_stage_bytes_total', 'counter', 'Bytes lidos ou gravados por etapa.',
+                          [({'stage': stage}, nbytes) for stage, _, _, nbytes in stages])
+    lines += metric_lines('eeg_jobs', 'gauge', 'Tarefas de processamento por status.',
+                          [({'status': status}, jobs.get(status, 0)) for status, _ in STATUS_CHOICES])
+    lines += metric_lines('eeg_uploads', 'gauge', 'Registros enviados.',
+                          [({}, statistics['total_uploads'])])
+    lines += metric_lines('eeg_channels', 'gauge', 'Canais analisados.',
+                          [({}, statistics['total_channels'])])
+    lines += metric_lines('eeg_filter_registry_hits_total', 'counter',
+                          'Projetos de filtros reaproveitados do cache (neste processo).', [({}, filters['hits'])])
+    lines += metric_lines('eeg_filter_registry_misses_total', 'counter',
+                          'Filtros projetados (neste processo).', [({}, filters['misses'])])
+    lines += metric_lines('eeg_filter_registry_entries', 'gauge',
+                          'Filtros no cache (neste processo).', [({}, filters['size'])])
+    lines += metric_lines('eeg_filter_registry_maxsize', 'gauge',
+                          'Capacidade do cache de filtros.', [({}, filters['maxsize'])])
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.13 on 2026-10-18 13:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def sync_status(apps, schema_editor):
+    EEGData = apps.get_model('analysis', 'EEGData')
+    EEGData.objects.filter(processed=True).update(status='done')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0004_rename_spectral_data_eegchannelanalysis_spectrogram_data'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eegdata',
+            name='status',
+            field=models.CharField(choices=[('queued', 'Na fila'), ('running', 'Processando'), ('done', 'Processado'), ('failed', 'Falhou')], default='queued', max_length=10, verbose_name='Status'),
+        ),
+        migrations.RunPython(sync_status, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='ProcessingJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('queued', 'Na fila'), ('running', 'Processando'), ('done', 'Processado'), ('failed', 'Falhou')], db_index=True, default='queued', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('max_attempts', models.PositiveIntegerField(default=3)),
+                ('channels_done', models.PositiveIntegerField(default=0)),
+                ('channels_total', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('worker', models.CharField(blank=True, max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('eeg_data', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to='analysis.eegdata')),
+            ],
+            options={
+                'ordering': ['created_at'],
+            },
+        ),
+    ]
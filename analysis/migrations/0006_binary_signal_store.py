@@ -0,0 +1,95 @@
+# Generated by Django 4.2.13 on 2026-10-18 13:43
+
+import datetime
+import json
+
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.db import migrations, models
+from django.utils.text import slugify
+
+
+# Cópias do formato de analysis/signal_store.py nesta versão: a migração não
+# deve depender do código atual do armazenamento.
+def store_dir(eeg_id):
+    root = getattr(settings, 'EEG_STORE_ROOT', Path(settings.MEDIA_ROOT) / 'eeg_store')
+    return Path(root) / str(eeg_id)
+
+
+def save_array(directory, name, array):
+    directory.mkdir(parents=True, exist_ok=True)
+    np.save(directory / f'{name}.npy', np.asarray(array, dtype=np.float32))
+
+
+def signal_key(channel_name, kind):
+    return f'{slugify(channel_name)}.{kind}'
+
+
+def json_to_store(apps, schema_editor):
+    """Converte os sinais JSON existentes para o armazenamento binário."""
+    EEGChannelAnalysis = apps.get_model('analysis', 'EEGChannelAnalysis')
+    for analysis in EEGChannelAnalysis.objects.select_related('eeg_data').iterator():
+        eeg_data = analysis.eeg_data
+        directory = store_dir(eeg_data.pk)
+        raw = json.loads(analysis.raw_signal)
+        for kind in ('raw', 'highpass', 'lowpass', 'bandpass', 'notch'):
+            signal = raw if kind == 'raw' else json.loads(getattr(analysis, kind))
+            save_array(directory, signal_key(analysis.channel_name, kind), signal['y'])
+        if analysis.spectrogram_data:
+            spectrogram = json.loads(analysis.spectrogram_data)
+            save_array(directory, signal_key(analysis.channel_name, 'spectrogram'), spectrogram['magnitude'])
+            save_array(directory, 'spectrogram_freq', spectrogram['freq'])
+            save_array(directory, 'spectrogram_time', spectrogram['time'])
+        analysis.n_samples = len(raw['y'])
+        analysis.save(update_fields=['n_samples'])
+        if eeg_data.start_time is None and raw['x']:
+            start = datetime.datetime.strptime(raw['x'][0], '%Y-%m-%d %H:%M:%S.%f')
+            eeg_data.start_time = start.replace(tzinfo=datetime.timezone.utc)
+            eeg_data.save(update_fields=['start_time'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0005_processing_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eegchannelanalysis',
+            name='n_samples',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='eegdata',
+            name='start_time',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(json_to_store, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='eegchannelanalysis',
+            name='bandpass',
+        ),
+        migrations.RemoveField(
+            model_name='eegchannelanalysis',
+            name='highpass',
+        ),
+        migrations.RemoveField(
+            model_name='eegchannelanalysis',
+            name='lowpass',
+        ),
+        migrations.RemoveField(
+            model_name='eegchannelanalysis',
+            name='notch',
+        ),
+        migrations.RemoveField(
+            model_name='eegchannelanalysis',
+            name='raw_signal',
+        ),
+        migrations.RemoveField(
+            model_name='eegchannelanalysis',
+            name='spectrogram_data',
+        ),
+    ]
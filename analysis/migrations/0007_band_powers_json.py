@@ -0,0 +1,18 @@
+# Generated by Django 4.2.13 on 2026-10-18 13:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0006_binary_signal_store'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eegchannelanalysis',
+            name='band_powers',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
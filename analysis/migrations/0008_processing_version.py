@@ -0,0 +1,23 @@
+# Generated by Django 4.2.13 on 2026-10-18 14:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0007_band_powers_json'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eegdata',
+            name='processed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='eegdata',
+            name='processing_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
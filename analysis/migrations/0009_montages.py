@@ -0,0 +1,30 @@
+# Generated by Django 4.2.13 on 2026-10-18 14:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0008_processing_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Montage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True, verbose_name='Nome')),
+                ('description', models.CharField(blank=True, max_length=200, verbose_name='Descrição')),
+                ('electrodes', models.JSONField(default=list, verbose_name='Eletrodos')),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='eegdata',
+            name='montage',
+            field=models.CharField(default='sinap-8', max_length=50, verbose_name='Montagem'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.13 on 2026-10-18 14:13
+
+from django.db import migrations, models
+from django.db.models import Count, F, Q, Sum
+
+
+def create_statistics(apps, schema_editor):
+    EEGData = apps.get_model('analysis', 'EEGData')
+    EEGChannelAnalysis = apps.get_model('analysis', 'EEGChannelAnalysis')
+    SiteStatistics = apps.get_model('analysis', 'SiteStatistics')
+    recordings = EEGData.objects.aggregate(uploads=Count('id'), processed=Count('id', filter=Q(processed=True)))
+    channels = EEGChannelAnalysis.objects.aggregate(
+        count=Count('id'), power=Sum(F('alpha_power') + F('beta_power') + F('gamma_power'))
+    )
+    SiteStatistics.objects.create(
+        pk=1,
+        total_uploads=recordings['uploads'],
+        total_channels=channels['count'],
+        total_processed=recordings['processed'],
+        total_power=channels['power'] or 0.0,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0009_montages'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SiteStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_uploads', models.IntegerField(default=0)),
+                ('total_channels', models.IntegerField(default=0)),
+                ('total_processed', models.IntegerField(default=0)),
+                ('total_power', models.FloatField(default=0.0)),
+            ],
+        ),
+        migrations.RunPython(create_statistics, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='eegdata',
+            name='processed',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+        migrations.AlterField(
+            model_name='eegdata',
+            name='uploaded_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.13 on 2026-10-18 14:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0010_site_statistics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eegdata',
+            name='timing',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.13 on 2026-10-18 14:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0011_eegdata_timing'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stage', models.CharField(max_length=100, unique=True)),
+                ('seconds', models.FloatField(default=0.0)),
+                ('calls', models.BigIntegerField(default=0)),
+                ('bytes', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
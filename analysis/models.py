@@ -1,6 +1,62 @@
 # analysis/models.py
-from django.db import models
-import json
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.utils import timezone
+from django.utils.functional import cached_property
+import numpy as np
+from .signal_store import store_for, signal_key
+from .montages import DEFAULT_MONTAGE, get_montage
+from .spectrogram import load_average, load_spectrogram
+
+# Ciclo de vida do processamento (compartilhado entre EEGData e ProcessingJob)
+STATUS_QUEUED = 'queued'
+STATUS_RUNNING = 'running'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+STATUS_CHOICES = [
+    (STATUS_QUEUED, 'Na fila'),
+    (STATUS_RUNNING, 'Processando'),
+    (STATUS_DONE, 'Processado'),
+    (STATUS_FAILED, 'Falhou'),
+]
+
+# Sinais gravados por canal no armazenamento binário (ver signal_store.py)
+SIGNAL_KINDS = ('raw', 'highpass', 'lowpass', 'bandpass', 'notch')
+SPECTROGRAM_CONFIG = {
+    'fmin': 0,
+    'fmax': 40,
+    'cmap': 'Viridis'
+}
+
+class Montage(models.Model):
+    """
+    Montagem de eletrodos própria (as padrão estão em montages.py).
+    `electrodes` é uma lista de {'name': 'Fp1', 'x': 0.35, 'y': 0.95} com
+    coordenadas normalizadas (0-1, nariz para cima).
+    """
+    name = models.CharField(max_length=50, unique=True, verbose_name='Nome')
+    description = models.CharField(max_length=200, blank=True, verbose_name='Descrição')
+    electrodes = models.JSONField(default=list, verbose_name='Eletrodos')
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+    def clean(self):
+        try:
+            layout = self.layout()
+        except (TypeError, KeyError, ValueError):
+            raise ValidationError({'electrodes': "Use uma lista de {'name', 'x', 'y'}"})
+        if len(layout) < 3:
+            raise ValidationError({'electrodes': 'O mapa topográfico precisa de pelo menos 3 eletrodos'})
+        if any(not (0 <= v <= 1) for position in layout.values() for v in position):
+            raise ValidationError({'electrodes': 'Coordenadas devem estar normalizadas entre 0 e 1'})
+
+    def layout(self):
+        """Nome do eletrodo -> (x, y), na ordem cadastrada."""
+        return {e['name']: (float(e['x']), float(e['y'])) for e in self.electrodes}
 
 class EEGData(models.Model):
     SEX_CHOICES = [
@@ -9,10 +65,20 @@ class EEGData(models.Model):
         ('O', 'Outro'),
     ]
     
-    uploaded_at = models.DateTimeField(auto_now_add=True)
+    uploaded_at = models.DateTimeField(auto_now_add=True, db_index=True)
     original_file = models.FileField(upload_to='eeg_data/')
     sampling_rate = models.FloatField(default=250.0)
-    processed = models.BooleanField(default=False)
+    processed = models.BooleanField(default=False, db_index=True)
+    start_time = models.DateTimeField(null=True, blank=True)  # Instante da primeira amostra
+    # Incrementada a cada processamento concluído (invalida o cache de figuras)
+    processing_version = models.PositiveIntegerField(default=0)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=STATUS_QUEUED,
+        verbose_name='Status'
+    )
     age = models.IntegerField(verbose_name='Idade', null=True, blank=True)  # Novo campo
     sex = models.CharField(  # Novo campo
         max_length=1,
@@ -21,27 +87,213 @@ class EEGData(models.Model):
         null=True,
         blank=True
     )
+    # Relatório de validação dos timestamps do arquivo (ver timing.py)
+    timing = models.JSONField(default=dict, blank=True)
+    # Nome de uma montagem padrão (montages.py) ou cadastrada (Montage)
+    montage = models.CharField(max_length=50, default=DEFAULT_MONTAGE, verbose_name='Montagem')
+
+    def set_status(self, status):
+        """
+        Atualiza o status do processamento mantendo o campo `processed` sincronizado.
+        Ao concluir um processamento, registra o instante e incrementa `processing_version`.
+        Mudanças de `processed` atualizam as estatísticas da página inicial (statistics.py).
+        """
+        from .statistics import update_statistics
+
+        self.status = status
+        self.processed = status == STATUS_DONE
+        fields = ['status', 'processed']
+        if status == STATUS_DONE:
+            self.processing_version += 1
+            self.processed_at = timezone.now()
+            fields += ['processing_version', 'processed_at']
+        with transaction.atomic():
+            # Escrita já na primeira instrução: no SQLite a transação obtém o bloqueio de
+            # escrita (aguardando o timeout) em vez de falhar ao promover um bloqueio de leitura
+            changed = EEGData.objects.filter(pk=self.pk).exclude(processed=self.processed).update(
+                processed=self.processed
+            )
+            self.save(update_fields=fields)
+            if changed:
+                update_statistics(total_processed=1 if self.processed else -1)
+
+    @property
+    def store(self):
+        """Armazenamento binário dos sinais deste registro."""
+        return store_for(self)
+
+    @property
+    def recording(self):
+        """
+        Leitor do arquivo binário do registro original (RecordingReader, janelas
+        [t0, t1) sem cópia), ou None para registros processados antes dele.
+        """
+        return self.store.recording()
+
+    @cached_property
+    def montage_layout(self):
+        """Disposição dos eletrodos da montagem do registro (lida uma vez por instância, ver montages.py)."""
+        return get_montage(self.montage)
+
+    @property
+    def start_epoch_ms(self):
+        """Instante inicial em milissegundos desde a época (eixos de data do Plotly)."""
+        return self.start_time.timestamp() * 1000 if self.start_time else 0.0
+
+    def time_at(self, offsets):
+        """Converte deslocamentos em segundos desde o início para datetime64[us]."""
+        start = np.datetime64(self.start_time.replace(tzinfo=None) if self.start_time else 0, 'us')
+        return start + (np.asarray(offsets) * 1e6).astype('timedelta64[us]')
+
+    def get_spectrogram(self):
+        """
+        Espectrograma médio entre canais (mesmo formato de
+        EEGChannelAnalysis.get_spectrogram), ou None se não gravado.
+        """
+        store = self.store
+        loaded = load_average(store)
+        if loaded is None:
+            return None
+        freq, db = loaded
+        return {
+            'freq': freq,
+            'time': store.load('spectrogram_time'),
+            'db': db,
+            'config': SPECTROGRAM_CONFIG
+        }
+
+    def time_axis(self, n_samples):
+        """
+        Eixo de tempo (datetime64[us]) reconstruído a partir do instante inicial
+        e da taxa de amostragem, sem precisar armazenar um timestamp por amostra.
+        """
+        return self.time_at(np.arange(n_samples) / self.sampling_rate)
+
+# Métricas escalares exibidas nos dashboards (tabela, gráfico de potências, topomapa, sentimento)
+POWER_FIELDS = ('delta_power', 'theta_power', 'alpha_power', 'beta_power', 'gamma_power')
+
+class EEGChannelAnalysisQuerySet(models.QuerySet):
+    def metrics(self):
+        """
+        Apenas o nome do canal e as potências por banda: as colunas maiores
+        (band_powers) ficam adiadas até serem acessadas.
+        """
+        return self.only('id', 'eeg_data_id', 'channel_name', *POWER_FIELDS)
+
+    def with_recording(self):
+        """Carrega o registro junto (select_related), sem as colunas adiadas do canal."""
+        return self.select_related('eeg_data').defer('band_powers')
 
 class EEGChannelAnalysis(models.Model):
     eeg_data = models.ForeignKey(EEGData, on_delete=models.CASCADE)
     channel_name = models.CharField(max_length=50)
-    raw_signal = models.TextField()
-    highpass = models.TextField()
-    lowpass = models.TextField()
-    bandpass = models.TextField()
-    notch = models.TextField()
+    n_samples = models.PositiveIntegerField(default=0)
     delta_power = models.FloatField()
     theta_power = models.FloatField()
     alpha_power = models.FloatField()
     beta_power = models.FloatField()
     gamma_power = models.FloatField()
-    spectrogram_data = models.TextField(null=True, blank=True)  # Novo campo para espectrograma
+    # Potência absoluta e relativa de todas as bandas (incluindo EEG_BANDS), a partir da PSD
+    band_powers = models.JSONField(default=dict, blank=True)
+
+    objects = EEGChannelAnalysisQuerySet.as_manager()
 
     class Meta:
         ordering = ['channel_name']
-    
+
+    def get_signal(self, kind='raw'):
+        """
+        Sinal do canal como array NumPy (float32, memory-mapped).
+
+        Parâmetros:
+            kind (str): Um de SIGNAL_KINDS ('raw', 'highpass', 'lowpass', 'bandpass', 'notch')
+        """
+        if kind not in SIGNAL_KINDS:
+            raise ValueError(f'Tipo de sinal desconhecido: {kind}')
+        return self.eeg_data.store.load(signal_key(self.channel_name, kind))
+
+    def get_time_axis(self):
+        return self.eeg_data.time_axis(self.n_samples)
+
+    def relative_power(self, banda):
+        """Fração da potência total (0.5-40 Hz) do canal na banda, ou None se não calculada."""
+        return self.band_powers.get(banda, {}).get('relative')
+
     def get_spectrogram(self):
-        try:
-            return json.loads(self.spectrogram_data) if self.spectrogram_data else None
-        except json.JSONDecodeError:
-            return None
\ No newline at end of file
+        """
+        Espectrograma do canal: 'freq', 'time', 'db' (decodificado sob demanda com
+        `db.decode(p0, p1)`, matriz n_frequências x n_janelas em dB) e 'config'.
+        Retorna None se o canal não possui espectrograma gravado.
+        """
+        store = self.eeg_data.store
+        loaded = load_spectrogram(
+            store, signal_key(self.channel_name, 'spectrogram'),
+            store.load('spectrogram_freq'), SPECTROGRAM_CONFIG
+        ) if store.exists('spectrogram_freq') else None
+        if loaded is None:
+            return None
+        freq, db = loaded
+        return {
+            'freq': freq,
+            'time': store.load('spectrogram_time'),
+            'db': db,
+            'config': SPECTROGRAM_CONFIG
+        }
+
+class SiteStatistics(models.Model):
+    """
+    Totais exibidos na página inicial, em uma única linha (pk=1) mantida de
+    forma incremental por statistics.py.
+    """
+    total_uploads = models.IntegerField(default=0)
+    total_channels = models.IntegerField(default=0)
+    total_processed = models.IntegerField(default=0)
+    total_power = models.FloatField(default=0.0)  # Soma de alpha, beta e gamma de todos os canais
+
+class IngestMetric(models.Model):
+    """
+    Totais acumulados de uma etapa do processamento (ver metrics.py), somados
+    ao fim de cada registro e expostos em /metrics. A etapa 'total' guarda o
+    processamento inteiro (calls = registros processados).
+    """
+    stage = models.CharField(max_length=100, unique=True)
+    seconds = models.FloatField(default=0.0)
+    calls = models.BigIntegerField(default=0)
+    bytes = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return self.stage
+
+class ProcessingJob(models.Model):
+    """
+    Tarefa de processamento de um arquivo EEG executada fora do ciclo da requisição.
+    A tabela funciona como fila: os workers (`manage.py process_jobs`) reservam
+    tarefas com status 'queued' e registram progresso por canal e falhas.
+    """
+    eeg_data = models.ForeignKey(EEGData, on_delete=models.CASCADE, related_name='jobs')
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=STATUS_QUEUED,
+        db_index=True
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    channels_done = models.PositiveIntegerField(default=0)
+    channels_total = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    run_after = models.DateTimeField(default=timezone.now)  # Adiamento entre tentativas
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+
+    @property
+    def progress(self):
+        """Fração de canais já processados (0.0 a 1.0)."""
+        if not self.channels_total:
+            return 1.0 if self.status == STATUS_DONE else 0.0
+        return self.channels_done / self.channels_total
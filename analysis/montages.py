@@ -0,0 +1,173 @@
+# analysis/montages.py
+"""
+Montagens de eletrodos.
+
+Uma montagem associa os nomes dos canais do arquivo às posições dos eletrodos
+no mapa topográfico (coordenadas normalizadas 0-1, nariz para cima). As
+montagens padrão (10-20, 10-10 e a disposição de 8 canais original do projeto)
+são definidas aqui; montagens próprias ficam no banco (modelo Montage) e são
+consultadas pelo mesmo nome. As montagens padrão são montadas uma vez por
+processo (em cache); as próprias são lidas do banco a cada `get_montage`, pois
+podem ser alteradas por outro processo (admin, workers). Os pesos do topomapa
+são calculados uma vez por disposição (topomap.py, pelas posições), então
+montagens com mais canais não tornam a renderização mais lenta.
+
+As posições 10-10 seguem a projeção polar centrada em Cz: cada linha
+(Fp, AF, F, FC, C, CP, P, PO, O) fica a 10% do perímetro da seguinte, e os
+eletrodos de uma linha vão da linha média até o equador (Fpz-T7-Oz-T8).
+"""
+import math
+import re
+from functools import lru_cache
+
+DEFAULT_MONTAGE = 'sinap-8'
+
+EQUATOR = 0.4  # Raio do equador na projeção (fração do perímetro nasion-inion a partir de Cz)
+SCALE = 0.45 / EQUATOR  # O equador ocupa 90% da grade do mapa
+
+# Linha (passos de 10% a partir de Cz, positivo para frente) de cada prefixo
+ROWS = {
+    'FP': 4, 'AF': 3, 'F': 2, 'FC': 1, 'FT': 1, 'C': 0, 'T': 0,
+    'CP': -1, 'TP': -1, 'P': -2, 'PO': -3, 'O': -4,
+}
+# Nomes antigos do sistema 10-20
+ALIASES = {'T3': 'T7', 'T4': 'T8', 'T5': 'P7', 'T6': 'P8'}
+
+STANDARD_1020 = [
+    'Fp1', 'Fp2', 'F7', 'F3', 'Fz', 'F4', 'F8', 'T7', 'C3', 'Cz',
+    'C4', 'T8', 'P7', 'P3', 'Pz', 'P4', 'P8', 'O1', 'O2',
+]
+STANDARD_1010 = [
+    'Fp1', 'Fpz', 'Fp2',
+    'AF7', 'AF3', 'AFz', 'AF4', 'AF8',
+    'F7', 'F5', 'F3', 'F1', 'Fz', 'F2', 'F4', 'F6', 'F8',
+    'FT7', 'FC5', 'FC3', 'FC1', 'FCz', 'FC2', 'FC4', 'FC6', 'FT8',
+    'T7', 'C5', 'C3', 'C1', 'Cz', 'C2', 'C4', 'C6', 'T8',
+    'TP7', 'CP5', 'CP3', 'CP1', 'CPz', 'CP2', 'CP4', 'CP6', 'TP8',
+    'P7', 'P5', 'P3', 'P1', 'Pz', 'P2', 'P4', 'P6', 'P8',
+    'PO7', 'PO3', 'POz', 'PO4', 'PO8',
+    'O1', 'Oz', 'O2',
+]
+# Disposição original do projeto (headset de 8 canais)
+SINAP_8 = {
+    'EEG Channel 1': (0.5, 0.9),
+    'EEG Channel 2': (0.3, 0.7),
+    'EEG Channel 3': (0.7, 0.7),
+    'EEG Channel 4': (0.2, 0.5),
+    'EEG Channel 5': (0.8, 0.5),
+    'EEG Channel 6': (0.5, 0.3),
+    'EEG Channel 7': (0.3, 0.2),
+    'EEG Channel 8': (0.7, 0.2),
+}
+
+
+def normalize_label(label):
+    """
+    Nome de canal para comparação: maiúsculas, sem espaços, sem o prefixo 'EEG'
+    e a referência (ex: 'EEG Fp1-REF' -> 'FP1') e com os aliases 10-20.
+    """
+    key = str(label).strip().upper().replace(' ', '')
+    key = re.sub(r'^EEG[-_]?(?=[A-Z])', '', key)
+    key = re.sub(r'-(REF|LE|AVG)$', '', key)
+    return ALIASES.get(key, key)
+
+
+def position_1010(label):
+    """
+    Coordenadas normalizadas (x, y) de um eletrodo do sistema 10-10 (ex: 'F3', 'CPz').
+    Ímpares à esquerda, pares à direita, 'z' na linha média.
+    """
+    match = re.fullmatch(r'([A-Z]+?)(Z|\d+)', normalize_label(label))
+    if not match or match.group(1) not in ROWS:
+        raise ValueError(f'Eletrodo 10-10 desconhecido: {label}')
+    prefix, suffix = match.groups()
+    row = ROWS[prefix]
+    if suffix == 'Z':
+        lateral, side = 0, 1
+    else:
+        number = int(suffix)
+        lateral, side = (number + 1) // 2, (-1 if number % 2 else 1)
+
+    if row == 0:
+        radius, angle = 0.1 * lateral, 90.0
+    else:
+        # Da linha média (0° na frente, 180° atrás) até o equador da linha
+        steps = 1 if abs(row) == 4 else 4
+        t = lateral / steps
+        midline = 0.0 if row > 0 else 180.0
+        equator_angle = 90.0 - row * 18.0
+        radius = abs(row) * 0.1 + (EQUATOR - abs(row) * 0.1) * t
+        angle = midline + (equator_angle - midline) * t
+    x = side * radius * math.sin(math.radians(angle))
+    y = radius * math.cos(math.radians(angle))
+    return (0.5 + x * SCALE, 0.5 + y * SCALE)
+
+
+class MontageLayout:
+    """
+    Disposição de eletrodos de uma montagem.
+
+    Parâmetros:
+        name (str): Nome da montagem
+        positions (dict): nome do eletrodo -> (x, y) normalizados
+    """
+
+    def __init__(self, name, positions):
+        self.name = name
+        self.positions = dict(positions)
+        self._keys = {normalize_label(label): label for label in self.positions}
+
+    def __len__(self):
+        return len(self.positions)
+
+    def position(self, channel):
+        """Posição do eletrodo de um canal do arquivo, ou None se fora da montagem."""
+        label = self._keys.get(normalize_label(channel))
+        return self.positions[label] if label else None
+
+    def select(self, columns):
+        """
+        Colunas do arquivo que pertencem à montagem, na ordem do arquivo
+        (uma por eletrodo: ex, 'T3' é ignorada se o arquivo já tem 'T7').
+        """
+        selected, seen = [], set()
+        for column in columns:
+            key = normalize_label(column)
+            if key in self._keys and key not in seen:
+                seen.add(key)
+                selected.append(column)
+        return selected
+
+
+STANDARD_MONTAGES = {
+    DEFAULT_MONTAGE: ('Headset de 8 canais (disposição original)', SINAP_8),
+    'standard_1020': ('Sistema 10-20 (19 eletrodos)', {label: position_1010(label) for label in STANDARD_1020}),
+    'standard_1010': ('Sistema 10-10 (61 eletrodos)', {label: position_1010(label) for label in STANDARD_1010}),
+}
+
+
+@lru_cache(maxsize=None)
+def standard_montage(name):
+    return MontageLayout(name, STANDARD_MONTAGES[name][1])
+
+
+def get_montage(name):
+    """
+    Montagem padrão (em cache) ou cadastrada no banco (modelo Montage, uma
+    consulta: nunca guardada entre chamadas, para valer em todos os processos).
+    """
+    if name in STANDARD_MONTAGES:
+        return standard_montage(name)
+    from .models import Montage
+    montage = Montage.objects.filter(name=name).first()
+    if montage is None:
+        raise KeyError(f'Montagem desconhecida: {name}')
+    return MontageLayout(name, montage.layout())
+
+
+def montage_choices():
+    """(nome, descrição) das montagens padrão e cadastradas, para formulários."""
+    from .models import Montage
+    choices = [(name, description) for name, (description, _) in STANDARD_MONTAGES.items()]
+    choices += [(m.name, m.description or m.name) for m in Montage.objects.order_by('name')]
+    return choices
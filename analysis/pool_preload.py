@@ -0,0 +1,12 @@
+# analysis/pool_preload.py
+"""
+Importado uma única vez pelo servidor de processos do pool ('forkserver', ver
+pool.py): inicializa o Django e carrega o processamento, herdados já prontos
+pelos processos bifurcados dele.
+"""
+from importlib import import_module
+
+from .pool import init_worker
+
+init_worker()
+import_module('analysis.eeg_processor')
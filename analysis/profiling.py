@@ -0,0 +1,123 @@
+# analysis/profiling.py
+"""
+Perfil de cada processamento.
+
+`profile_ingest` envolve process_eeg_data: mede as etapas (instrumentation,
+reaproveitando uma medição já ativa, como a dos benchmarks) e, ao final,
+registra uma linha de log estruturada (JSON, logger 'analysis.ingest') com o
+tempo, as chamadas e os bytes de cada etapa do registro, e soma as etapas aos
+totais de /metrics (metrics.py).
+
+Com `settings.EEG_PROFILE_JOBS` o processamento também é executado sob
+cProfile e as estatísticas são gravadas em EEG_PROFILE_DIR
+(`eeg-<id>-<data>.prof`, para pstats/snakeviz). Apenas a thread que processa
+é perfilada: as etapas por canal enviadas a um pool de processos (batch.py)
+aparecem só como espera.
+"""
+import cProfile
+import json
+import logging
+import os
+import time
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .instrumentation import current_timings, measure_stages
+from .metrics import record_ingest
+
+logger = logging.getLogger('analysis.ingest')
+
+
+def profile_dir():
+    return Path(getattr(settings, 'EEG_PROFILE_DIR', Path(settings.MEDIA_ROOT) / 'profiles'))
+
+
+@contextmanager
+def job_profiler(eeg_data):
+    """Executa o bloco sob cProfile (com EEG_PROFILE_JOBS); produz o caminho do .prof ou None."""
+    result = {'path': None}
+    if not getattr(settings, 'EEG_PROFILE_JOBS', False):
+        yield result
+        return
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Outro profiler já ativo nesta thread (ex: o processo inteiro sob cProfile)
+        logger.warning('cProfile indisponível para o EEG %s: outro profiler está ativo', eeg_data.pk)
+        yield result
+        return
+    try:
+        yield result
+    finally:
+        profiler.disable()
+        directory = profile_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"eeg-{eeg_data.pk}-{timezone.now():%Y%m%dT%H%M%S}.prof"
+        profiler.dump_stats(path)
+        result['path'] = str(path)
+
+
+@contextmanager
+def profile_ingest(eeg_data):
+    """
+    Mede o processamento de um registro e publica o perfil (log e /metrics).
+
+    Parâmetros:
+        eeg_data (EEGData): Registro em processamento
+    """
+    with ExitStack() as stack:
+        timings = current_timings() or stack.enter_context(measure_stages())
+        profile = stack.enter_context(job_profiler(eeg_data))
+        before = {name: dict(entry) for name, entry in timings.stages.items()}
+        start = time.perf_counter()
+        status = 'failed'
+        try:
+            yield timings
+            status = 'done'
+        finally:
+            seconds = time.perf_counter() - start
+            # Com uma medição já ativa, apenas o que este processamento acrescentou
+            stages = {}
+            for name, entry in timings.stages.items():
+                previous = before.get(name, {'seconds': 0.0, 'calls': 0, 'bytes': 0})
+                if entry['calls'] > previous['calls']:
+                    stages[name] = {key: entry[key] - previous[key] for key in ('seconds', 'calls', 'bytes')}
+            stack.close()  # Grava o .prof antes do log
+            publish(eeg_data, status, seconds, stages, profile['path'])
+
+
+def input_bytes(eeg_data):
+    try:
+        return os.path.getsize(eeg_data.original_file.path)
+    except (OSError, ValueError):
+        return 0
+
+
+def publish(eeg_data, status, seconds, stages, profile_path=None):
+    nbytes = input_bytes(eeg_data)
+    record = {
+        'event': 'ingest',
+        'eeg_id': eeg_data.pk,
+        'status': status,
+        'seconds': round(seconds, 6),
+        'input_bytes': nbytes,
+        'stages': {name: {'seconds': round(entry['seconds'], 6), 'calls': entry['calls'], 'bytes': entry['bytes']}
+                   for name, entry in sorted(stages.items())},
+    }
+    if profile_path:
+        record['profile'] = profile_path
+    logger.log(logging.INFO if status == 'done' else logging.WARNING,
+               json.dumps(record), extra={'ingest': record})
+    if status != 'done':
+        return
+    try:
+        with transaction.atomic():
+            record_ingest(stages, seconds, nbytes)
+    except Exception:
+        # As métricas nunca invalidam um processamento já gravado
+        logger.exception('Falha ao gravar as métricas do EEG %s', eeg_data.pk)
@@ -0,0 +1,152 @@
+# analysis/recording_file.py
+"""
+Arquivo binário do registro original.
+
+Na ingestão os canais brutos de um upload são gravados em um único arquivo
+(`recording.eeg` no diretório do registro, ver signal_store.py), canal a canal
+e contíguo por canal (n_canais x n_amostras, float32), precedido de um
+cabeçalho pequeno:
+
+    b'SINAPEEG' | versão (uint32) | tamanho do JSON (uint32) | início dos dados (uint64) | JSON
+
+O JSON traz fs, nomes dos canais, número de amostras e o instante inicial. Os
+dados começam em uma fronteira de página, então o arquivo é aberto com
+memory-map e `RecordingReader.window(t0, t1, canais)` devolve visões (sem
+cópia) das amostras pedidas: ver 10 s de um registro de 2 h lê apenas essas
+páginas do disco.
+"""
+import json
+import struct
+
+import numpy as np
+from django.utils.text import slugify
+
+MAGIC = b'SINAPEEG'
+VERSION = 1
+PRELUDE = struct.Struct('<8sIIQ')  # magic, versão, tamanho do JSON, início dos dados
+PAGE = 4096
+HEADER_SLACK = 256  # Espaço reservado para campos gravados no fechamento (ex: start_ms)
+DTYPE = np.dtype('<f4')
+
+
+class RecordingWriter:
+    """
+    Grava o arquivo do registro bloco a bloco (tamanho final conhecido).
+
+    Parâmetros:
+        path (Path): Caminho do arquivo
+        fs (float): Taxa de amostragem (Hz)
+        channels (list): Nomes dos canais, na ordem das colunas dos blocos
+        n_samples (int): Número total de amostras por canal
+    """
+
+    def __init__(self, path, fs, channels, n_samples):
+        self.path = path
+        self.header = {
+            'fs': float(fs),
+            'channels': list(channels),
+            'n_samples': int(n_samples),
+            'dtype': DTYPE.str,
+            'start_ms': None,
+        }
+        needed = PRELUDE.size + len(json.dumps(self.header).encode()) + HEADER_SLACK
+        self.data_offset = -(-needed // PAGE) * PAGE
+        shape = (len(self.header['channels']), self.header['n_samples'])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'wb') as f:
+            f.truncate(self.data_offset + DTYPE.itemsize * shape[0] * shape[1])
+        self.data = np.memmap(path, dtype=DTYPE, mode='r+', offset=self.data_offset, shape=shape)
+
+    @property
+    def start_ms(self):
+        return self.header['start_ms']
+
+    @start_ms.setter
+    def start_ms(self, value):
+        """Instante da primeira amostra em milissegundos desde a época."""
+        self.header['start_ms'] = float(value)
+
+    def write(self, offset, block):
+        """Grava um bloco (n_amostras x n_canais) a partir da amostra `offset`."""
+        self.data[:, offset:offset + len(block)] = np.asarray(block).T
+
+    def close(self):
+        self.data.flush()
+        del self.data
+        payload = json.dumps(self.header).encode()
+        if PRELUDE.size + len(payload) > self.data_offset:
+            raise ValueError('Cabeçalho do registro maior que o espaço reservado')
+        with open(self.path, 'r+b') as f:
+            f.write(PRELUDE.pack(MAGIC, VERSION, len(payload), self.data_offset))
+            f.write(payload)
+
+
+class RecordingReader:
+    """
+    Leitura por janelas do arquivo do registro (memory-map somente leitura).
+
+    Atributos:
+        fs (float), channels (list), n_samples (int), start_ms (float ou None)
+        data (memmap): n_canais x n_amostras
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            magic, version, length, data_offset = PRELUDE.unpack(f.read(PRELUDE.size))
+            if magic != MAGIC:
+                raise ValueError(f'{path} não é um arquivo de registro EEG')
+            if version > VERSION:
+                raise ValueError(f'Versão do arquivo de registro não suportada: {version}')
+            header = json.loads(f.read(length))
+        self.path = path
+        self.fs = header['fs']
+        self.channels = header['channels']
+        self.n_samples = header['n_samples']
+        self.start_ms = header['start_ms']
+        self.data = np.memmap(
+            path, dtype=np.dtype(header['dtype']), mode='r', offset=data_offset,
+            shape=(len(self.channels), self.n_samples)
+        )
+        self._index = {name: i for i, name in enumerate(self.channels)}
+        self._slugs = {slugify(name): i for i, name in enumerate(self.channels)}
+
+    @property
+    def duration(self):
+        return self.n_samples / self.fs
+
+    def index(self, channel):
+        """Posição de um canal pelo nome (ou pelo slug usado nas chaves do armazenamento)."""
+        if channel in self._index:
+            return self._index[channel]
+        if channel in self._slugs:
+            return self._slugs[channel]
+        raise KeyError(f'Canal desconhecido: {channel}')
+
+    def channel(self, channel):
+        """Sinal inteiro de um canal (visão contígua, sem cópia)."""
+        return self.data[self.index(channel)]
+
+    def samples(self, t0=None, t1=None):
+        """Índices [i0, i1) das amostras da janela [t0, t1) em segundos desde o início."""
+        i0 = 0 if t0 is None else int(np.clip(np.floor(t0 * self.fs), 0, self.n_samples))
+        i1 = self.n_samples if t1 is None else int(np.clip(np.ceil(t1 * self.fs), i0, self.n_samples))
+        return i0, i1
+
+    def window(self, t0=None, t1=None, channels=None):
+        """
+        Amostras da janela [t0, t1) dos canais pedidos.
+
+        Parâmetros:
+            t0, t1 (float, opcional): Limites em segundos desde o início (padrão: registro inteiro)
+            channels (list, opcional): Nomes dos canais (padrão: todos)
+
+        Retorna:
+            dict: 'start' (segundos da primeira amostra), 'fs' e 'signals' ({canal: visão 1-D})
+        """
+        i0, i1 = self.samples(t0, t1)
+        names = self.channels if channels is None else list(channels)
+        return {
+            'start': i0 / self.fs,
+            'fs': self.fs,
+            'signals': {name: self.data[self.index(name), i0:i1] for name in names},
+        }
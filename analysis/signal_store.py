@@ -0,0 +1,128 @@
+# analysis/signal_store.py
+"""
+Armazenamento binário dos sinais processados.
+
+Cada registro EEG possui um diretório próprio em `settings.EEG_STORE_ROOT/<eeg_id>/`
+com um arquivo .npy (float32) por sinal, nomeado `<canal>.<tipo>.npy`. Os arquivos
+podem ser abertos com memory-map, então a leitura não exige parsing nem cópia
+do arquivo inteiro. O eixo de tempo não é gravado: é derivado do instante inicial
+e da taxa de amostragem do EEGData.
+
+Os sinais brutos ficam no arquivo do registro (`recording.eeg`, ver
+recording_file.py); `load('<canal>.raw')` devolve a visão do canal nesse
+arquivo. Registros anteriores a ele mantêm um .npy por canal bruto.
+
+Um processamento grava em um diretório temporário ao lado do definitivo
+(`staging`) que só o substitui (`replace`) depois de gravadas as análises no
+banco: uma falha deixa os arquivos anteriores junto das linhas anteriores.
+"""
+import shutil
+import uuid
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.utils.text import slugify
+
+from .recording_file import RecordingReader, RecordingWriter
+
+SIGNAL_DTYPE = np.float32
+RECORDING_FILE = 'recording.eeg'
+RAW_SUFFIX = '.raw'
+
+
+class RecordingStore:
+    """Diretório de arrays de um registro EEG."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def path(self, name):
+        return self.root / f'{name}.npy'
+
+    def exists(self, name):
+        return self.path(name).exists() or self._recording_signal(name)
+
+    @property
+    def recording_path(self):
+        return self.root / RECORDING_FILE
+
+    def create_recording(self, fs, channels, n_samples):
+        """Arquivo do registro para gravação bloco a bloco (RecordingWriter)."""
+        return RecordingWriter(self.recording_path, fs, channels, n_samples)
+
+    def recording(self):
+        """Leitor do arquivo do registro, ou None se o registro é anterior a ele."""
+        return RecordingReader(self.recording_path) if self.recording_path.exists() else None
+
+    def _recording_signal(self, name):
+        """Sinal bruto de um canal gravado no arquivo do registro (ex: 'eeg-channel-1.raw')."""
+        return name.endswith(RAW_SUFFIX) and self.recording_path.exists()
+
+    def save(self, name, array, dtype=SIGNAL_DTYPE):
+        self.root.mkdir(parents=True, exist_ok=True)
+        np.save(self.path(name), np.asarray(array, dtype=dtype))
+
+    def create(self, name, shape, dtype=SIGNAL_DTYPE):
+        """
+        Cria um .npy com o formato final e o retorna mapeado em memória para
+        escrita incremental (ex: bloco a bloco durante a ingestão).
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        return np.lib.format.open_memmap(self.path(name), mode='w+', dtype=dtype, shape=shape)
+
+    def load(self, name, mmap=True):
+        """
+        Carrega um array salvo. Com `mmap=True` o arquivo é mapeado em memória
+        (somente leitura) e apenas as páginas acessadas são lidas do disco.
+        """
+        if not self.path(name).exists() and self._recording_signal(name):
+            signal = self.recording().channel(name[:-len(RAW_SUFFIX)])
+            return signal if mmap else np.array(signal)
+        return np.load(self.path(name), mmap_mode='r' if mmap else None)
+
+    def remove(self, name):
+        self.path(name).unlink(missing_ok=True)
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def staging(self):
+        """Armazenamento temporário ao lado deste, para um novo processamento (ver replace)."""
+        return RecordingStore(self.root.with_name(f'.{self.root.name}.staging-{uuid.uuid4().hex[:8]}'))
+
+    def replace(self, staging):
+        """
+        Substitui o conteúdo deste armazenamento pelo de `staging` (renomeações no
+        mesmo sistema de arquivos); os arquivos anteriores são removidos em seguida.
+        """
+        previous = None
+        if self.root.exists():
+            previous = self.root.with_name(f'.{self.root.name}.old-{uuid.uuid4().hex[:8]}')
+            self.root.rename(previous)
+        staging.root.rename(self.root)
+        if previous is not None:
+            shutil.rmtree(previous, ignore_errors=True)
+
+    def nbytes(self):
+        if not self.root.exists():
+            return 0
+        return sum(f.stat().st_size for f in self.root.iterdir() if f.is_file())
+
+
+def store_root():
+    return Path(getattr(settings, 'EEG_STORE_ROOT', Path(settings.MEDIA_ROOT) / 'eeg_store'))
+
+
+def store_for(eeg_data):
+    return RecordingStore(store_root() / str(eeg_data.pk))
+
+
+def band_key(banda):
+    """Nome do array com a média entre canais de uma banda, ex: 'band.alpha'."""
+    return f'band.{banda}'
+
+
+def signal_key(channel_name, kind):
+    """Nome do array de um canal, ex: ('EEG Channel 1', 'notch') -> 'eeg-channel-1.notch'."""
+    return f'{slugify(channel_name)}.{kind}'
@@ -0,0 +1,30 @@
+# analysis/signals.py
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import EEGData
+from .statistics import channel_totals, update_statistics
+
+
+@receiver(post_save, sender=EEGData)
+def count_upload(sender, instance, created, **kwargs):
+    if created:
+        update_statistics(total_uploads=1, total_processed=int(instance.processed))
+
+
+@receiver(pre_delete, sender=EEGData)
+def discount_recording(sender, instance, **kwargs):
+    """Retira o registro e seus canais (ainda não excluídos em cascata) das estatísticas."""
+    channels, power = channel_totals(instance.eegchannelanalysis_set.all())
+    update_statistics(
+        total_uploads=-1,
+        total_processed=-int(instance.processed),
+        total_channels=-channels,
+        total_power=-power
+    )
+
+
+@receiver(post_delete, sender=EEGData)
+def remove_signal_store(sender, instance, **kwargs):
+    """Remove os arrays binários quando o registro EEG é excluído."""
+    instance.store.clear()
@@ -0,0 +1,210 @@
+# analysis/spectral.py
+"""
+Motor espectral das métricas de banda.
+
+A densidade espectral de potência (PSD) de todos os canais é estimada em uma
+única passada de FFT (Welch por padrão, multitaper opcional) e as potências de
+todas as bandas, absolutas e relativas, são integradas a partir dela.
+`PSDAccumulator` recebe o sinal em blocos consecutivos e produz exatamente o
+mesmo resultado de `scipy.signal.welch` aplicado ao sinal inteiro;
+`EpochBandPowers` também guarda a potência das bandas em cada segmento (época),
+formando a série temporal lida por `epochs.EpochSeries`.
+"""
+import numpy as np
+from django.conf import settings
+from scipy.signal import get_window
+from scipy.signal.windows import dpss
+
+from .filter_bank import BANDAS
+
+PSD_METHODS = ('welch', 'multitaper')
+
+
+def get_bands():
+    """Bandas das métricas: BANDAS mais as definidas pelo usuário em settings.EEG_BANDS."""
+    return {**BANDAS, **getattr(settings, 'EEG_BANDS', {})}
+
+
+def psd_options():
+    """Parâmetros da estimativa de PSD definidos em settings (EEG_PSD_*)."""
+    return {
+        'method': getattr(settings, 'EEG_PSD_METHOD', 'welch'),
+        'segment': getattr(settings, 'EEG_PSD_SEGMENT', 2.0),
+        'bandwidth': getattr(settings, 'EEG_PSD_BANDWIDTH', 2.0),
+    }
+
+
+def epoch_options():
+    """Janela e sobreposição das épocas definidas em settings (EEG_EPOCH_*)."""
+    return {
+        'window': getattr(settings, 'EEG_EPOCH_SECONDS', 2.0),
+        'overlap': getattr(settings, 'EEG_EPOCH_OVERLAP', 0.5),
+    }
+
+
+class PSDAccumulator:
+    """
+    Estimativa da PSD por média de segmentos sobrepostos, bloco a bloco.
+
+    Parâmetros:
+        fs (float): Taxa de amostragem (Hz)
+        n_channels (int): Número de canais (colunas dos blocos)
+        method (str): 'welch' (janela de Hann) ou 'multitaper' (tapers DPSS por segmento)
+        segment (float): Duração de cada segmento em segundos (resolução = 1/segment Hz)
+        bandwidth (float): Meia largura de banda NW dos tapers DPSS (multitaper)
+    """
+
+    def __init__(self, fs, n_channels, method='welch', segment=2.0, bandwidth=2.0, overlap=0.5):
+        if method not in PSD_METHODS:
+            raise ValueError(f'Método de PSD desconhecido: {method}')
+        if not 0 <= overlap < 1:
+            raise ValueError('A sobreposição deve estar em [0, 1)')
+        self.fs = float(fs)
+        self.method = method
+        self.bandwidth = bandwidth
+        self.overlap = overlap
+        self.n_channels = n_channels
+        self.tail = np.empty((0, n_channels))
+        self.position = 0  # Índice (no sinal completo) da primeira amostra de `tail`
+        self.total = None
+        self.count = 0
+        self._set_length(max(int(segment * self.fs), 1))
+
+    def _set_length(self, nperseg):
+        self.nperseg = nperseg
+        self.hop = max(nperseg - int(nperseg * self.overlap), 1)
+        if self.method == 'welch':
+            tapers = get_window('hann', nperseg)[None, :]
+        else:
+            n_tapers = max(int(2 * self.bandwidth) - 1, 1)
+            tapers = np.atleast_2d(dpss(nperseg, self.bandwidth, n_tapers))
+        self.tapers = tapers
+        # Escala de densidade (V²/Hz) de cada taper
+        self.scale = 1.0 / (self.fs * np.sum(tapers ** 2, axis=1))
+        self.freq = np.fft.rfftfreq(nperseg, 1 / self.fs)
+
+    def _periodograms(self, segments):
+        """
+        PSD unilateral de cada segmento (n_segmentos, nperseg, n_canais) ->
+        (n_segmentos, n_frequências, n_canais), com a média removida (detrend 'constant').
+        """
+        segments = segments - segments.mean(axis=1, keepdims=True)
+        power = np.zeros((len(segments), len(self.freq), self.n_channels))
+        for taper, scale in zip(self.tapers, self.scale):
+            spectrum = np.fft.rfft(segments * taper[None, :, None], axis=1)
+            power += np.abs(spectrum) ** 2 * scale
+        power /= len(self.tapers)
+        # Espectro unilateral: dobra as frequências positivas (exceto DC e Nyquist)
+        if self.nperseg % 2:
+            power[:, 1:] *= 2
+        else:
+            power[:, 1:-1] *= 2
+        return power
+
+    def _accumulate(self, segments, starts):
+        power = self._periodograms(segments)
+        self.on_segments(power, starts)
+        self.total = power.sum(axis=0) if self.total is None else self.total + power.sum(axis=0)
+        self.count += len(segments)
+
+    def on_segments(self, power, starts):
+        """Chamado com a PSD de cada segmento e o índice da sua primeira amostra."""
+
+    def push(self, block):
+        """Acrescenta um bloco (n_amostras x n_canais) e processa os segmentos completos."""
+        data = np.concatenate([self.tail, block]) if len(self.tail) else np.asarray(block, dtype=np.float64)
+        n_segments = (len(data) - self.nperseg) // self.hop + 1 if len(data) >= self.nperseg else 0
+        if n_segments:
+            starts = np.arange(n_segments) * self.hop
+            windows = np.lib.stride_tricks.sliding_window_view(data, self.nperseg, axis=0)[starts]
+            self._accumulate(windows.transpose(0, 2, 1), self.position + starts)
+        # Mantém as amostras a partir do início do próximo segmento
+        self.tail = data[n_segments * self.hop:].copy()
+        self.position += n_segments * self.hop
+
+    def result(self):
+        """
+        Retorna (f, psd), com psd no formato (n_frequências x n_canais).
+        Sinais mais curtos que um segmento usam um único segmento do tamanho do sinal.
+        """
+        if self.count == 0:
+            if not len(self.tail):
+                raise ValueError('Nenhuma amostra recebida')
+            self._set_length(len(self.tail))
+            self._accumulate(self.tail[None], np.array([self.position]))
+        return self.freq, self.total / self.count
+
+
+class EpochBandPowers(PSDAccumulator):
+    """
+    Potência absoluta de cada banda em épocas deslizantes (um segmento por
+    época), de todos os canais, calculada junto com a PSD do registro.
+
+    Parâmetros:
+        fs (float): Taxa de amostragem (Hz)
+        n_channels (int): Número de canais
+        bands (dict, opcional): banda -> (low, high) (padrão: get_bands())
+        window (float): Duração de cada época em segundos
+        overlap (float): Fração de sobreposição entre épocas consecutivas
+        method (str): 'welch' ou 'multitaper'
+    """
+
+    def __init__(self, fs, n_channels, bands=None, window=2.0, overlap=0.5, method='welch', bandwidth=2.0):
+        self.bands = bands or get_bands()
+        self.epoch_starts = []
+        self.epoch_powers = []
+        super().__init__(fs, n_channels, method=method, segment=window, bandwidth=bandwidth, overlap=overlap)
+
+    def on_segments(self, power, starts):
+        df = self.freq[1] - self.freq[0] if len(self.freq) > 1 else 1.0
+        # (n_épocas, n_canais, n_bandas)
+        self.epoch_powers.append(np.stack([
+            power[:, (self.freq >= low) & (self.freq < high)].sum(axis=1) * df
+            for low, high in self.bands.values()
+        ], axis=-1).astype(np.float32))
+        self.epoch_starts.append(starts)
+
+    def epochs(self):
+        """
+        Retorna (tempos, potências): o centro de cada época em segundos desde o
+        início e a matriz (n_épocas x n_canais x n_bandas), bandas na ordem de `bands`.
+        """
+        if not self.count:
+            self.result()
+        starts = np.concatenate(self.epoch_starts)
+        return (starts + self.nperseg / 2) / self.fs, np.concatenate(self.epoch_powers)
+
+
+def compute_psd(data, fs, method='welch', segment=2.0, bandwidth=2.0, overlap=0.5):
+    """PSD de todos os canais de uma matriz (n_amostras x n_canais) de uma só vez."""
+    accumulator = PSDAccumulator(fs, data.shape[1], method, segment, bandwidth, overlap)
+    accumulator.push(data)
+    return accumulator.result()
+
+
+def band_metrics(f, psd, bands=None):
+    """
+    Potência absoluta e relativa de cada banda a partir da PSD.
+
+    A potência absoluta é a integral da PSD na faixa [low, high); a relativa é
+    a fração da potência total no intervalo coberto por BANDAS (0.5-40 Hz).
+
+    Retorna:
+        dict: banda -> {'absolute': array (n_canais), 'relative': array (n_canais)}
+    """
+    bands = bands or get_bands()
+    df = f[1] - f[0] if len(f) > 1 else 1.0
+
+    def integrate(low, high):
+        mask = (f >= low) & (f < high)
+        return psd[mask].sum(axis=0) * df
+
+    low = min(l for l, _ in BANDAS.values())
+    high = max(h for _, h in BANDAS.values())
+    total = integrate(low, high)
+    total = np.where(total > 0, total, np.nan)
+    metrics = {}
+    for banda, (low, high) in bands.items():
+        absolute = integrate(low, high)
+        metrics[banda] = {'absolute': absolute, 'relative': np.nan_to_num(absolute / total)}
+    return metrics
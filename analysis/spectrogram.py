@@ -0,0 +1,124 @@
+# analysis/spectrogram.py
+"""
+Armazenamento compacto dos espectrogramas.
+
+Os espectrogramas são gravados já convertidos para dB, apenas nas frequências
+exibidas (SPECTROGRAM_CONFIG) e quantizados em uint8: cada faixa de
+SPECTROGRAM_BLOCK janelas tem seu próprio deslocamento e escala, de modo que a
+gravação pode ser feita faixa a faixa, sem conhecer o registro inteiro. A
+leitura (`QuantizedSpectrogram`) é preguiçosa: apenas as janelas pedidas são
+decodificadas a partir do arquivo mapeado em memória.
+
+A média entre canais exibida no dashboard é gravada da mesma forma
+(`save_average`), somando os canais faixa a faixa em escala linear.
+"""
+import numpy as np
+
+AVERAGE_KEY = 'spectrogram.mean'
+SPECTROGRAM_BLOCK = 1024  # Janelas por faixa de quantização
+DYNAMIC_RANGE = 100.0     # dB abaixo do máximo da faixa que ainda são representados
+LEVELS = 255
+
+
+def to_db(magnitude):
+    """Magnitude da STFT em dB (10·log10, a mesma escala exibida pelos gráficos)."""
+    return 10 * np.log10(np.maximum(magnitude, np.finfo(np.float32).tiny))
+
+
+def frequency_mask(freq, config):
+    """Frequências dentro de [fmin, fmax] da configuração do espectrograma."""
+    return (freq >= config['fmin']) & (freq <= config['fmax'])
+
+
+def quantize(db):
+    """Faixa em dB -> (códigos uint8, deslocamento, escala)."""
+    top = float(np.max(db)) if db.size else 0.0
+    offset = top - DYNAMIC_RANGE
+    scale = DYNAMIC_RANGE / LEVELS
+    codes = np.clip(np.rint((db - offset) / scale), 0, LEVELS).astype(np.uint8)
+    return codes, offset, scale
+
+
+class SpectrogramWriter:
+    """Grava um espectrograma quantizado faixa a faixa (faixas de SPECTROGRAM_BLOCK janelas)."""
+
+    def __init__(self, store, key, n_freq, n_windows):
+        self.codes = store.create(key, (n_freq, n_windows), dtype=np.uint8)
+        n_blocks = max(-(-n_windows // SPECTROGRAM_BLOCK), 1)
+        self.params = store.create(f'{key}.scale', (n_blocks, 2), dtype=np.float32)
+
+    def write(self, p0, db):
+        """Grava a faixa que começa na janela p0 (múltiplo de SPECTROGRAM_BLOCK)."""
+        codes, offset, scale = quantize(db)
+        self.codes[:, p0:p0 + db.shape[1]] = codes
+        self.params[p0 // SPECTROGRAM_BLOCK] = offset, scale
+
+    def close(self):
+        self.codes.flush()
+        self.params.flush()
+
+
+class QuantizedSpectrogram:
+    """Espectrograma em dB gravado por SpectrogramWriter, decodificado sob demanda."""
+
+    def __init__(self, codes, params):
+        self.codes = codes
+        self.params = params
+        self.shape = codes.shape
+
+    def decode(self, p0=0, p1=None):
+        """Janelas [p0, p1) em dB como matriz float32 (n_frequências x n_janelas)."""
+        p1 = self.shape[1] if p1 is None else min(p1, self.shape[1])
+        blocks = np.arange(p0, p1) // SPECTROGRAM_BLOCK
+        offset, scale = self.params[blocks, 0], self.params[blocks, 1]
+        return (np.asarray(self.codes[:, p0:p1], dtype=np.float32) * scale + offset).astype(np.float32)
+
+
+class LegacySpectrogram:
+    """Espectrogramas anteriores ao formato compacto (magnitude linear, todas as frequências)."""
+
+    def __init__(self, magnitude, mask):
+        self.magnitude = magnitude
+        self.mask = mask
+        self.shape = (int(mask.sum()), magnitude.shape[1])
+
+    def decode(self, p0=0, p1=None):
+        return to_db(np.asarray(self.magnitude[self.mask, p0:p1])).astype(np.float32)
+
+
+def load_spectrogram(store, key, freq, config):
+    """
+    Abre um espectrograma gravado. Retorna (frequências exibidas, espectrograma
+    com `decode(p0, p1)`), ou None se não existir.
+    """
+    if not store.exists(key):
+        return None
+    data = store.load(key)
+    if data.dtype == np.uint8:
+        return freq, QuantizedSpectrogram(data, store.load(f'{key}.scale'))
+    mask = frequency_mask(freq, config)
+    return freq[mask], LegacySpectrogram(data, mask)
+
+
+def save_average(store, freq, spectrograms, key=AVERAGE_KEY):
+    """
+    Grava a média (em escala linear) de vários espectrogramas de mesmo formato.
+    A soma é feita faixa a faixa, então a memória usada não depende da duração.
+    """
+    n_freq, n_windows = spectrograms[0].shape
+    writer = SpectrogramWriter(store, key, n_freq, n_windows)
+    for p0 in range(0, n_windows, SPECTROGRAM_BLOCK):
+        p1 = min(p0 + SPECTROGRAM_BLOCK, n_windows)
+        total = np.zeros((n_freq, p1 - p0))
+        for spectrogram in spectrograms:
+            total += 10 ** (spectrogram.decode(p0, p1) / 10)
+        writer.write(p0, to_db(total / len(spectrograms)))
+    writer.close()
+    store.save(f'{key}.freq', freq)
+
+
+def load_average(store, key=AVERAGE_KEY):
+    """Abre a média gravada por save_average: (frequências, espectrograma) ou None."""
+    if not store.exists(key):
+        return None
+    return store.load(f'{key}.freq'), QuantizedSpectrogram(store.load(key), store.load(f'{key}.scale'))
@@ -0,0 +1,72 @@
+# analysis/statistics.py
+"""
+Estatísticas públicas da página inicial.
+
+Os totais ficam em uma única linha (SiteStatistics), atualizada de forma
+incremental (um UPDATE com expressões F) quando um registro é enviado,
+processado, reprocessado ou excluído, em vez de contar as tabelas de
+registros e de canais a cada acesso à página. `rebuild_statistics` recalcula
+tudo a partir das tabelas (migração inicial e `manage.py rebuild_statistics`).
+"""
+from django.db.models import Count, F, Q, Sum
+
+from .models import EEGChannelAnalysis, EEGData, SiteStatistics
+
+SINGLETON = 1
+STATISTIC_FIELDS = ('total_uploads', 'total_channels', 'total_processed', 'total_power')
+
+
+def channel_totals(analyses):
+    """(número de canais, soma de alpha+beta+gamma) de um QuerySet de análises."""
+    totals = analyses.aggregate(
+        count=Count('id'),
+        power=Sum(F('alpha_power') + F('beta_power') + F('gamma_power'))
+    )
+    return totals['count'], totals['power'] or 0.0
+
+
+def rows_totals(rows):
+    """(número de canais, soma de alpha+beta+gamma) de análises ainda não gravadas."""
+    return len(rows), float(sum(r.alpha_power + r.beta_power + r.gamma_power for r in rows))
+
+
+def compute_statistics():
+    """Totais calculados diretamente das tabelas (varre a tabela de canais)."""
+    recordings = EEGData.objects.aggregate(
+        uploads=Count('id'),
+        processed=Count('id', filter=Q(processed=True))
+    )
+    channels, power = channel_totals(EEGChannelAnalysis.objects.all())
+    return {
+        'total_uploads': recordings['uploads'],
+        'total_channels': channels,
+        'total_processed': recordings['processed'],
+        'total_power': power,
+    }
+
+
+def rebuild_statistics():
+    values = compute_statistics()
+    SiteStatistics.objects.update_or_create(pk=SINGLETON, defaults=values)
+    return values
+
+
+def get_statistics():
+    """Totais da página inicial (uma consulta): total_uploads, total_channels, total_processed, total_power."""
+    values = SiteStatistics.objects.filter(pk=SINGLETON).values(*STATISTIC_FIELDS).first()
+    return values if values is not None else rebuild_statistics()
+
+
+def update_statistics(**deltas):
+    """
+    Soma os deltas aos totais em um único UPDATE, ex: update_statistics(total_uploads=1).
+    Sem a linha de totais (banco criado sem a migração), ela é recalculada.
+    """
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    updated = SiteStatistics.objects.filter(pk=SINGLETON).update(
+        **{field: F(field) + delta for field, delta in deltas.items()}
+    )
+    if not updated:
+        rebuild_statistics()
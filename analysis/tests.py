@@ -1,3 +1,1107 @@
-from django.test import TestCase
+import json
+import tempfile
+from concurrent.futures import Future
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.contrib.auth.models import User
+from django.db import OperationalError, connection
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from scipy.interpolate import CloughTocher2DInterpolator, griddata
+from scipy.signal import periodogram, stft, welch
+from scipy.signal.windows import dpss
+
+from .batch import ingest_batch, process_job
+from .benchmarks import compare_results, run_case, write_synthetic_csv
+from .charts import power_figure, topomap_figure
+from .eeg_processor import ensure_band_waveforms, process_eeg_data, spectrogram_transform
+from .epochs import EpochSeries
+from .figure_cache import figure_cache, figure_key
+from .filter_bank import BANDAS, get_filter_bank
+from .filter_registry import FilterRegistry
+from .jobs import claim_next_job, create_job, run_job
+from .live import close_session, get_session
+from .lod import LOD_FACTOR, MAX_WIDTH, bucket_size, build_pyramid, lod_key, pyramid_levels, read_window, save_pyramid
+from .montages import get_montage
+from .models import (
+    EEGChannelAnalysis, EEGData, IngestMetric, Montage, ProcessingJob,
+    STATUS_DONE, STATUS_FAILED, STATUS_QUEUED, STATUS_RUNNING,
+)
+from .recording_file import RecordingReader
+from .signal_store import RecordingStore, band_key, signal_key
+from .spectral import PSDAccumulator, band_metrics
+from .spectrogram import (
+    DYNAMIC_RANGE, LEVELS, SPECTROGRAM_BLOCK, QuantizedSpectrogram, SpectrogramWriter, load_average, save_average,
+)
+from .statistics import compute_statistics, get_statistics, rows_totals, update_statistics
+from .timing import TimingCheck
+from .topomap import get_topomap_weights
+from .view_benchmarks import QUERY_BUDGETS, check_thresholds, compare_view_results, run_view_benchmarks, seed_recording
+
+
+class TemporaryStoreMixin:
+    """Armazenamento de sinais (EEG_STORE_ROOT) em um diretório temporário próprio de cada teste."""
+
+    def setUp(self):
+        super().setUp()
+        self.store_dir = tempfile.TemporaryDirectory()
+        self.store_settings = override_settings(EEG_STORE_ROOT=Path(self.store_dir.name))
+        self.store_settings.enable()
+
+    def tearDown(self):
+        self.store_settings.disable()
+        self.store_dir.cleanup()
+        super().tearDown()
+
+
+class DashboardQueryBudgetTests(TemporaryStoreMixin, TestCase):
+    """Número de consultas das páginas de um registro, independente do número de canais."""
+
+    def setUp(self):
+        super().setUp()
+        figure_cache().clear()
+        user = User.objects.create_user('analista', password='senha')
+        self.client.force_login(user)
+        self.eeg_data = EEGData.objects.create(
+            original_file='eeg_data/teste.csv', status=STATUS_DONE, processed=True, age=30, sex='F'
+        )
+
+    def add_channels(self, count):
+        EEGChannelAnalysis.objects.bulk_create([
+            EEGChannelAnalysis(
+                eeg_data=self.eeg_data, channel_name=f'EEG Channel {i}',
+                delta_power=1.0, theta_power=0.5, alpha_power=2.0, beta_power=0.8, gamma_power=0.1,
+                band_powers={'alpha': {'absolute': 2.0, 'relative': 0.4}}
+            )
+            for i in range(1, count + 1)
+        ])
+
+    def test_dashboard(self):
+        # sessão, usuário, estado do registro (ETag), registro, métricas dos canais
+        for count in (8, 32):
+            self.add_channels(count - self.eeg_data.eegchannelanalysis_set.count())
+            with self.assertNumQueries(5):
+                response = self.client.get(f'/dashboard/{self.eeg_data.id}/')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.context['analyses']), count)
+
+    def test_dashboard_defers_band_powers(self):
+        self.add_channels(8)
+        response = self.client.get(f'/dashboard/{self.eeg_data.id}/')
+        for analysis in response.context['analyses']:
+            self.assertIn('band_powers', analysis.get_deferred_fields())
+
+    def test_power_chart(self):
+        self.add_channels(32)
+        url = f'/api/eeg/{self.eeg_data.id}/charts/power/'
+        with self.assertNumQueries(5):
+            self.assertEqual(self.client.get(url).status_code, 200)
+        # Figura em cache: as métricas dos canais não são consultadas
+        with self.assertNumQueries(4):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_channel_detail(self):
+        self.add_channels(8)
+        analysis = self.eeg_data.eegchannelanalysis_set.first()
+        # sessão, usuário, registro do canal, estado do registro, canal com o registro (select_related)
+        with self.assertNumQueries(5):
+            response = self.client.get(f'/channel/{analysis.id}/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_update_topomap(self):
+        self.add_channels(8)
+        url = f'/update-topomap/?eeg_id={self.eeg_data.id}'
+        for query in ('', '&banda=foo', '&banda='):
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get(url + query).status_code, 400)
+        response = self.client.get(url + '&banda=Alpha')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'dynamic-topomap')
+        # plotly.js já é carregado pela página: o fragmento traz apenas a figura
+        self.assertNotContains(response, 'cdn.plot.ly')
+
+    def test_eeg_list(self):
+        EEGData.objects.bulk_create([EEGData(original_file=f'eeg_data/{i}.csv') for i in range(15)])
+        # sessão, usuário, contagem da paginação, página
+        with self.assertNumQueries(4):
+            response = self.client.get('/eeg-list/')
+        self.assertEqual(response.status_code, 200)
+
+
+class FigureCacheTests(TemporaryStoreMixin, TestCase):
+    """Figuras geradas uma vez por versão do processamento; ETag por registro, versão, usuário e URL."""
+
+    def setUp(self):
+        super().setUp()
+        figure_cache().clear()
+        self.user = User.objects.create_user('analista')
+        self.client.force_login(self.user)
+        self.eeg_data = EEGData.objects.create(original_file='eeg_data/teste.csv')
+        EEGChannelAnalysis.objects.bulk_create([
+            EEGChannelAnalysis(
+                eeg_data=self.eeg_data, channel_name=f'EEG Channel {i}',
+                delta_power=1.0, theta_power=0.5, alpha_power=2.0 + i, beta_power=0.8, gamma_power=0.1,
+            )
+            for i in range(1, 9)
+        ])
+        self.eeg_data.set_status(STATUS_DONE)
+        self.url = f'/api/eeg/{self.eeg_data.id}/charts/power/'
+
+    def test_second_request_served_from_cache(self):
+        with mock.patch('analysis.views.power_figure', wraps=power_figure) as build:
+            first = self.client.get(self.url)
+            second = self.client.get(self.url)
+        self.assertEqual(build.call_count, 1)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(first['ETag'], second['ETag'])
+        self.assertIn('no-cache', first['Cache-Control'])
+
+    def test_if_none_match(self):
+        etag = self.client.get(self.url)['ETag']
+        with mock.patch('analysis.views.power_figure', wraps=power_figure) as build:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        build.assert_not_called()
+
+    def test_reprocess_invalidates(self):
+        etag = self.client.get(self.url)['ETag']
+        old_key = figure_key(self.eeg_data, 'chart:power')
+        self.eeg_data.set_status(STATUS_DONE)  # Reprocessamento: nova processing_version
+        with mock.patch('analysis.views.power_figure', wraps=power_figure) as build:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(build.call_count, 1)
+        self.assertNotEqual(figure_key(self.eeg_data, 'chart:power'), old_key)
+
+    def test_users_and_paths_do_not_share_etags(self):
+        etag = self.client.get(self.url)['ETag']
+        other = Client()
+        other.force_login(User.objects.create_user('outro'))
+        response = other.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        topomap = f'/api/eeg/{self.eeg_data.id}/charts/topomap/'
+        with mock.patch('analysis.views.topomap_figure', wraps=topomap_figure) as build:
+            alpha = self.client.get(topomap + '?banda=Alpha')
+            beta = self.client.get(topomap + '?banda=Beta', HTTP_IF_NONE_MATCH=alpha['ETag'])
+            self.client.get(topomap + '?banda=Alpha')
+        self.assertEqual(beta.status_code, 200)
+        self.assertNotEqual(alpha.content, beta.content)
+        self.assertEqual(build.call_count, 2)  # Uma entrada por banda
+
+
+class SiteStatisticsTests(TemporaryStoreMixin, TestCase):
+    """Totais incrementais da página inicial iguais aos recalculados a partir das tabelas."""
+
+    def create_recording(self, powers):
+        eeg_data = EEGData.objects.create(original_file='eeg_data/teste.csv')
+        rows = [
+            EEGChannelAnalysis(
+                eeg_data=eeg_data, channel_name=f'EEG Channel {i}',
+                delta_power=1.0, theta_power=1.0, alpha_power=power, beta_power=power, gamma_power=power
+            )
+            for i, power in enumerate(powers, 1)
+        ]
+        EEGChannelAnalysis.objects.bulk_create(rows)
+        update_statistics(total_channels=len(rows), total_power=rows_totals(rows)[1])
+        return eeg_data
+
+    def test_incremental_totals(self):
+        first = self.create_recording([1.0, 2.0, 3.0])
+        second = self.create_recording([0.5] * 8)
+        first.set_status(STATUS_DONE)
+        second.set_status(STATUS_DONE)
+        second.set_status(STATUS_FAILED)
+        self.assertEqual(get_statistics(), compute_statistics())
+        self.assertEqual(get_statistics()['total_processed'], 1)
+
+        first.delete()
+        self.assertEqual(get_statistics(), compute_statistics())
+        self.assertEqual(get_statistics()['total_channels'], 8)
+
+    def test_home_single_query(self):
+        self.create_recording([1.0, 2.0])
+        with self.assertNumQueries(1):
+            response = self.client.get('/')
+        self.assertEqual(response.context['stats']['total_channels'], 2)
+
+
+class IngestBenchmarkTests(TestCase):
+    """O benchmark processa um registro sintético e mede todas as etapas sem deixar dados."""
+
+    def test_run_case(self):
+        case = run_case(16, duration=4.0, fs=250.0)
+        self.assertEqual(case['samples'], 1000)
+        for name in ('parse', 'timestamps', 'filter', 'band_power', 'channels.stft', 'serialization', 'db'):
+            self.assertIn(name, case['stages'])
+        self.assertEqual(case['stages']['channels.stft']['calls'], 16)
+        self.assertGreater(case['memory']['peak_bytes'], 0)
+        self.assertFalse(EEGData.objects.exists())
+        self.assertEqual(compare_results({'results': [case]}, {'results': [case]}), [])
+
+
+class ViewBenchmarkTests(TestCase):
+    """O benchmark das páginas mede todas as páginas dentro dos orçamentos de consultas."""
+
+    def test_run_view_benchmarks(self):
+        results = run_view_benchmarks(durations=(4.0,), repeat=1)
+        views = results['results'][0]['views']
+        self.assertEqual(set(views), set(QUERY_BUDGETS))
+        self.assertGreater(views['update_topomap']['render_ms'], 0)
+        self.assertGreater(views['chart_power']['figure_ms'], 0)
+        self.assertGreater(views['chart_power']['bytes'], 0)
+        self.assertEqual(check_thresholds(results), [])
+        self.assertEqual(compare_view_results(results, results), [])
+        self.assertTrue(check_thresholds(results, max_ms=0.0))
+        self.assertFalse(EEGData.objects.exists())
+
+
+class IngestProfilingTests(TestCase):
+    """Cada processamento gera um log estruturado por etapa, os totais de /metrics e, opcionalmente, um .prof."""
+
+    def setUp(self):
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        self.media = Path(workdir.name)
+        settings = override_settings(
+            MEDIA_ROOT=self.media, EEG_STORE_ROOT=self.media / 'eeg_store',
+            EEG_PROFILE_DIR=self.media / 'profiles', EEG_METRICS_TOKEN='segredo',
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_stage_log_and_metrics(self):
+        with self.assertLogs('analysis.ingest', 'INFO') as logs:
+            eeg_data = seed_recording(self.media, 8, 4.0, 250.0)
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual((record['eeg_id'], record['status']), (eeg_data.id, 'done'))
+        self.assertGreater(record['stages']['parse']['bytes'], 0)
+        self.assertEqual(record['stages']['channels.stft']['calls'], 8)
+        self.assertEqual(IngestMetric.objects.get(stage='total').calls, 1)
+
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer segredo')
+        text = response.content.decode()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('eeg_ingest_recordings_total 1', text)
+        self.assertIn('eeg_ingest_stage_seconds_total{stage="channels.stft"}', text)
+        self.assertIn('eeg_filter_registry_hits_total', text)
+        self.assertIn('eeg_jobs{status="queued"} 0', text)
+
+    @override_settings(EEG_PROFILE_JOBS=True)
+    def test_cprofile_per_job(self):
+        with self.assertLogs('analysis.ingest', 'INFO') as logs:
+            seed_recording(self.media, 8, 2.0, 250.0)
+        profile = json.loads(logs.records[0].getMessage()).get('profile')
+        if profile is None:
+            self.skipTest('Outro profiler ativo')
+        self.assertTrue(Path(profile).is_file())
+
+
+@override_settings(EEG_JOB_MAX_ATTEMPTS=2, EEG_JOB_TIMEOUT=600)
+class ProcessingJobLifecycleTests(TestCase):
+    """Falhas voltam para a fila com adiamento; tarefas abandonadas são reservadas de novo ou falham."""
+
+    def setUp(self):
+        self.eeg_data = EEGData.objects.create(original_file='eeg_data/teste.csv')
+        self.job = create_job(self.eeg_data)
+
+    def run_failing(self, job):
+        with mock.patch('analysis.eeg_processor.process_eeg_data', side_effect=ValueError('CSV inválido')), \
+                self.assertLogs('analysis.jobs', 'ERROR'):
+            return run_job(job)
+
+    def expire(self, **fields):
+        ProcessingJob.objects.filter(pk=self.job.pk).update(**fields)
+
+    def test_retry_after_failure(self):
+        job = claim_next_job('w1')
+        job = self.run_failing(job)
+        self.assertEqual((job.status, job.attempts), (STATUS_QUEUED, 1))
+        self.assertIn('CSV inválido', job.error)
+        self.assertIsNone(claim_next_job('w1'))  # Adiamento ainda não expirou
+
+        self.expire(run_after=timezone.now())
+        job = claim_next_job('w1')
+        job = self.run_failing(job)
+        self.assertEqual((job.status, job.attempts), (STATUS_FAILED, 2))
+        self.eeg_data.refresh_from_db()
+        self.assertEqual(self.eeg_data.status, STATUS_FAILED)
+
+    def test_reclaim_abandoned_job(self):
+        job = claim_next_job('w1')
+        self.assertEqual(job.status, STATUS_RUNNING)
+        self.assertIsNone(claim_next_job('w2'))  # Em execução dentro do tempo limite
+
+        # Worker encerrado no meio do processamento
+        self.expire(started_at=timezone.now() - timedelta(seconds=601))
+        job = claim_next_job('w2')
+        self.assertEqual((job.worker, job.attempts), ('w2', 2))
+
+        # Abandonada de novo sem tentativas restantes: falha em vez de rodar outra vez
+        self.expire(started_at=timezone.now() - timedelta(seconds=601))
+        self.assertIsNone(claim_next_job('w3'))
+        job.refresh_from_db()
+        self.eeg_data.refresh_from_db()
+        self.assertEqual((job.status, self.eeg_data.status), (STATUS_FAILED, STATUS_FAILED))
+
+    def test_status_update_failure_is_retried(self):
+        # Banco bloqueado já ao marcar o registro como 'running': a tarefa volta para a fila
+        set_status = EEGData.set_status
+
+        def locked(eeg_data, status):
+            if status == STATUS_RUNNING:
+                raise OperationalError('database is locked')
+            set_status(eeg_data, status)
+
+        job = claim_next_job('w1')
+        with mock.patch.object(EEGData, 'set_status', autospec=True, side_effect=locked), \
+                self.assertLogs('analysis.jobs', 'ERROR'):
+            job = run_job(job)
+        self.assertEqual(job.status, STATUS_QUEUED)
+        self.assertIn('database is locked', job.error)
+        self.eeg_data.refresh_from_db()
+        self.assertEqual(self.eeg_data.status, STATUS_QUEUED)
+
+
+class InlineExecutor:
+    """Executor síncrono com a interface de ProcessPoolExecutor usada por ingest_batch."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, fn, *args):
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+
+
+class BatchIngestTests(TemporaryStoreMixin, TestCase):
+    """Lotes em sequência, com registros ou canais distribuídos em processos, e falhas isoladas por tarefa."""
+
+    def setUp(self):
+        super().setUp()
+        root = Path(self.store_dir.name)
+        media_settings = override_settings(MEDIA_ROOT=root / 'media')
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        (root / 'csv').mkdir()
+        self.paths = [root / 'csv' / f'r{i}.csv' for i in range(3)]
+        for seed, path in enumerate(self.paths):
+            write_synthetic_csv(path, 8, duration=5.0, fs=250.0, seed=seed)
+
+    def assert_processed(self, result, expected_done):
+        self.assertEqual(result.done, expected_done)
+        for eeg_id, status, _ in result.recordings:
+            eeg_data = EEGData.objects.get(pk=eeg_id)
+            self.assertEqual(eeg_data.status, status)
+            self.assertEqual(eeg_data.jobs.get().status, STATUS_DONE if status == STATUS_DONE else STATUS_FAILED)
+            if status == STATUS_DONE:
+                self.assertEqual(eeg_data.eegchannelanalysis_set.count(), 8)
+
+    def test_single_worker_runs_inline(self):
+        with mock.patch('analysis.batch.create_pool') as create_pool:
+            result = ingest_batch(self.paths, workers=1)
+        create_pool.assert_not_called()
+        self.assert_processed(result, 3)
+
+    def test_failed_worker_does_not_abort_batch(self):
+        def crash_r1(job_id, executor=None):
+            if ProcessingJob.objects.get(pk=job_id).eeg_data.original_file.name.endswith('r1.csv'):
+                raise OperationalError('database is locked')
+            return process_job(job_id, executor)
+
+        reported = []
+        with mock.patch('analysis.batch.create_pool', return_value=InlineExecutor()) as create_pool, \
+                mock.patch('analysis.batch.process_job', side_effect=crash_r1), \
+                self.assertLogs('analysis.batch', 'ERROR'):
+            result = ingest_batch(self.paths, workers=4, on_result=lambda *outcome: reported.append(outcome))
+        create_pool.assert_called_once_with(3)  # Limitado ao número de arquivos
+        self.assertEqual(len(reported), 3)
+        self.assertEqual(result.failed, 1)
+        self.assert_processed(result, 2)
+        failed = ProcessingJob.objects.get(eeg_data__original_file__endswith='r1.csv')
+        self.assertIn('database is locked', failed.error)
+
+    def test_channel_workers_match_sequential(self):
+        # Pool de processos real: os canais são processados nos filhos a partir do armazenamento
+        pooled = ingest_batch(self.paths[:1], channel_workers=2)
+        sequential = ingest_batch(self.paths[:1], workers=1)
+        self.assert_processed(pooled, 1)
+        self.assert_processed(sequential, 1)
+        stores = [EEGData.objects.get(pk=result.recordings[0][0]).store for result in (pooled, sequential)]
+        names = sorted(path.name for path in stores[0].root.glob('*.npy'))
+        self.assertEqual(names, sorted(path.name for path in stores[1].root.glob('*.npy')))
+        for name in names:
+            with self.subTest(array=name):
+                key = name[:-len('.npy')]
+                np.testing.assert_array_equal(stores[0].load(key), stores[1].load(key))
+
+
+class IngestTransactionTests(TemporaryStoreMixin, TransactionTestCase):
+    """
+    Gravação das análises: um único INSERT, reprocessamento que substitui as linhas e
+    corrige as estatísticas, e falha no banco que mantém linhas e arquivos anteriores.
+    Sem transação externa (como nos workers): os arquivos são publicados no commit.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.media = Path(self.store_dir.name) / 'media'
+        media_settings = override_settings(MEDIA_ROOT=self.media)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        (self.media / 'eeg_data').mkdir(parents=True)
+        _, montage = self.write_csv(duration=4.0)
+        self.eeg_data = EEGData.objects.create(original_file='eeg_data/registro.csv', sampling_rate=250.0, montage=montage)
+
+    def write_csv(self, duration, seed=0):
+        return write_synthetic_csv(self.media / 'eeg_data' / 'registro.csv', 8, duration=duration, fs=250.0, seed=seed)
+
+    def snapshot(self):
+        self.eeg_data.refresh_from_db()
+        rows = list(self.eeg_data.eegchannelanalysis_set.order_by('pk').values_list('pk', 'n_samples', 'alpha_power'))
+        return rows, get_statistics(), self.eeg_data.timing, self.eeg_data.recording.n_samples
+
+    def leftover_dirs(self):
+        return [path.name for path in Path(self.store_dir.name).iterdir() if path.name.startswith('.')]
+
+    def test_single_bulk_insert(self):
+        with CaptureQueriesContext(connection) as queries:
+            process_eeg_data(self.eeg_data)
+        inserts = [q['sql'] for q in queries if q['sql'].startswith('INSERT INTO "analysis_eegchannelanalysis"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(self.eeg_data.eegchannelanalysis_set.count(), 8)
+        self.assertEqual(self.eeg_data.recording.n_samples, 1000)
+        self.assertEqual(self.leftover_dirs(), [])
+
+    def test_reprocess_replaces_rows(self):
+        process_eeg_data(self.eeg_data)
+        old_rows, old_statistics, _, _ = self.snapshot()
+        with self.assertRaises(ValueError):
+            process_eeg_data(self.eeg_data)
+
+        self.write_csv(duration=6.0, seed=1)
+        process_eeg_data(self.eeg_data, reprocess=True)
+        rows, statistics, timing, n_samples = self.snapshot()
+        self.assertEqual(len(rows), 8)
+        self.assertFalse({pk for pk, _, _ in rows} & {pk for pk, _, _ in old_rows})
+        self.assertEqual({samples for _, samples, _ in rows}, {1500})
+        self.assertEqual((timing['n_samples'], n_samples), (1500, 1500))
+        # Estatísticas: os canais substituídos são descontados
+        self.assertEqual(statistics['total_channels'], old_statistics['total_channels'])
+        self.assertEqual(statistics['total_processed'], 1)
+        expected = compute_statistics()
+        self.assertEqual(statistics['total_channels'], expected['total_channels'])
+        self.assertAlmostEqual(statistics['total_power'], expected['total_power'], places=6)
+        self.assertEqual(self.leftover_dirs(), [])
+
+    def test_failed_reprocess_keeps_previous_rows_and_files(self):
+        process_eeg_data(self.eeg_data)
+        before = self.snapshot()
+        self.write_csv(duration=6.0, seed=1)
+        with mock.patch('analysis.eeg_processor.update_statistics', side_effect=RuntimeError('falha no banco')), \
+                self.assertLogs('analysis.ingest', 'WARNING'), self.assertRaises(RuntimeError):
+            process_eeg_data(self.eeg_data, reprocess=True)
+        self.assertEqual(self.snapshot(), before)
+        self.assertEqual(self.eeg_data.start_time.timestamp(), before[2]['start_ms'] / 1000)
+        channel = self.eeg_data.eegchannelanalysis_set.first()
+        self.assertEqual(len(self.eeg_data.store.load(signal_key(channel.channel_name, 'notch'))), 1000)
+        self.assertEqual(self.leftover_dirs(), [])
+
+
+class BandWaveformTests(TemporaryStoreMixin, TestCase):
+    """
+    Formas de onda médias por banda (gráfico de ondas cerebrais): calculadas na
+    ingestão, completadas para registros antigos e servidas pela janela do zoom.
+    """
+
+    def setUp(self):
+        super().setUp()
+        media = Path(self.store_dir.name) / 'media'
+        media_settings = override_settings(MEDIA_ROOT=media)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        (media / 'eeg_data').mkdir(parents=True)
+        _, montage = write_synthetic_csv(media / 'eeg_data' / 'registro.csv', 8, duration=40.0, fs=250.0)
+        self.eeg_data = EEGData.objects.create(original_file='eeg_data/registro.csv', sampling_rate=250.0, montage=montage)
+        # Blocos pequenos: o estado dos filtros é carregado entre blocos
+        process_eeg_data(self.eeg_data, chunksize=3000)
+        self.store = self.eeg_data.store
+
+    def expected_bands(self):
+        signals = self.eeg_data.recording.window(None, None)['signals']
+        mean = np.mean([np.asarray(signal, dtype=np.float64) for signal in signals.values()], axis=0)
+        return dict(get_filter_bank(250.0).iter_bands(mean))
+
+    def test_ingest_matches_band_of_channel_mean(self):
+        for banda, expected in self.expected_bands().items():
+            with self.subTest(banda=banda):
+                band = self.store.load(band_key(banda))
+                self.assertEqual(len(band), 10000)
+                np.testing.assert_allclose(band, expected, atol=1e-3)
+                self.assertTrue(self.store.exists(lod_key(band_key(banda), 1)))
+
+    def test_missing_waveforms_are_backfilled(self):
+        stored = {banda: np.array(self.store.load(band_key(banda))) for banda in BANDAS}
+        for path in Path(self.store.root).glob('band.*'):
+            path.unlink()
+        ensure_band_waveforms(self.eeg_data)
+        for banda in BANDAS:
+            with self.subTest(banda=banda):
+                np.testing.assert_allclose(self.store.load(band_key(banda)), stored[banda], atol=1e-3)
+                self.assertTrue(self.store.exists(lod_key(band_key(banda), 1)))
+
+    def test_brain_waves_window(self):
+        self.client.force_login(User.objects.create_user('analista'))
+        response = self.client.get(f'/dashboard/{self.eeg_data.id}/brain-waves/window/?t0=2&t1=3&width=5000')
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertEqual(set(payload), set(BANDAS))
+        for banda in BANDAS:
+            with self.subTest(banda=banda):
+                band = self.store.load(band_key(banda))
+                self.assertEqual(payload[banda]['level'], 0)
+                expected = band[500:750] / np.max(np.abs(band)) * 0.5
+                np.testing.assert_allclose(payload[banda]['y'], expected, rtol=1e-6)
+                self.assertEqual(len(payload[banda]['x']), 250)
+
+        # Registro inteiro: nível decimado (mínimo e máximo por bucket) dentro de [-0.5, 0.5]
+        payload = self.client.get(f'/dashboard/{self.eeg_data.id}/brain-waves/window/?width=100').json()
+        for banda in BANDAS:
+            self.assertGreater(payload[banda]['level'], 0)
+            self.assertAlmostEqual(np.max(np.abs(payload[banda]['y'])), 0.5, places=6)
+
+
+class EpochPowersTests(TemporaryStoreMixin, TestCase):
+    """Potências por época: recorte por tempo, filtros de canal e banda, valores absolutos e relativos."""
+
+    def setUp(self):
+        super().setUp()
+        media = Path(self.store_dir.name) / 'media'
+        media_settings = override_settings(MEDIA_ROOT=media)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        self.client.force_login(User.objects.create_user('analista'))
+        # 10 s, épocas de 2 s com 50% de sobreposição: centros em 1, 2, ..., 9 s
+        self.eeg_data = seed_recording(media, 8, 10.0, 250.0)
+        self.url = f'/dashboard/{self.eeg_data.id}/epochs/'
+        self.channels = list(self.eeg_data.eegchannelanalysis_set.order_by('pk').values_list('channel_name', flat=True))
+
+    def test_time_window(self):
+        payload = self.client.get(self.url).json()
+        start = self.eeg_data.start_epoch_ms
+        self.assertEqual(payload['x'], [start + 1000.0 * t for t in range(1, 10)])
+        payload = self.client.get(self.url + '?t0=2.5&t1=6').json()
+        self.assertEqual(payload['x'], [start + 3000.0, start + 4000.0, start + 5000.0])
+        self.assertEqual(len(payload['sentiment']), 3)
+        self.assertEqual(self.client.get(self.url + '?t0=20').json()['x'], [])
+
+    def test_channel_and_band_filters(self):
+        full = self.client.get(self.url).json()
+        payload = self.client.get(self.url, {'channel': self.channels[2], 'banda': ['beta', 'alpha']}).json()
+        self.assertEqual((payload['channels'], payload['bands']), ([self.channels[2]], ['beta', 'alpha']))
+        self.assertEqual(payload['powers']['alpha'][self.channels[2]], full['powers']['alpha'][self.channels[2]])
+        self.assertEqual(payload['mean']['beta'], full['powers']['beta'][self.channels[2]])
+        self.assertNotIn('sentiment', payload)  # Sem todas as bandas
+
+    def test_absolute_and_relative(self):
+        absolute = self.client.get(self.url).json()
+        relative = self.client.get(self.url + '?value=relative').json()
+        self.assertEqual((absolute['value'], relative['value']), ('absolute', 'relative'))
+        for channel in self.channels:
+            totals = np.sum([absolute['powers'][banda][channel] for banda in BANDAS], axis=0)
+            fractions = [relative['powers'][banda][channel] for banda in BANDAS]
+            np.testing.assert_allclose(np.sum(fractions, axis=0), 1.0, rtol=1e-6)
+            np.testing.assert_allclose(fractions[2], np.array(absolute['powers']['alpha'][channel]) / totals, rtol=1e-5)
+        # Com os parâmetros padrão as épocas são os segmentos da PSD: a média é a potência do registro
+        for analysis in self.eeg_data.eegchannelanalysis_set.all():
+            for banda in BANDAS:
+                self.assertAlmostEqual(
+                    np.mean(absolute['powers'][banda][analysis.channel_name]) / analysis.band_powers[banda]['absolute'],
+                    1.0, places=5
+                )
+
+    def test_invalid_parameters(self):
+        for query in ('?channel=Fpz', '?banda=mu', '?value=db', '?t0=nan'):
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get(self.url + query).status_code, 400)
+
+    def test_recording_without_epochs(self):
+        # Registros processados antes das épocas: sem série, a API responde 404
+        for key in ('epoch_times', 'epoch_powers', 'epoch_channels', 'epoch_bands'):
+            self.eeg_data.store.remove(key)
+        self.assertIsNone(EpochSeries.for_recording(self.eeg_data))
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+class LevelOfDetailTests(TestCase):
+    """Pirâmide min/max: cada bucket guarda o mínimo e o máximo exatos das suas amostras."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.store = RecordingStore(directory.name)
+        self.signal = np.random.default_rng(7).normal(size=100003).astype(np.float32)
+        self.signal[54321] = 50.0  # Pico isolado
+
+    def brute_force(self, bucket):
+        buckets = [self.signal[i:i + bucket] for i in range(0, len(self.signal), bucket)]
+        return np.array([[b.min(), b.max()] for b in buckets])
+
+    def test_pyramid(self):
+        levels = build_pyramid(self.signal)
+        self.assertEqual(len(levels), pyramid_levels(len(self.signal)))
+        self.assertGreaterEqual(len(levels), 2)
+        for level, values in enumerate(levels, 1):
+            with self.subTest(level=level):
+                np.testing.assert_array_equal(values, self.brute_force(bucket_size(level)))
+                self.assertEqual(values[:, 1].max(), 50.0)
+
+    def test_read_window(self):
+        self.store.save('fp1.raw', self.signal)
+        save_pyramid(self.store, 'fp1.raw', self.signal)
+        self.store.save('legado.raw', self.signal)
+        fs, n = 250.0, len(self.signal)
+        for t0, t1, width in ((None, None, 1500), (10.3, 300.7, 800), (-5, 50.0, 100), (100.0, 101.0, 1500)):
+            with self.subTest(t0=t0, t1=t1, width=width):
+                window = read_window(self.store, 'fp1.raw', n, fs, t0, t1, width)
+                i0 = 0 if t0 is None else int(np.clip(np.floor(t0 * fs), 0, n))
+                i1 = n if t1 is None else int(np.clip(np.ceil(t1 * fs), i0, n))
+                expected = self.signal[i0:i1]
+                if window['level'] == 0:
+                    np.testing.assert_array_equal(window['y'], expected)
+                    continue
+                bucket = window['bucket']
+                # Ao menos um bucket por pixel, e o nível seguinte já teria menos
+                self.assertGreaterEqual((i1 - i0) / bucket, width)
+                self.assertLess((i1 - i0) / (bucket * LOD_FACTOR), width)
+                # Buckets que cobrem a janela, iguais ao cálculo direto e ao de registros sem pirâmide
+                j0, j1 = i0 // bucket, -(-i1 // bucket)
+                np.testing.assert_array_equal(window['y'].reshape(-1, 2), self.brute_force(bucket)[j0:j1])
+                legacy = read_window(self.store, 'legado.raw', n, fs, t0, t1, width)
+                np.testing.assert_array_equal(legacy['y'], window['y'])
+                np.testing.assert_allclose(window['t'][::2], (np.arange(j0, j1) + 0.5) * bucket / fs)
+                self.assertLessEqual(window['y'].min(), expected.min())
+                self.assertGreaterEqual(window['y'].max(), expected.max())
+
+
+class TimingCheckTests(TestCase):
+    """Validação dos timestamps: falhas, retrocessos e jitter, com o mesmo relatório em qualquer divisão em blocos."""
+
+    def check(self, timestamps, splits=(), **kwargs):
+        timing = TimingCheck(250.0, **kwargs)
+        for block in np.split(np.asarray(timestamps, dtype=np.float64), list(splits)):
+            timing.push(block)
+        return timing.report()
+
+    def test_regular(self):
+        rng = np.random.default_rng(8)
+        timestamps = 1633024800000 + np.arange(5000) * 4.0 + rng.uniform(-0.5, 0.5, 5000)
+        report = self.check(timestamps, splits=(1, 2000, 2001))
+        self.assertTrue(report['regular'])
+        self.assertEqual((report['gaps'], report['backwards'], report['events']), (0, 0, []))
+        self.assertEqual(report['start_ms'], timestamps[0])
+        self.assertEqual(report['end_ms'], timestamps[-1])
+        self.assertAlmostEqual(report['estimated_fs'], 250.0, delta=0.01)
+        # Desvio-padrão da diferença de dois uniformes em [-0.5, 0.5]: sqrt(1/6)
+        self.assertAlmostEqual(report['jitter_ms'], np.sqrt(1 / 6), delta=0.02)
+        self.assertLessEqual(report['max_jitter_ms'], 1.0)
+
+    def test_gaps_and_backwards(self):
+        timestamps = np.arange(1000) * 4.0
+        timestamps = np.delete(timestamps, [300, 301, 302])  # 3 amostras perdidas antes da amostra 300
+        # Timestamp repetido e retrocesso: o intervalo seguinte a cada um também conta como falha
+        timestamps[600] = timestamps[599]
+        timestamps[800] = timestamps[799] - 10
+        expected = None
+        for splits in ((), (300,), (299, 600, 601, 800)):
+            with self.subTest(splits=splits):
+                report = self.check(timestamps, splits=splits)
+                self.assertFalse(report['regular'])
+                self.assertEqual(report['backwards'], 2)
+                self.assertEqual(report['gaps'], 3)
+                gap = report['events'][0]
+                self.assertEqual((gap['kind'], gap['sample'], gap['interval_ms']), ('gap', 300, 16.0))
+                self.assertEqual([event['sample'] for event in report['events']], [300, 600, 601, 800, 801])
+                self.assertEqual([event['kind'] for event in report['events']], ['gap', 'backwards', 'gap', 'backwards', 'gap'])
+                if expected is None:
+                    expected = report
+                self.assertEqual(report, expected)
+
+    def test_event_limit(self):
+        timestamps = np.cumsum(np.tile([4.0, 12.0], 100))
+        report = self.check(timestamps, splits=(51,), max_events=5)
+        self.assertEqual(report['gaps'], 100)
+        self.assertEqual(report['dropped_samples'], 200)
+        self.assertEqual(len(report['events']), 5)
+
+
+class WindowParamsTests(TestCase):
+    """Limites de janela não finitos são rejeitados antes de ler o armazenamento."""
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_user('analista'))
+        self.eeg_data = EEGData.objects.create(original_file='eeg_data/teste.csv', status=STATUS_DONE, processed=True)
+        self.analysis = EEGChannelAnalysis.objects.create(
+            eeg_data=self.eeg_data, channel_name='Fp1',
+            delta_power=1.0, theta_power=1.0, alpha_power=1.0, beta_power=1.0, gamma_power=1.0
+        )
+
+    def test_non_finite_bounds(self):
+        for query in ('t0=nan', 't1=inf', 't0=-inf&t1=1', 't0=abc'):
+            with self.subTest(query=query):
+                response = self.client.get(f'/channel/{self.analysis.id}/window/?{query}')
+                self.assertEqual(response.status_code, 400)
+                response = self.client.get(f'/dashboard/{self.eeg_data.id}/brain-waves/window/?{query}')
+                self.assertEqual(response.status_code, 400)
+
+    def test_width_is_clamped(self):
+        window = {'level': 0, 'bucket': 1, 't': np.zeros(0), 'y': np.zeros(0)}
+        for width, expected in (('100000000', MAX_WIDTH), ('0', 1), ('-5', 1), ('800', 800)):
+            with self.subTest(width=width):
+                with mock.patch('analysis.views.channel_window_data', return_value=window) as read:
+                    response = self.client.get(f'/channel/{self.analysis.id}/window/?width={width}')
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(read.call_args.args[-1], expected)
+
+    def test_channel_views_require_login(self):
+        self.client.logout()
+        for url in (f'/channel/{self.analysis.id}/', f'/api/channel/{self.analysis.id}/chart/',
+                    f'/channel/{self.analysis.id}/window/'):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 302)
+                self.assertIn('login', response['Location'])
+
+
+class RecordingWindowTests(TemporaryStoreMixin, TestCase):
+    """Janelas do sinal bruto lidas do arquivo do registro: limites, instante inicial e visões sem cópia."""
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(User.objects.create_user('analista'))
+        self.eeg_data = EEGData.objects.create(
+            original_file='eeg_data/teste.csv', sampling_rate=100.0, status=STATUS_DONE, processed=True
+        )
+        self.signals = np.random.default_rng(2).normal(size=(300, 2)).astype(np.float32)
+        writer = self.eeg_data.store.create_recording(100.0, ['Fp1', 'Fp2'], len(self.signals))
+        writer.write(0, self.signals[:128])
+        writer.write(128, self.signals[128:])
+        writer.start_ms = 1633024800000
+        writer.close()
+        self.analysis = EEGChannelAnalysis.objects.create(
+            eeg_data=self.eeg_data, channel_name='Fp2', n_samples=len(self.signals),
+            delta_power=1.0, theta_power=1.0, alpha_power=1.0, beta_power=1.0, gamma_power=1.0
+        )
+
+    def test_window(self):
+        recording = self.eeg_data.recording
+        self.assertEqual(recording.start_ms, 1633024800000)
+        for t0, t1, i0, i1 in ((0.5, 1.2, 50, 120), (-1.0, 0.3, 0, 30), (2.5, 10.0, 250, 300), (None, None, 0, 300)):
+            with self.subTest(t0=t0, t1=t1):
+                window = recording.window(t0, t1, ['Fp2'])
+                self.assertEqual(window['start'], i0 / 100.0)
+                signal = window['signals']['Fp2']
+                np.testing.assert_array_equal(signal, self.signals[i0:i1, 1])
+                self.assertIsInstance(signal, np.memmap)
+                self.assertTrue(np.shares_memory(signal, recording.data))
+
+    def test_channel_window_view(self):
+        with mock.patch.object(RecordingReader, 'window', autospec=True, side_effect=RecordingReader.window) as window:
+            response = self.client.get(f'/channel/{self.analysis.id}/window/?kind=raw&t0=-1&t1=1.2&width=1000')
+        self.assertEqual(response.status_code, 200)
+        window.assert_called_once()
+        payload = response.json()
+        self.assertEqual(payload['level'], 0)
+        self.assertEqual(len(payload['x']), 120)
+        np.testing.assert_allclose(payload['y'], self.signals[:120, 1])
+
+
+class SpectrogramTransformTests(TestCase):
+    """A STFT por faixas de janelas reproduz scipy.signal.stft para qualquer duração."""
+
+    LENGTHS = [*range(2, 300), 383, 384, 385, 511, 513, 1024, 1025, 1153, 2000, 128 * 40 + 1]
+
+    def test_matches_scipy_stft(self):
+        rng = np.random.default_rng(0)
+        for n in self.LENGTHS:
+            with self.subTest(n=n):
+                x = rng.normal(size=n)
+                transform, first, end = spectrogram_transform(250.0, n)
+                _, t, expected = stft(x, 250.0, nperseg=min(256, n))
+                expected = np.abs(expected)
+                self.assertEqual(first, 0)
+                self.assertLessEqual(end, expected.shape[1])
+                np.testing.assert_allclose(np.abs(transform.stft(x, p0=first, p1=end)), expected[:, :end], atol=1e-12)
+                np.testing.assert_allclose(transform.t(n, first, end), t[:end])
+                # Janelas extras do scipy contêm apenas o preenchimento de zeros
+                np.testing.assert_allclose(expected[:, end:], 0, atol=1e-12)
+
+    def test_stft_by_blocks(self):
+        x = np.random.default_rng(1).normal(size=128 * 40 + 1)
+        transform, first, end = spectrogram_transform(250.0, len(x))
+        blocks = [transform.stft(x, p0=p0, p1=min(p0 + 7, end)) for p0 in range(first, end, 7)]
+        np.testing.assert_allclose(np.hstack(blocks), transform.stft(x, p0=first, p1=end))
+
+    def test_ingest_lengths(self):
+        # n ≡ 1 (mod 128) e registro mais curto que uma janela
+        for duration in (4.1, 0.5):
+            with self.subTest(duration=duration):
+                case = run_case(8, duration=duration, fs=250.0, memory=False)
+                self.assertEqual(case['samples'], round(duration * 250))
+
+
+class FilterRegistryTests(TestCase):
+    def test_same_design_returns_cached_object(self):
+        registry = FilterRegistry()
+        sos = registry.design('bandpass', (8, 13), 250, order=4)
+        self.assertIs(registry.design('bandpass', [8.0, 13.0], 250.0, order=4), sos)
+        self.assertIsNot(registry.design('bandpass', (8, 13), 250, order=2), sos)
+        self.assertIsNot(registry.design('bandpass', (8, 13), 500, order=4), sos)
+        self.assertEqual(sos.shape, (4, 6))
+
+    def test_lru_eviction(self):
+        registry = FilterRegistry(maxsize=2)
+        low = registry.design('lowpass', 40, 250)
+        high = registry.design('highpass', 1, 250)
+        registry.design('lowpass', 40, 250)  # 'lowpass' passa a ser o mais recente
+        registry.design('notch', 60, 250)
+        self.assertEqual(registry.stats()['size'], 2)
+        self.assertIs(registry.design('lowpass', 40, 250), low)
+        self.assertIsNot(registry.design('highpass', 1, 250), high)
+
+    def test_hit_and_miss_counters(self):
+        registry = FilterRegistry(maxsize=8)
+        for _ in range(3):
+            registry.design('bandpass', (4, 8), 250)
+        registry.design('notch', 60, 250, output='ba')
+        self.assertEqual(registry.stats(), {'hits': 2, 'misses': 2, 'size': 2, 'maxsize': 8})
+        registry.clear()
+        self.assertEqual(registry.stats(), {'hits': 0, 'misses': 0, 'size': 0, 'maxsize': 8})
+
+
+class StreamingFilterTests(TestCase):
+    """Filtrar blocos consecutivos com o estado carregado equivale a filtrar o sinal inteiro."""
+
+    def test_blocks_match_one_shot(self):
+        data = np.random.default_rng(3).normal(size=(1000, 3))
+        bank = get_filter_bank(250.0)
+        stream = bank.stream(data.shape[1])
+        blocks = [(stream.apply(block, dtype=np.float64), dict(stream.iter_bands(block)))
+                  for block in np.array_split(data, [1, 128, 129, 700])]
+        for name, expected in bank.apply(data, dtype=np.float64).items():
+            with self.subTest(filtro=name):
+                np.testing.assert_allclose(np.vstack([filtered[name] for filtered, _ in blocks]), expected,
+                                           rtol=1e-10, atol=1e-12)
+        for banda, expected in bank.iter_bands(data):
+            with self.subTest(banda=banda):
+                np.testing.assert_allclose(np.vstack([bands[banda] for _, bands in blocks]), expected,
+                                           rtol=1e-10, atol=1e-12)
+
+
+class PSDAccumulatorTests(TestCase):
+    """A PSD acumulada em blocos reproduz scipy.signal.welch; o multitaper, a média dos periodogramas por taper."""
+
+    def blocks(self, data):
+        return np.array_split(data, [1, 250, 251, 900, 1777])
+
+    def test_welch_matches_scipy(self):
+        data = np.random.default_rng(4).normal(size=(3001, 2))
+        for fs, segment in ((250.0, 2.0), (250.0, 1.002), (100.0, 100.0)):
+            with self.subTest(fs=fs, segment=segment):
+                accumulator = PSDAccumulator(fs, data.shape[1], segment=segment)
+                for block in self.blocks(data):
+                    accumulator.push(block)
+                f, psd = accumulator.result()
+                nperseg = min(int(segment * fs), len(data))
+                expected_f, expected = welch(data, fs, nperseg=nperseg, axis=0)
+                np.testing.assert_allclose(f, expected_f)
+                np.testing.assert_allclose(psd, expected, rtol=1e-10)
+
+    def test_multitaper(self):
+        fs, nperseg, bandwidth = 250.0, 500, 2.0
+        t = np.arange(3001) / fs
+        data = np.column_stack([3 * np.sin(2 * np.pi * 10 * t), np.random.default_rng(5).normal(size=len(t))])
+        accumulator = PSDAccumulator(fs, 2, method='multitaper', segment=nperseg / fs, bandwidth=bandwidth)
+        for block in self.blocks(data):
+            accumulator.push(block)
+        f, psd = accumulator.result()
+
+        tapers = dpss(nperseg, bandwidth, 3)
+        starts = range(0, len(data) - nperseg + 1, nperseg // 2)
+        expected = np.mean([
+            periodogram(data[start:start + nperseg], fs, window=taper, axis=0)[1]
+            for start in starts for taper in tapers
+        ], axis=0)
+        np.testing.assert_allclose(psd, expected, rtol=1e-10)
+        # Potência do seno (A²/2) concentrada na banda alpha
+        alpha = band_metrics(f, psd)['alpha']
+        self.assertAlmostEqual(alpha['absolute'][0], 4.5, delta=0.05)
+        self.assertGreater(alpha['relative'][0], 0.99)
+        # Ruído branco de variância 1: a integral da PSD até Nyquist é ~1
+        self.assertAlmostEqual(psd[:, 1].sum() * (f[1] - f[0]), 1.0, delta=0.05)
+
+
+class SpectrogramQuantizationTests(TestCase):
+    """Erro da quantização uint8 em dB: no máximo meio passo dentro de DYNAMIC_RANGE, piso abaixo dele."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.store = RecordingStore(directory.name)
+        rng = np.random.default_rng(6)
+        n_windows = 2 * SPECTROGRAM_BLOCK + 5
+        # Cada faixa com um máximo diferente e valores até 150 dB abaixo dele
+        self.db = rng.uniform(-150, 0, size=(40, n_windows)) + np.repeat([20.0, -30.0, 5.0], SPECTROGRAM_BLOCK)[:n_windows]
+
+    def write(self, key, db):
+        writer = SpectrogramWriter(self.store, key, *db.shape)
+        for p0 in range(0, db.shape[1], SPECTROGRAM_BLOCK):
+            writer.write(p0, db[:, p0:p0 + SPECTROGRAM_BLOCK])
+        writer.close()
+        return QuantizedSpectrogram(self.store.load(key), self.store.load(f'{key}.scale'))
+
+    def test_error_bound(self):
+        spectrogram = self.write('canal.spectrogram', self.db)
+        step = DYNAMIC_RANGE / LEVELS
+        for p0 in range(0, self.db.shape[1], SPECTROGRAM_BLOCK):
+            expected = self.db[:, p0:p0 + SPECTROGRAM_BLOCK]
+            decoded = spectrogram.decode(p0, p0 + SPECTROGRAM_BLOCK)
+            floor = expected.max() - DYNAMIC_RANGE
+            inside = expected >= floor
+            with self.subTest(p0=p0):
+                self.assertLessEqual(np.abs(decoded - expected)[inside].max(), step / 2 + 1e-4)
+                np.testing.assert_allclose(decoded[~inside], floor, atol=1e-4)
+        # Janelas decodificadas em qualquer recorte são as mesmas
+        np.testing.assert_array_equal(spectrogram.decode(1000, 1100), spectrogram.decode()[:, 1000:1100])
+
+    def test_average(self):
+        spectrograms = [self.write(f'c{i}.spectrogram', self.db + i * 3.0) for i in range(3)]
+        save_average(self.store, np.arange(40.0), spectrograms)
+        _, average = load_average(self.store)
+        linear = np.mean([10 ** (spectrogram.decode() / 10) for spectrogram in spectrograms], axis=0)
+        expected = 10 * np.log10(linear)
+        inside = expected >= expected.max() - DYNAMIC_RANGE
+        self.assertLessEqual(np.abs(average.decode() - expected)[inside].max(), DYNAMIC_RANGE / LEVELS / 2 + 1e-3)
+
+
+@override_settings(EEG_LIVE_TOKEN='headset')
+class LiveIngestionTests(TestCase):
+    """Sessões ao vivo: parâmetros validados, token ou cookie com CSRF, e apenas o dono altera a sessão."""
+
+    CSRF = 'a' * 32
+
+    def setUp(self):
+        self.owner = User.objects.create_user('dono')
+        self.client = Client(enforce_csrf_checks=True)
+        self.client.force_login(self.owner)
+        self.client.cookies['csrftoken'] = self.CSRF
+
+    def post(self, url, payload, client=None, **headers):
+        client = client or self.client
+        return client.post(url, json.dumps(payload), content_type='application/json', **headers)
+
+    def create(self, payload=None, **headers):
+        response = self.post('/live/sessions/', payload or {'fs': 250, 'channels': ['Fp1', 'Fp2']}, **headers)
+        if response.status_code == 201:
+            self.addCleanup(close_session, response.json()['session_id'])
+        return response
+
+    def test_invalid_parameters(self):
+        for payload in ({'fs': 0}, {'fs': 100}, {'fs': 120}, {'fs': 'abc'}, {'fs': float('inf')},
+                        {'channels': 5}, {'channels': []}, {'channels': [1, 2]}, {'channels': 'Fp1'}):
+            with self.subTest(payload=payload):
+                self.assertEqual(self.create(payload, HTTP_X_EEG_TOKEN='headset').status_code, 400)
+
+    def test_token_or_csrf(self):
+        self.assertEqual(self.create().status_code, 403)  # Cookie sem token CSRF
+        self.assertEqual(self.create(HTTP_X_EEG_TOKEN='errado').status_code, 403)
+        self.assertEqual(self.create(HTTP_X_EEG_TOKEN='headset').status_code, 201)
+        self.assertEqual(self.create(HTTP_X_CSRFTOKEN=self.CSRF).status_code, 201)
+        anonymous = Client(enforce_csrf_checks=True)
+        response = self.post('/live/sessions/', {'fs': 250}, client=anonymous)
+        self.assertEqual(response.status_code, 403)
+
+    def test_only_owner_changes_session(self):
+        session_id = self.create(HTTP_X_CSRFTOKEN=self.CSRF).json()['session_id']
+        frame = {'samples': [[1.0, 2.0]] * 10}
+        other = Client(enforce_csrf_checks=True)
+        other.force_login(User.objects.create_user('outro'))
+        other.cookies['csrftoken'] = self.CSRF
+        for url in (f'/live/{session_id}/frames/', f'/live/{session_id}/close/'):
+            response = self.post(url, frame, client=other, HTTP_X_CSRFTOKEN=self.CSRF)
+            self.assertEqual(response.status_code, 403)
+
+        response = self.post(f'/live/{session_id}/frames/', frame, HTTP_X_CSRFTOKEN=self.CSRF)
+        self.assertEqual(response.json()['samples'], 10)
+        response = self.post(f'/live/{session_id}/frames/', frame, client=other, HTTP_X_EEG_TOKEN='headset')
+        self.assertEqual(response.status_code, 200)
+        response = self.post(f'/live/{session_id}/close/', {}, HTTP_X_CSRFTOKEN=self.CSRF)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(get_session(session_id))
+
+    @override_settings(EEG_LIVE_SESSION_TIMEOUT=-1)
+    def test_idle_sessions_expire(self):
+        session_id = self.create(HTTP_X_EEG_TOKEN='headset').json()['session_id']
+        self.assertIsNone(get_session(session_id))
+
+
+class TopomapWeightsTests(TestCase):
+    """
+    Mapas por pesos esparsos iguais à interpolação Clough-Tocher dos valores, com o mesmo NaN
+    fora do fecho dos eletrodos; griddata(method='cubic') converge os gradientes só até tol=1e-6.
+    """
+
+    def test_matches_griddata(self):
+        rng = np.random.default_rng(9)
+        for name in ('sinap-8', 'standard_1020', 'standard_1010'):
+            positions = list(get_montage(name).positions.values())
+            weights = get_topomap_weights(positions)
+            self.assertIs(get_topomap_weights([tuple(p) for p in positions]), weights)
+            xi, yi = np.meshgrid(weights.axis, weights.axis)
+            frames = rng.normal(size=(4, len(positions)))
+            maps = weights.render(frames)
+            for values, rendered in zip(frames, maps):
+                with self.subTest(montage=name):
+                    expected = griddata(np.asarray(positions), values, (xi, yi), method='cubic')
+                    np.testing.assert_array_equal(np.isnan(rendered), np.isnan(expected))
+                    self.assertTrue(np.isnan(expected).any())
+                    np.testing.assert_allclose(rendered, expected, atol=1e-6, equal_nan=True)
+                    exact = CloughTocher2DInterpolator(positions, values, tol=1e-14)((xi, yi))
+                    np.testing.assert_allclose(rendered, exact, atol=1e-12, equal_nan=True)
+                    np.testing.assert_array_equal(weights.render(values), rendered)
+
+
+class MontageTests(TestCase):
+    """Montagens próprias alteradas por outro processo (sem sinais neste) valem na próxima leitura."""
+
+    ELECTRODES = [{'name': 'A', 'x': 0.2, 'y': 0.5}, {'name': 'B', 'x': 0.8, 'y': 0.5}, {'name': 'C', 'x': 0.5, 'y': 0.9}]
+
+    def test_custom_montage_is_read_fresh(self):
+        Montage.objects.create(name='propria', electrodes=self.ELECTRODES)
+        self.assertEqual(get_montage('propria').position('A'), (0.2, 0.5))
+        # queryset.update não dispara post_save, como uma alteração feita em outro processo
+        Montage.objects.filter(name='propria').update(electrodes=[{**self.ELECTRODES[0], 'x': 0.3}, *self.ELECTRODES[1:]])
+        self.assertEqual(get_montage('propria').position('A'), (0.3, 0.5))
+        Montage.objects.filter(name='propria').delete()
+        with self.assertRaises(KeyError):
+            get_montage('propria')
+
+    def test_standard_montage_without_queries(self):
+        with self.assertNumQueries(0):
+            self.assertIs(get_montage('standard_1020'), get_montage('standard_1020'))
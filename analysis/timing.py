@@ -0,0 +1,99 @@
+# analysis/timing.py
+"""
+Validação dos timestamps do registro.
+
+Os timestamps do CSV não são gravados: o eixo de tempo é derivado do instante
+inicial e da taxa de amostragem (EEGData.time_axis). Antes de descartá-los, a
+ingestão verifica em uma passada vetorizada por bloco (`TimingCheck.push`) se
+os intervalos entre amostras correspondem a fs: falhas (amostras perdidas),
+timestamps fora de ordem e a variação (jitter) dos intervalos regulares. O
+relatório é gravado em EEGData.timing, com os instantes em milissegundos desde
+a época; a formatação para exibição é feita no navegador.
+"""
+import numpy as np
+
+GAP_TOLERANCE = 0.5  # Intervalos acima de (1 + tolerância) x 1/fs contam como falha
+MAX_EVENTS = 50      # Falhas/retrocessos individuais guardados no relatório
+
+
+class TimingCheck:
+    """
+    Acumula as estatísticas dos intervalos entre timestamps, bloco a bloco.
+
+    Parâmetros:
+        fs (float): Taxa de amostragem declarada (Hz)
+        tolerance (float): Fração de 1/fs acima da qual um intervalo é uma falha
+        max_events (int): Número máximo de eventos individuais no relatório
+    """
+
+    def __init__(self, fs, tolerance=GAP_TOLERANCE, max_events=MAX_EVENTS):
+        self.fs = fs
+        self.interval = 1000.0 / fs  # ms
+        self.tolerance = tolerance
+        self.max_events = max_events
+        self.n_samples = 0
+        self.first = self.last = None
+        self.gaps = self.backwards = self.dropped = 0
+        self.events = []
+        # Intervalos regulares: soma e soma dos quadrados do desvio, e maior desvio
+        self.regular = 0
+        self.deviation_sum = self.deviation_sq = self.deviation_max = 0.0
+
+    def push(self, timestamps):
+        """Processa um bloco de timestamps em milissegundos (continua do bloco anterior)."""
+        t = np.asarray(timestamps, dtype=np.float64)
+        if not len(t):
+            return
+        # Intervalo até cada amostra; a primeira do registro não tem intervalo
+        if self.last is None:
+            self.first = t[0]
+            diffs, after, start = np.diff(t), t[1:], self.n_samples + 1
+        else:
+            diffs, after, start = np.diff(t, prepend=self.last), t, self.n_samples
+
+        gap = diffs > self.interval * (1 + self.tolerance)
+        backwards = diffs <= 0
+        regular = ~(gap | backwards)
+        self.gaps += int(gap.sum())
+        self.backwards += int(backwards.sum())
+        self.dropped += int(np.rint(diffs[gap] / self.interval).sum()) - int(gap.sum())
+
+        deviation = diffs[regular] - self.interval
+        self.regular += len(deviation)
+        self.deviation_sum += float(deviation.sum())
+        self.deviation_sq += float(np.square(deviation).sum())
+        if len(deviation):
+            self.deviation_max = max(self.deviation_max, float(np.abs(deviation).max()))
+
+        free = self.max_events - len(self.events)
+        if free > 0:
+            for index in np.flatnonzero(~regular)[:free]:
+                self.events.append({
+                    'kind': 'gap' if gap[index] else 'backwards',
+                    'sample': int(start + index),  # Amostra após o intervalo
+                    'time_ms': float(after[index]),
+                    'interval_ms': float(diffs[index]),
+                })
+
+        self.n_samples += len(t)
+        self.last = t[-1]
+
+    def report(self):
+        """Relatório para EEGData.timing (JSON)."""
+        span = float(self.last - self.first) if self.n_samples > 1 else 0.0
+        mean = self.deviation_sum / self.regular if self.regular else 0.0
+        variance = self.deviation_sq / self.regular - mean ** 2 if self.regular else 0.0
+        return {
+            'n_samples': self.n_samples,
+            'start_ms': None if self.first is None else float(self.first),
+            'end_ms': None if self.last is None else float(self.last),
+            'expected_interval_ms': self.interval,
+            'estimated_fs': (self.n_samples - 1) * 1000.0 / span if span > 0 else None,
+            'gaps': self.gaps,
+            'dropped_samples': self.dropped,
+            'backwards': self.backwards,
+            'jitter_ms': float(np.sqrt(max(variance, 0.0))),
+            'max_jitter_ms': self.deviation_max,
+            'events': self.events,
+            'regular': not (self.gaps or self.backwards),
+        }
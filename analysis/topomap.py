@@ -0,0 +1,72 @@
+# analysis/topomap.py
+"""
+Interpolação dos mapas topográficos.
+
+A interpolação cúbica (Clough-Tocher, a mesma de `griddata(..., method='cubic')`)
+é linear nos valores dos eletrodos: o mapa de qualquer banda ou época é
+`W @ valores`, onde W (n_pontos_da_grade x n_eletrodos) é obtida uma única vez
+por disposição de eletrodos interpolando a base identidade. W é guardada como
+matriz esparsa (linhas vazias fora do fecho convexo dos eletrodos, onde o mapa
+é NaN) em um cache por disposição, então trocar de banda ou animar épocas custa
+um produto matriz-vetor em vez de uma nova triangulação.
+"""
+from functools import lru_cache
+
+import numpy as np
+from scipy.interpolate import CloughTocher2DInterpolator
+from scipy.sparse import csr_matrix
+
+GRID_SIZE = 100  # Pontos por eixo da grade do mapa (coordenadas normalizadas 0-1)
+# Tolerância da estimativa iterativa dos gradientes: com a padrão (1e-6) o resultado
+# só é linear nos valores até ~1e-8; com esta, W é o interpolador convergido
+GRADIENT_TOL = 1e-12
+
+
+class TopomapWeights:
+    """
+    Pesos de interpolação de uma disposição de eletrodos.
+
+    Parâmetros:
+        positions (sequence): Coordenadas normalizadas (x, y) de cada eletrodo, na ordem dos valores
+        grid_size (int): Pontos por eixo da grade
+    """
+
+    def __init__(self, positions, grid_size=GRID_SIZE):
+        points = np.asarray(positions, dtype=np.float64)
+        self.grid_size = grid_size
+        self.axis = np.linspace(0, 1, grid_size)
+        xi, yi = np.meshgrid(self.axis, self.axis)
+        # Interpolação da base identidade: coluna j = mapa de um eletrodo j unitário
+        basis = CloughTocher2DInterpolator(points, np.eye(len(points)), tol=GRADIENT_TOL)((xi, yi))
+        basis = basis.reshape(grid_size * grid_size, len(points))
+        self.mask = ~np.isnan(basis).any(axis=1)  # Pontos dentro do fecho convexo
+        weights = np.where(self.mask[:, None], basis, 0.0)
+        weights[np.abs(weights) < 1e-12] = 0.0
+        self.weights = csr_matrix(weights)
+
+    def render(self, values):
+        """
+        Mapas interpolados.
+
+        Parâmetros:
+            values (array): (n_eletrodos,) para um mapa ou (n_quadros x n_eletrodos) para vários
+
+        Retorna:
+            array: (grade x grade) ou (n_quadros x grade x grade), NaN fora dos eletrodos
+        """
+        values = np.asarray(values, dtype=np.float64)
+        frames = np.atleast_2d(values)
+        maps = np.asarray(self.weights @ frames.T).T  # (n_quadros x n_pontos)
+        maps[:, ~self.mask] = np.nan
+        maps = maps.reshape(len(frames), self.grid_size, self.grid_size)
+        return maps[0] if values.ndim == 1 else maps
+
+
+@lru_cache(maxsize=32)
+def _weights_for(positions, grid_size):
+    return TopomapWeights(positions, grid_size)
+
+
+def get_topomap_weights(positions, grid_size=GRID_SIZE):
+    """Pesos de uma disposição de eletrodos, calculados uma vez e mantidos em cache."""
+    return _weights_for(tuple(tuple(map(float, p)) for p in positions), grid_size)
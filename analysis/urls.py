@@ -8,7 +8,20 @@ urlpatterns = [
     path('', views.home, name='home'),  # Página inicial pública
     path('upload/', views.upload_eeg, name='upload'),
     path('dashboard/<int:eeg_id>/', views.dashboard, name='dashboard'),
+    path('dashboard/<int:eeg_id>/brain-waves/window/', views.brain_waves_window, name='brain_waves_window'),
+    path('dashboard/<int:eeg_id>/epochs/', views.epoch_powers, name='epoch_powers'),
+    path('api/eeg/<int:eeg_id>/charts/<str:chart>/', views.recording_chart, name='recording_chart'),
+    path('api/eeg/<int:eeg_id>/topomap/weights/', views.topomap_weights, name='topomap_weights'),
+    path('api/channel/<int:channel_id>/chart/', views.channel_chart, name='channel_chart'),
     path('channel/<int:channel_id>/', views.channel_detail, name='channel_detail'),
+    path('channel/<int:channel_id>/window/', views.channel_window, name='channel_window'),
+    path('jobs/<int:eeg_id>/status/', views.job_status, name='job_status'),
+    path('live/sessions/', views.live_session_create, name='live_session_create'),
+    path('live/<str:session_id>/', views.live_dashboard, name='live_dashboard'),
+    path('live/<str:session_id>/frames/', views.live_frames, name='live_frames'),
+    path('live/<str:session_id>/events/', views.live_events, name='live_events'),
+    path('live/<str:session_id>/close/', views.live_close, name='live_close'),
     path('update-topomap/', views.update_topomap, name='update_topomap'),
     path('eeg-list/', views.EEGList.as_view(), name='eeg_list'),
+    path('metrics', views.metrics, name='metrics'),  # Coletor do Prometheus
 ]
\ No newline at end of file
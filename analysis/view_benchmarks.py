@@ -0,0 +1,207 @@
+# analysis/view_benchmarks.py
+"""
+Benchmarks das páginas de leitura.
+
+`run_view_benchmarks` cria registros sintéticos de várias durações
+(benchmarks.write_synthetic_csv + process_eeg_data) em um armazenamento
+temporário e dentro de uma transação desfeita ao final, e os acessa com o
+cliente de teste do Django: dashboard, detalhe de canal, topomapa
+(update_topomap), listagem e os gráficos da API. Para cada página mede o tempo
+da primeira requisição (cache de figuras vazio) e o melhor de `repeat`
+requisições seguintes, o tamanho da resposta, o número de consultas e o tempo
+gasto montando as figuras ('figure') e serializando-as ('render':
+`fig.to_html`/`chart_json`), marcado com instrumentation.stage.
+
+`check_thresholds` e `compare_view_results` transformam os resultados em
+falhas (`manage.py benchmark_views`).
+"""
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from .benchmarks import _Rollback, environment, write_synthetic_csv
+from .instrumentation import measure_stages
+
+RESULTS_VERSION = 1
+# Consultas por página com o cache de figuras vazio (sessão e usuário incluídos)
+QUERY_BUDGETS = {
+    'dashboard': 5,
+    'channel_detail': 5,
+    'channel_chart': 5,
+    'update_topomap': 5,
+    'eeg_list': 4,
+    'chart_power': 5,
+    'chart_topomap': 5,
+    'chart_brain_waves': 4,
+    'chart_spectrogram': 4,
+}
+
+
+def view_urls(eeg_data, analysis):
+    """Páginas medidas de um registro: nome -> URL."""
+    return {
+        'dashboard': reverse('analysis:dashboard', args=[eeg_data.id]),
+        'channel_detail': reverse('analysis:channel_detail', args=[analysis.id]),
+        'channel_chart': reverse('analysis:channel_chart', args=[analysis.id]),
+        'update_topomap': f"{reverse('analysis:update_topomap')}?eeg_id={eeg_data.id}&banda=Alpha",
+        'eeg_list': reverse('analysis:eeg_list'),
+        'chart_power': reverse('analysis:recording_chart', args=[eeg_data.id, 'power']),
+        'chart_topomap': reverse('analysis:recording_chart', args=[eeg_data.id, 'topomap']) + '?banda=Alpha',
+        'chart_brain_waves': reverse('analysis:recording_chart', args=[eeg_data.id, 'brain-waves']),
+        'chart_spectrogram': reverse('analysis:recording_chart', args=[eeg_data.id, 'spectrogram']),
+    }
+
+
+def measure_request(client, url):
+    """Uma requisição GET: tempo, status, tamanho, consultas e etapas instrumentadas."""
+    with CaptureQueriesContext(connection) as queries, measure_stages() as timings:
+        start = time.perf_counter()
+        response = client.get(url)
+        content = b''.join(response.streaming_content) if response.streaming else response.content
+        elapsed = time.perf_counter() - start
+    stages = timings.as_dict()
+    return {
+        'status': response.status_code,
+        'ms': elapsed * 1000,
+        'bytes': len(content),
+        'queries': len(queries),
+        'figure_ms': stages.get('figure', {}).get('seconds', 0.0) * 1000,
+        'render_ms': stages.get('render', {}).get('seconds', 0.0) * 1000,
+    }
+
+
+def seed_recording(media, n_channels, duration, fs):
+    """Registro sintético processado (dentro da transação do benchmark)."""
+    from .eeg_processor import process_eeg_data
+    from .models import EEGData
+
+    path = media / 'eeg_data' / f'synthetic-{n_channels}ch-{duration:g}s.csv'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _, montage = write_synthetic_csv(path, n_channels, duration, fs)
+    eeg_data = EEGData.objects.create(
+        original_file=str(path.relative_to(media)), sampling_rate=fs, montage=montage
+    )
+    process_eeg_data(eeg_data)
+    return eeg_data
+
+
+def run_view_benchmarks(durations=(60.0, 600.0), n_channels=8, fs=250.0, repeat=3, progress=None):
+    """
+    Mede as páginas de leitura para registros de cada duração.
+
+    Retorna:
+        dict: {'version', 'created_at', 'environment', 'results': [{'duration_s', 'channels', 'fs', 'views': {...}}]}
+    """
+    results = []
+    # Cache de figuras próprio: a primeira requisição de cada página é sempre sem cache
+    caches = {**settings.CACHES, 'eeg-benchmark': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': f'eeg-benchmark-{uuid.uuid4().hex}',
+        'TIMEOUT': None,
+    }}
+    with tempfile.TemporaryDirectory() as workdir:
+        media = Path(workdir)
+        with override_settings(
+            MEDIA_ROOT=media, EEG_STORE_ROOT=media / 'eeg_store',
+            CACHES=caches, EEG_FIGURE_CACHE='eeg-benchmark',
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+        ):
+            try:
+                with transaction.atomic():
+                    client = Client()
+                    client.force_login(User.objects.create_user(f'benchmark-{uuid.uuid4().hex[:8]}'))
+                    for duration in durations:
+                        eeg_data = seed_recording(media, n_channels, duration, fs)
+                        analysis = eeg_data.eegchannelanalysis_set.first()
+                        views = {}
+                        for name, url in view_urls(eeg_data, analysis).items():
+                            cold = measure_request(client, url)
+                            warm = [measure_request(client, url) for _ in range(max(repeat, 1))]
+                            best = min(warm, key=lambda run: run['ms'])
+                            views[name] = {
+                                'url': url,
+                                'status': cold['status'],
+                                'bytes': cold['bytes'],
+                                'cold_ms': cold['ms'],
+                                'warm_ms': best['ms'],
+                                'queries': cold['queries'],
+                                'warm_queries': best['queries'],
+                                'figure_ms': cold['figure_ms'],
+                                'render_ms': cold['render_ms'],
+                            }
+                        case = {'duration_s': duration, 'channels': n_channels, 'fs': fs, 'views': views}
+                        results.append(case)
+                        if progress:
+                            progress(case)
+                    raise _Rollback
+            except _Rollback:
+                pass
+    return {
+        'version': RESULTS_VERSION,
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'environment': environment(),
+        'results': results,
+    }
+
+
+def check_thresholds(results, max_ms=None, query_budgets=QUERY_BUDGETS):
+    """
+    Páginas acima dos limites absolutos.
+
+    Parâmetros:
+        max_ms (float, opcional): Tempo máximo da primeira requisição (ms)
+        query_budgets (dict): Consultas máximas por página (cache de figuras vazio)
+
+    Retorna:
+        list: Descrições das violações (vazia se nenhuma)
+    """
+    failures = []
+    for case in results['results']:
+        for name, view in case['views'].items():
+            label = f"{case['duration_s']:g}s {name}"
+            if view['status'] != 200:
+                failures.append(f"{label}: status {view['status']}")
+            budget = query_budgets.get(name)
+            if budget is not None and view['queries'] > budget:
+                failures.append(f"{label}: {view['queries']} consultas (limite {budget})")
+            if max_ms is not None and view['cold_ms'] > max_ms:
+                failures.append(f"{label}: {view['cold_ms']:.0f} ms (limite {max_ms:g} ms)")
+    return failures
+
+
+def compare_view_results(current, baseline, tolerance=0.25, min_ms=5.0):
+    """
+    Regressões de tempo (primeira requisição e cache quente), tamanho e
+    consultas em relação a um resultado anterior.
+    """
+    previous = {(case['duration_s'], case['channels'], case['fs']): case for case in baseline['results']}
+    regressions = []
+
+    def check(label, new, old, floor=0.0):
+        if old is not None and old > floor and new > old * (1 + tolerance):
+            regressions.append(f'{label}: {old:.4g} -> {new:.4g} (+{(new / old - 1) * 100:.0f}%)')
+
+    for case in current['results']:
+        old_case = previous.get((case['duration_s'], case['channels'], case['fs']))
+        if old_case is None:
+            continue
+        for name, view in case['views'].items():
+            old = old_case['views'].get(name)
+            if old is None:
+                continue
+            label = f"{case['duration_s']:g}s {name}"
+            check(f'{label} (ms)', view['cold_ms'], old['cold_ms'], min_ms)
+            check(f'{label} com cache (ms)', view['warm_ms'], old['warm_ms'], min_ms)
+            check(f'{label} (bytes)', view['bytes'], old['bytes'])
+            if view['queries'] > old['queries']:
+                regressions.append(f"{label}: {old['queries']} -> {view['queries']} consultas")
+    return regressions
@@ -1,22 +1,38 @@
 # analysis/views.py
-from django.http import HttpResponse
-from django.shortcuts import render, redirect
-import pandas as pd
-from .eeg_processor import process_eeg_data
-from .forms import EEGUploadForm
-from .models import EEGData, EEGChannelAnalysis
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+from django.middleware.csrf import CsrfViewMiddleware
+from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import require_POST
+import hmac
 import json
-from scipy.interpolate import griddata
+import math
+from datetime import date, datetime, time, timedelta
+from .forms import EEGUploadForm
+from .jobs import enqueue_processing, latest_job
+from .live import close_session, create_session, get_session
+from .lod import DEFAULT_WIDTH, MAX_WIDTH
+from .models import EEGData, EEGChannelAnalysis, SIGNAL_KINDS, STATUS_DONE
 import numpy as np
-from scipy.signal import butter, lfilter
+from .charts import (
+    band_window, brain_waves_figure, channel_figure, channel_window_data, chart_json,
+    power_figure, spectrogram_figure, topomap_figure, topomap_weights_payload,
+)
+from .epochs import EpochSeries
+from .figure_cache import cached_figure, recording_condition
+from .filter_bank import BANDAS
+from .instrumentation import stage
+from .metrics import render_metrics
+from .statistics import get_statistics
 from django.views.generic import ListView
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.views import LoginView
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q , Sum
+from django.db.models import Q
 
 def home(request):
     """
@@ -26,15 +42,8 @@ def home(request):
         - stats: Dicionário com dados agregados (total de uploads, canais, processamentos e potência total)
         - laboratory_info: Informações institucionais (missão, equipe e parceiros)
     """
-    # Coleta estatísticas públicas do banco de dados
-    stats = {
-        'total_uploads': EEGData.objects.count(),
-        'total_channels': EEGChannelAnalysis.objects.count(),
-        'total_processed': EEGData.objects.filter(processed=True).count(),
-        'total_power': EEGChannelAnalysis.objects.aggregate(
-            total=Sum('alpha_power') + Sum('beta_power') + Sum('gamma_power')
-        )['total'] or 0
-    }
+    # Estatísticas públicas mantidas de forma incremental (uma consulta, ver statistics.py)
+    stats = get_statistics()
     
     return render(request, 'home.html', {
         'stats': stats,
@@ -79,13 +88,13 @@ def register(request):
 def upload_eeg(request):
     """
     View para upload de arquivos EEG.
-    Processa o formulário e inicia o processamento dos dados após upload.
+    Salva o arquivo e enfileira o processamento (executado pelo worker `process_jobs`).
     """
     if request.method == 'POST':
         form = EEGUploadForm(request.POST, request.FILES)
         if form.is_valid():
             eeg_data = form.save()
-            process_eeg_data(eeg_data) # Processamento assíncrono recomendado para produção
+            enqueue_processing(eeg_data)
             return redirect('analysis:dashboard', eeg_id=eeg_data.id)
     else:
         form = EEGUploadForm()
@@ -114,18 +123,7 @@ def analyze_sentiment(analyses, age=None, sex=None):
         'gamma': np.mean([a.gamma_power for a in analyses])
     }
 
-    # Lógica de determinação de sentimentos
-    sentiment = "Neutro"
-
-    # Relações entre bandas para classificação
-    if avg['beta'] > avg['alpha'] * 1.5:
-        sentiment = "Agitação/Estresse"
-        if avg['gamma'] > 0.08: sentiment += " Intensa"
-    elif avg['alpha'] > avg['beta'] * 1.2:
-        sentiment = "Relaxamento"
-        if avg['theta'] > 0.1: sentiment += " Profundo"
-    elif avg['theta'] > avg['alpha'] and avg['theta'] > avg['beta']:
-        sentiment = "Sonolência/Criatividade"
+    sentiment = classify_sentiment(avg)
     
     # Adiciona contexto demográfico
     if age:
@@ -147,106 +145,113 @@ def analyze_sentiment(analyses, age=None, sex=None):
         'avg_values': avg
     }
 
-def create_brain_waves_plot(analyses):
+def classify_sentiment(avg):
+    """Classificação textual a partir das potências médias por banda (dict banda -> potência)."""
+    # Lógica de determinação de sentimentos
+    sentiment = "Neutro"
+
+    # Relações entre bandas para classificação
+    if avg['beta'] > avg['alpha'] * 1.5:
+        sentiment = "Agitação/Estresse"
+        if avg['gamma'] > 0.08: sentiment += " Intensa"
+    elif avg['alpha'] > avg['beta'] * 1.2:
+        sentiment = "Relaxamento"
+        if avg['theta'] > 0.1: sentiment += " Profundo"
+    elif avg['theta'] > avg['alpha'] and avg['theta'] > avg['beta']:
+        sentiment = "Sonolência/Criatividade"
+    return sentiment
+
+def finite_param(value):
+    """Número finito da query string (ValueError para nan/inf)."""
+    if not value:
+        return None
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError(f'Valor não finito: {value}')
+    return number
+
+def window_params(request):
     """
-    Gera gráfico interativo das ondas cerebrais médias.
-    
-    Passos:
-        1. Extrai dados temporais do primeiro canal como referência
-        2. Aplica filtros de banda em todos os canais
-        3. Calcula média dos sinais filtrados
-        4. Normaliza amplitudes para visualização combinada
-    
-    Retorna:
-        str: HTML do gráfico Plotly para incorporação em templates
+    Lê t0, t1 (segundos desde o início) e width (pixels) da query string.
+    A largura é limitada a [1, MAX_WIDTH]: uma largura enorme levaria ao nível
+    de resolução total e a uma resposta com o registro inteiro.
     """
-    # Configuração inicial usando o primeiro canal como referência
-    first_channel = analyses[0]
-    
-    # Extrair os dados de tempo do sinal raw
-    raw_data = json.loads(first_channel.raw_signal)
-    timestamps = raw_data['x']
-    
-    # Criar gráfico de linhas para as bandas cerebrais
-    fig = go.Figure()
-    
-    # Paleta de cores para as diferentes bandas
-    colors = {
-        'delta': 'rgba(220, 53, 69, 0.8)',  # Vermelho (Bootstrap danger)
-        'theta': 'rgba(255, 193, 7, 0.8)',  # Amarelo (Bootstrap warning)
-        'alpha': 'rgba(13, 202, 240, 0.8)',  # Azul claro (Bootstrap info)
-        'beta': 'rgba(13, 110, 253, 0.8)',   # Azul (Bootstrap primary)
-        'gamma': 'rgba(25, 135, 84, 0.8)'    # Verde (Bootstrap success)
-    }
-    
-    # Definição das faixas de frequência por banda
-    bandas = {
-        'delta': (0.5, 4),
-        'theta': (4, 8),
-        'alpha': (8, 13),
-        'beta': (13, 30),
-        'gamma': (30, 40)
+    width = int(request.GET.get('width') or DEFAULT_WIDTH)
+    return (
+        finite_param(request.GET.get('t0')),
+        finite_param(request.GET.get('t1')),
+        min(max(width, 1), MAX_WIDTH),
+    )
+
+def window_payload(eeg_data, window):
+    """Serializa uma janela com o eixo x em milissegundos desde a época."""
+    return {
+        'level': window['level'],
+        'bucket': window['bucket'],
+        'x': (eeg_data.start_epoch_ms + window['t'] * 1000).tolist(),
+        'y': np.asarray(window['y'], dtype=float).tolist(),
     }
-    
-    # Obter os dados brutos do sinal
-    raw_signal = np.array(raw_data['y'])
-    
-    # Calcular a média dos sinais de todos os canais para cada banda
-    avg_signals = {}
-    
-    # Processamento multicanal
-    for banda, (low, high) in bandas.items():
-        # Inicializar array para acumular sinais de todos os canais
-        band_signals = np.zeros_like(raw_signal)
-        
-        # Para cada canal, extrair o sinal da banda e acumular
-        for analysis in analyses:
-            # Obter sinal bruto do canal
-            channel_data = json.loads(analysis.raw_signal)
-            channel_signal = np.array(channel_data['y'])
-            
-            # Aplicar filtro de banda
-            fs = analysis.eeg_data.sampling_rate
-            b, a = butter_bandpass(low, high, fs)
-            filtered = lfilter(b, a, channel_signal)
-            
-            # Acumular o sinal filtrado
-            band_signals += filtered
-        
-        # Calcular a média dos sinais de todos os canais
-        avg_signals[banda] = band_signals / len(analyses)
-    
-    # Adicionar linhas para cada banda
-    for banda, signal in avg_signals.items():
-        # Normalizar o sinal para melhor visualização
-        normalized_signal = signal / np.max(np.abs(signal)) * 0.5
-        
-        fig.add_trace(go.Scatter(
-            x=timestamps,  # Limitar para os primeiros 500 pontos para melhor visualização
-            y=normalized_signal,
-            name=banda.capitalize(),
-            line=dict(color=colors[banda], width=2)
-        ))
-    
-    # Configurar layout
-    fig.update_layout(
-        title='Sinais das Ondas Cerebrais',
-        xaxis_title='Tempo',
-        yaxis_title='Amplitude (Normalizada)',
-        height=400,
-        margin=dict(l=50, r=50, t=80, b=50),
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1
+
+@login_required
+def brain_waves_window(request, eeg_id):
+    """
+    Pontos das ondas cerebrais médias para a janela visível do gráfico (JSON).
+    Usado pelo zoom do dashboard para buscar detalhes sob demanda.
+    """
+    eeg_data = get_object_or_404(EEGData, id=eeg_id)
+    try:
+        t0, t1, width = window_params(request)
+    except ValueError:
+        return HttpResponseBadRequest('Parâmetros de janela inválidos')
+    return JsonResponse({
+        banda: window_payload(eeg_data, band_window(eeg_data, banda, t0, t1, width))
+        for banda in BANDAS
+    })
+
+@login_required
+def epoch_powers(request, eeg_id):
+    """
+    Potências por banda em épocas deslizantes dentro de [t0, t1) (JSON), com a
+    média entre canais e a classificação de sentimento de cada época.
+    Filtros opcionais: ?channel=<nome>&banda=<nome> (repetíveis) e
+    ?value=relative para a potência relativa (padrão: absolute).
+    """
+    eeg_data = get_object_or_404(EEGData, id=eeg_id)
+    series = EpochSeries.for_recording(eeg_data)
+    if series is None:
+        raise Http404('Registro sem potências por época; reprocesse-o')
+    value = request.GET.get('value', 'absolute')
+    try:
+        if value not in ('absolute', 'relative'):
+            raise ValueError(value)
+        t0, t1, _ = window_params(request)
+        window = series.window(
+            t0, t1, request.GET.getlist('channel'), request.GET.getlist('banda'), relative=value == 'relative'
         )
-    )
-    
-    return fig.to_html(full_html=False)
+    except (KeyError, ValueError):
+        return HttpResponseBadRequest('Parâmetros inválidos')
+
+    powers = window['powers'].astype(float)
+    mean = powers.mean(axis=1)  # (n_épocas x n_bandas)
+    payload = {
+        'x': (eeg_data.start_epoch_ms + window['t'] * 1000).tolist(),
+        'channels': window['channels'],
+        'bands': window['bands'],
+        'value': value,
+        'powers': {
+            banda: dict(zip(window['channels'], powers[:, :, b].T.tolist()))
+            for b, banda in enumerate(window['bands'])
+        },
+        'mean': {banda: mean[:, b].tolist() for b, banda in enumerate(window['bands'])},
+    }
+    if set(BANDAS) <= set(window['bands']):
+        payload['sentiment'] = [
+            classify_sentiment(dict(zip(window['bands'], values))) for values in mean
+        ]
+    return JsonResponse(payload)
 
 @login_required
+@recording_condition(lambda request, eeg_id: eeg_id)
 def dashboard(request, eeg_id):
     """
     Dashboard principal de análise de dados EEG.
@@ -259,192 +264,340 @@ def dashboard(request, eeg_id):
         - Análise de sentimento
         - Dados brutos e processados
     """
-    eeg_data = EEGData.objects.get(id=eeg_id)
+    eeg_data = get_object_or_404(EEGData, id=eeg_id)
+    if eeg_data.status != STATUS_DONE:
+        # Processamento ainda em andamento (ou com falha): exibe o acompanhamento da tarefa
+        return render(request, 'processing.html', {
+            'eeg_data': eeg_data,
+            'job': latest_job(eeg_data),
+        })
     age = eeg_data.age
     sex = eeg_data.sex
-    analyses = EEGChannelAnalysis.objects.filter(eeg_data=eeg_data)
+    # Uma consulta, apenas as métricas escalares; a lista é reutilizada pelo sentimento e pela tabela
+    analyses = list(eeg_data.eegchannelanalysis_set.metrics())
     bandas = ['delta', 'theta', 'alpha', 'beta', 'gamma']
     
-    # Gráfico de potências
-    fig_power = px.line(title='Distribuição de Potência por Canal')
-    for banda in bandas:
-        values = [getattr(a, f'{banda}_power') for a in analyses]
-        fig_power.add_scatter(
-            x=[a.channel_name for a in analyses],
-            y=values,
-            name=banda.capitalize()
-        )
-    
     # Análise de sentimentos
     sentiment_analysis = analyze_sentiment(analyses,age,sex)
-    # Criar gráfico de ondas cerebrais
-    brain_waves_plot = create_brain_waves_plot(analyses)
-    # Espectrograma médio
-    all_spectrograms = []
-    for analysis in analyses:
-        spectrogram = analysis.get_spectrogram()
-        if spectrogram:
-            all_spectrograms.append(spectrogram)
-    
-    if all_spectrograms:
-        # Calcula a média dos espectrogramas
-        avg_mag = np.mean([np.array(s['magnitude']) for s in all_spectrograms], axis=0)
-        
-        fig = go.Figure(data=go.Heatmap(
-            z=10 * np.log10(avg_mag),  # Conversão para dB
-            x=all_spectrograms[0]['time'],
-            y=all_spectrograms[0]['freq'],
-            colorscale='Viridis'
-        ))
-        
-        fig.update_layout(
-            title='Espectrograma Médio',
-            xaxis_title='Tempo (s)',
-            yaxis_title='Frequência (Hz)',
-            height=400
-        )
-        spectrogram_plot = fig.to_html(full_html=False)
-    else:
-        spectrogram_plot = "<div class='alert alert-info'>Dados do espectrograma não disponíveis</div>"
     
-    # Componentes do dashboard
+    # Os gráficos são carregados pelo navegador a partir da API (recording_chart)
     return render(request, 'dashboard.html', {
         'eeg_data': eeg_data,
         'analyses': analyses,
         'bandas': [b.capitalize() for b in bandas],
-        'power_plot': fig_power.to_html(full_html=False),
-        'topomap_plot': get_topomap(analyses, 'Alpha'),
         'sentiment_analysis': sentiment_analysis,
-        'brain_waves_plot': brain_waves_plot,  # Novo gráfico de ondas cerebrais
-        'spectrogram_plot': spectrogram_plot
     })
 
-def get_topomap(analyses, banda):
+def chart_response(content):
+    if not content:
+        raise Http404('Gráfico não disponível')
+    return HttpResponse(content, content_type='application/json')
+
+@login_required
+@gzip_page
+@recording_condition(lambda request, eeg_id, chart: eeg_id)
+def recording_chart(request, eeg_id, chart):
     """
-    Gera mapa topográfico 2D da atividade cerebral para uma banda específica.
-    
-    Parâmetros:
-        analyses (QuerySet): Análises de canal para extrair dados
-        banda (str): Banda cerebral a ser visualizada (ex: 'Alpha')
+    Dados de um gráfico do dashboard: figura Plotly em JSON, com os arrays
+    codificados em base64 (ver charts.py). Gerada uma vez por versão do
+    processamento (figure_cache).
     
-    Retorna:
-        str: HTML do gráfico Plotly pronto para incorporação
-    """
-    # Mapeamento de posições dos eletrodos (coordenadas normalizadas)
-    posicoes = {
-        'EEG Channel 1': (0.5, 0.9),
-        'EEG Channel 2': (0.3, 0.7),
-        'EEG Channel 3': (0.7, 0.7),
-        'EEG Channel 4': (0.2, 0.5),
-        'EEG Channel 5': (0.8, 0.5),
-        'EEG Channel 6': (0.5, 0.3),
-        'EEG Channel 7': (0.3, 0.2),
-        'EEG Channel 8': (0.7, 0.2)
+    Gráficos: power, topomap (?banda=Alpha), brain-waves, spectrogram
+    """
+    eeg_data = get_object_or_404(EEGData, id=eeg_id, status=STATUS_DONE)
+    analyses = eeg_data.eegchannelanalysis_set.metrics()
+    banda = request.GET.get('banda', 'Alpha')
+    builders = {
+        'power': lambda: power_figure(analyses, list(BANDAS)),
+        'topomap': lambda: topomap_figure(analyses, banda, eeg_data.montage_layout),
+        'brain-waves': lambda: brain_waves_figure(eeg_data),
+        'spectrogram': lambda: spectrogram_figure(eeg_data),
     }
-    # Extração e processamento dos dados
-    valores = [getattr(a, f'{banda.lower()}_power') for a in analyses]
-    x = np.array([posicoes[ch.channel_name][0] for ch in analyses])
-    y = np.array([posicoes[ch.channel_name][1] for ch in analyses])
-    z = np.array(valores)
-    
-    # Interpolação para superfície suave
-    xi, yi = np.linspace(0, 1, 100), np.linspace(0, 1, 100)
-    xi, yi = np.meshgrid(xi, yi)
-    zi = griddata((x, y), z, (xi, yi), method='cubic')
-    
-    # Criação do heatmap
-    fig = px.imshow(
-            zi,
-            x=np.linspace(0, 1, 100),
-            y=np.linspace(0, 1, 100),
-            color_continuous_scale='Viridis',
-            title=f'Mapa de Atividade {banda.capitalize()}'
-        )
-        
-    return fig.to_html(
-            full_html=False,
-            include_plotlyjs=True,
-            div_id='dynamic-topomap',  # ID único
-            config={'responsive': True})
+    if chart not in builders:
+        raise Http404('Gráfico desconhecido')
+    params = {}
+    if chart == 'topomap':
+        if banda.lower() not in BANDAS:
+            return HttpResponseBadRequest('Banda inválida')
+        params['banda'] = banda
+
+    def build():
+        with stage('figure'):
+            fig = builders[chart]()
+        return chart_json(fig) if fig is not None else ''
+    return chart_response(cached_figure(eeg_data, f'chart:{chart}', build, **params))
+
+@login_required
+@gzip_page
+@recording_condition(lambda request, eeg_id: eeg_id)
+def topomap_weights(request, eeg_id):
+    """
+    Pesos de interpolação do topomapa do registro (JSON, matriz CSR em base64).
+    Com as potências por época (epoch_powers), o navegador anima o mapa ao longo
+    do tempo calculando um produto matriz-vetor por quadro.
+    """
+    eeg_data = get_object_or_404(EEGData, id=eeg_id, status=STATUS_DONE)
+    analyses = eeg_data.eegchannelanalysis_set.metrics()
+    payload = topomap_weights_payload(analyses, eeg_data.montage_layout)
+    if payload is None:
+        raise Http404('Topomapa não disponível para a montagem do registro')
+    return JsonResponse(payload)
+
+@login_required
+def job_status(request, eeg_id):
+    """
+    Estado da tarefa de processamento mais recente de um registro EEG (JSON).
+    Usado pela página de acompanhamento para atualizar o progresso por canal.
+    """
+    eeg_data = get_object_or_404(EEGData, id=eeg_id)
+    job = latest_job(eeg_data)
+    return JsonResponse({
+        'eeg_id': eeg_data.id,
+        'status': eeg_data.status,
+        'status_display': eeg_data.get_status_display(),
+        'attempts': job.attempts if job else 0,
+        'max_attempts': job.max_attempts if job else 0,
+        'channels_done': job.channels_done if job else 0,
+        'channels_total': job.channels_total if job else 0,
+        'progress': job.progress if job else 0.0,
+        'error': job.error if job else '',
+    })
+
+def metrics_authorized(request):
+    """/metrics: token do coletor (Authorization: Bearer) ou usuário da equipe."""
+    token = getattr(settings, 'EEG_METRICS_TOKEN', '')
+    supplied = request.headers.get('Authorization', '')
+    if token and hmac.compare_digest(supplied.encode(), f'Bearer {token}'.encode()):
+        return True
+    return request.user.is_staff
+
+def metrics(request):
+    """Métricas do processamento no formato do Prometheus (ver metrics.py)."""
+    if not metrics_authorized(request):
+        return HttpResponse('Não autorizado', status=401, content_type='text/plain; charset=utf-8')
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+def topomap_eeg_id(request):
+    eeg_id = request.GET.get('eeg_id')
+    return int(eeg_id) if eeg_id and eeg_id.isdigit() else None
 
 @login_required        
+@recording_condition(topomap_eeg_id)
 def update_topomap(request):
-    eeg_id = request.GET.get('eeg_id')
-    banda = request.GET.get('banda')
-    analyses = EEGChannelAnalysis.objects.filter(eeg_data__id=eeg_id)
+    eeg_data = get_object_or_404(EEGData, id=topomap_eeg_id(request))
+    banda = request.GET.get('banda', '')
+    if banda.lower() not in BANDAS:
+        return HttpResponseBadRequest('Banda inválida')
+    analyses = eeg_data.eegchannelanalysis_set.metrics()
     
-    # Retorne APENAS o HTML interno do gráfico (sem wrappers)
+    # Retorne APENAS o HTML interno do gráfico (sem wrappers); o dashboard usa recording_chart
     return HttpResponse(
-        get_topomap(analyses, banda)
+        cached_figure(eeg_data, 'topomap', lambda: get_topomap(analyses, banda, eeg_data.montage_layout), banda=banda)
     )
 
+def get_topomap(analyses, banda, montage):
+    """HTML do mapa topográfico de uma banda (sem plotly.js: a página já o carrega, ver base.html)."""
+    with stage('figure'):
+        fig = topomap_figure(analyses, banda, montage)
+    if fig is None:
+        return ''
+    with stage('render'):
+        return fig.to_html(
+                full_html=False,
+                include_plotlyjs=False,
+                div_id='dynamic-topomap',  # ID único
+                config={'responsive': True})
+
+
+CHANNEL_SIGNALS = {
+    'Original': 'raw',
+    'Notch': 'notch'
+}
+
+def channel_eeg_id(request, channel_id):
+    return EEGChannelAnalysis.objects.filter(id=channel_id).values_list('eeg_data_id', flat=True).first()
 
+@login_required
+@recording_condition(channel_eeg_id)
 def channel_detail(request, channel_id):
-    analysis = EEGChannelAnalysis.objects.get(id=channel_id)
-    
-    # Criar gráfico de filtros
-    fig = make_subplots(
-        rows=2, cols=1,
-        subplot_titles=['Original', 'Notch']
-    )
+    analysis = get_object_or_404(EEGChannelAnalysis.objects.with_recording(), id=channel_id)
 
-    spect = make_subplots(
-        rows=2, cols=1,
-        subplot_titles=['Original', 'Notch']
-    )
+    # O gráfico é carregado pelo navegador a partir da API (channel_chart)
+    return render(request, 'channel_detail.html', {
+        'analysis': analysis,
+        'signal_kinds': list(CHANNEL_SIGNALS.values()),
+    })
 
-    spectrogram = analysis.get_spectrogram()
-    
-    if spectrogram:
-            spect = go.Figure(data=go.Heatmap(
-            z=10 * np.log10(spectrogram['magnitude']),
-            x=spectrogram['time'],
-            y=spectrogram['freq'],
-            colorscale=spectrogram['config']['cmap']
-        ))
-        
-            spect.update_layout(
-            title=f'Espectrograma - {analysis.channel_name}',
-            xaxis_title='Tempo (s)',
-            yaxis_title='Frequência (Hz)',
-            height=500
-        )
-            spectrogram_plot = spect.to_html(full_html=False)
-    else:
-        spectrogram_plot = None
-    
-    signals = {
-        'Original': json.loads(analysis.raw_signal),
-        'Notch': json.loads(analysis.notch)
-    }
+@login_required
+@gzip_page
+@recording_condition(channel_eeg_id)
+def channel_chart(request, channel_id):
+    """Dados do gráfico de sinais do canal (figura Plotly em JSON, ver recording_chart)."""
+    analysis = get_object_or_404(EEGChannelAnalysis.objects.with_recording(), id=channel_id)
+    def build():
+        with stage('figure'):
+            fig = channel_figure(analysis, CHANNEL_SIGNALS)
+        return chart_json(fig)
+    return chart_response(cached_figure(
+        analysis.eeg_data, 'chart:channel', build, channel=analysis.channel_name
+    ))
+
+
+@login_required
+def channel_window(request, channel_id):
+    """
+    Pontos de um sinal do canal para a janela visível do gráfico (JSON).
     
-    for i, (name, data) in enumerate(signals.items(), 1):
-        fig.add_trace(
-            go.Scatter(
-                x=data['x'],
-                y=data['y'],
-                name=name,
-                line=dict(width=1)
-            ),
-            row=i, col=1
-        )
+    Parâmetros (query string):
+        kind: Tipo de sinal (raw, highpass, lowpass, bandpass, notch)
+        t0, t1: Limites da janela em segundos desde o início do registro
+        width: Largura do gráfico em pixels
+    """
+    analysis = get_object_or_404(EEGChannelAnalysis.objects.with_recording(), id=channel_id)
+    kind = request.GET.get('kind', 'raw')
+    if kind not in SIGNAL_KINDS:
+        return HttpResponseBadRequest('Tipo de sinal inválido')
+    try:
+        t0, t1, width = window_params(request)
+    except ValueError:
+        return HttpResponseBadRequest('Parâmetros de janela inválidos')
+    window = channel_window_data(analysis, kind, t0, t1, width)
+    return JsonResponse(window_payload(analysis.eeg_data, window))
+
+
+def live_token_valid(request):
+    """Token do headset (X-EEG-Token) igual a EEG_LIVE_TOKEN (comparação em tempo constante)."""
+    token = getattr(settings, 'EEG_LIVE_TOKEN', '')
+    supplied = request.headers.get('X-EEG-Token', '')
+    return bool(token) and hmac.compare_digest(supplied.encode(), token.encode())
+
+
+def live_denied(request, session=None):
+    """
+    Autorização da ingestão ao vivo. Retorna None se permitida, senão a resposta de erro.
+
+    Os endpoints são isentos de CSRF para o headset, que se autentica com o
+    token; pelo cookie de sessão (usuário autenticado) a verificação de CSRF é
+    feita aqui, e apenas o dono da sessão ao vivo pode enviar quadros ou encerrá-la.
+    """
+    if live_token_valid(request):
+        return None
+    if not request.user.is_authenticated:
+        return JsonResponse({'error': 'Não autorizado'}, status=403)
+    rejected = CsrfViewMiddleware(lambda request: None).process_view(request, None, (), {})
+    if rejected is not None:
+        return rejected
+    if session is not None and session.owner != request.user.pk:
+        return JsonResponse({'error': 'Sessão ao vivo de outro usuário'}, status=403)
+    return None
+
+
+def get_live_session(session_id):
+    session = get_session(session_id)
+    if session is None:
+        raise Http404('Sessão ao vivo não encontrada')
+    return session
+
+
+@csrf_exempt
+@require_POST
+def live_session_create(request):
+    """
+    Cria uma sessão de aquisição ao vivo.
     
-    fig.update_layout(height=1200, showlegend=False)
-    fig.update_xaxes(title_text='Tempo Decorrido (s)')
+    Corpo (JSON):
+        fs (float): Taxa de amostragem (Hz), padrão 250
+        channels (list, opcional): Nomes dos canais (padrão: 'EEG Channel 1..8')
+    """
+    denied = live_denied(request)
+    if denied is not None:
+        return denied
+    try:
+        payload = json.loads(request.body or b'{}')
+        fs = payload.get('fs', 250)
+        channels = payload.get('channels')
+    except (ValueError, TypeError, AttributeError):
+        return HttpResponseBadRequest('JSON inválido')
+    try:
+        session = create_session(fs, channels, owner=request.user.pk)
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+    except RuntimeError as exc:
+        return JsonResponse({'error': str(exc)}, status=503)
+    info = session.info()
+    info['dashboard_url'] = reverse('analysis:live_dashboard', args=[session.id])
+    return JsonResponse(info, status=201)
 
 
-    return render(request, 'channel_detail.html', {
-        'analysis': analysis,
-        'plot_div': fig.to_html(full_html=False),
+@csrf_exempt
+@require_POST
+def live_frames(request, session_id):
+    """
+    Recebe um quadro de amostras: {"samples": [[canal_1, ..., canal_n], ...]}.
+    Os filtros, potências e espectro da sessão são atualizados incrementalmente.
+    """
+    session = get_live_session(session_id)
+    denied = live_denied(request, session)
+    if denied is not None:
+        return denied
+    try:
+        update = session.push(json.loads(request.body)['samples'])
+    except (ValueError, TypeError, KeyError) as exc:
+        return HttpResponseBadRequest(f'Quadro inválido: {exc}')
+    return JsonResponse({'seq': update['seq'], 'samples': update['samples']})
+
+
+@csrf_exempt
+@require_POST
+def live_close(request, session_id):
+    denied = live_denied(request, get_live_session(session_id))
+    if denied is not None:
+        return denied
+    session = close_session(session_id)
+    if session is None:
+        raise Http404('Sessão ao vivo não encontrada')
+    return JsonResponse(session.info())
+
+
+@login_required
+def live_events(request, session_id):
+    """
+    Fluxo Server-Sent Events com a atualização mais recente da sessão.
+    Assinantes lentos recebem apenas o estado mais novo (sem fila ilimitada).
+    """
+    session = get_live_session(session_id)
+    
+    def stream():
+        seq = int(request.headers.get('Last-Event-ID') or 0)
+        while not session.closed:
+            updates = session.updates_after(seq, timeout=15)
+            if not updates:
+                yield ': keepalive\n\n'
+                continue
+            update = updates[-1]
+            seq = update['seq']
+            yield f'id: {seq}\ndata: {json.dumps(update)}\n\n'
+        yield 'event: closed\ndata: {}\n\n'
+    
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@login_required
+def live_dashboard(request, session_id):
+    session = get_live_session(session_id)
+    return render(request, 'live.html', {
+        'session': session.info(),
+        'bandas': list(BANDAS),
     })
 
 
-def butter_bandpass(lowcut, highcut, fs, order=4):
-    nyq = 0.5 * fs
-    low = lowcut / nyq
-    high = highcut / nyq
-    b, a = butter(order, [low, high], btype='band')
-    return b, a
+def day_start(value):
+    """Data 'AAAA-MM-DD' -> início do dia no fuso horário atual."""
+    return timezone.make_aware(datetime.combine(date.fromisoformat(value), time.min))
+
 
 class EEGList(ListView):
     model = EEGData
@@ -453,13 +606,18 @@ class EEGList(ListView):
     paginate_by = 10
 
     def get_queryset(self):
-        queryset = super().get_queryset()
+        # Apenas as colunas exibidas na listagem
+        queryset = super().get_queryset().only(
+            'id', 'uploaded_at', 'original_file', 'age', 'sex', 'status', 'processed'
+        )
         start_date = self.request.GET.get('start_date')
         end_date = self.request.GET.get('end_date')
         
         if start_date and end_date:
-            queryset = queryset.filter(
-                Q(uploaded_at__date__gte=start_date) &
-                Q(uploaded_at__date__lte=end_date)
-            )
+            try:
+                start, end = day_start(start_date), day_start(end_date) + timedelta(days=1)
+            except ValueError:
+                return queryset.order_by('-uploaded_at')  # Datas inválidas: sem filtro
+            # Intervalo de instantes (e não `__date`) para usar o índice de uploaded_at
+            queryset = queryset.filter(Q(uploaded_at__gte=start) & Q(uploaded_at__lt=end))
         return queryset.order_by('-uploaded_at')
\ No newline at end of file
@@ -32,12 +32,38 @@ LOGOUT_REDIRECT_URL = 'analysis:home'  # Redireciona para a página de login
 
 LOGIN_REDIRECT_URL = 'analysis:upload'  # Redireciona para a página de upload
 
+# Cache das figuras dos dashboards (analysis/figure_cache.py), limitado em número de entradas
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'figures': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'eeg-figures',
+        'TIMEOUT': None,  # Invalidação pela versão do processamento
+        'OPTIONS': {'MAX_ENTRIES': 64},
+    },
+}
+EEG_FIGURE_CACHE = 'figures'
+
 # Application definition
 # https://docs.djangoproject.com/en/5.2/ref/settings/#installed-apps
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# Sinais processados em arrays binários (.npy), um diretório por registro EEG
+EEG_STORE_ROOT = MEDIA_ROOT / 'eeg_store'
+# Linhas do CSV lidas por bloco na ingestão (limita o pico de memória)
+EEG_INGEST_CHUNKSIZE = 65536
+
+# Métricas espectrais (analysis/spectral.py)
+EEG_PSD_METHOD = 'welch'  # 'welch' ou 'multitaper'
+EEG_PSD_SEGMENT = 2.0  # Duração (s) dos segmentos da PSD; resolução = 1/segmento Hz
+EEG_PSD_BANDWIDTH = 2.0  # Meia largura de banda NW dos tapers (multitaper)
+EEG_BANDS = {}  # Bandas adicionais, ex: {'sigma': (12, 15)}
+EEG_EPOCH_SECONDS = 2.0  # Janela das potências por época
+EEG_EPOCH_OVERLAP = 0.5  # Sobreposição entre épocas consecutivas
 
 # Application definition
 
@@ -89,6 +115,8 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Segundos aguardando o bloqueio de escrita (workers do process_batch/process_jobs em paralelo)
+        'OPTIONS': {'timeout': 30},
     }
 }
 
@@ -129,6 +157,26 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Fila de processamento EEG (ver analysis/jobs.py)
+# 'analysis.jobs.InlineBackend' processa dentro da requisição, sem worker
+EEG_JOB_BACKEND = 'analysis.jobs.DatabaseBackend'
+EEG_JOB_MAX_ATTEMPTS = 3
+EEG_JOB_RETRY_DELAY = 30  # segundos, multiplicado pelo número da tentativa
+EEG_JOB_TIMEOUT = 3600  # segundos em 'running' até a tarefa ser considerada abandonada
+
+# Ingestão ao vivo (ver analysis/live.py)
+EEG_LIVE_TOKEN = ''  # Token do headset (cabeçalho X-EEG-Token); vazio = apenas usuários autenticados
+EEG_LIVE_BUFFER_SECONDS = 10  # Sinal mantido por sessão
+EEG_LIVE_POWER_WINDOW = 2  # Janela (s) das potências por banda
+EEG_LIVE_MAX_UPDATES = 100  # Atualizações guardadas por sessão
+EEG_LIVE_MAX_SESSIONS = 16
+EEG_LIVE_SESSION_TIMEOUT = 300  # Segundos sem quadros até a sessão expirar
+
+# Perfil do processamento (ver analysis/profiling.py e analysis/metrics.py)
+EEG_METRICS_TOKEN = ''  # Token do coletor em /metrics (Authorization: Bearer); vazio = apenas a equipe
+EEG_PROFILE_JOBS = False  # Executa cada processamento sob cProfile
+EEG_PROFILE_DIR = MEDIA_ROOT / 'profiles'  # Arquivos .prof (pstats/snakeviz)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 